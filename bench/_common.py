@@ -0,0 +1,35 @@
+"""Utilidades compartidas por los benchmarks (ejecutar desde la raiz: python -m bench.<modulo>)."""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Callable, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_TRAJ = ROOT / "docs" / "MATLAB" / "TrayectoriaScaraCnc.txt"
+
+
+def load_xyzc(path: str | Path) -> np.ndarray:
+    """Lee TXT/CSV [X Y Z C] (mm) con cabecera; las filas NaN se conservan."""
+    return np.genfromtxt(path, skip_header=1, delimiter=None if Path(path).suffix != ".csv" else ",")
+
+
+def best_of(fn: Callable[[], object], repeat: int = 5) -> Tuple[float, object]:
+    """Ejecuta fn `repeat` veces y devuelve (mejor tiempo en s, ultimo resultado)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def report(name: str, t_ref: float, t_new: float, n: int) -> None:
+    print(
+        f"{name:<28} ref {t_ref * 1e3:9.2f} ms | nuevo {t_new * 1e3:9.2f} ms | "
+        f"x{t_ref / max(t_new, 1e-12):7.1f} | {n} puntos"
+    )
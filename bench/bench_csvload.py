@@ -0,0 +1,66 @@
+"""
+Benchmark: lectura de TXT/CSV línea a línea (Backend.loadCsvXY original) vs core.textstream.
+
+Uso: python -m bench.bench_csvload [ruta_txt] [--chunk-mb MB] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from bench._common import ROOT, best_of, report
+from core.pathbuffer import PathBuffer, PathBufferBuilder
+from core.textstream import flag_column, iter_text_chunks, read_header
+
+DEFAULT_TXT = ROOT / "docs" / "trayectorias" / "UPC-30_ESPECIAL_3D.txt"
+
+
+def load_lines(path: Path) -> PathBuffer:
+    """Parseo original: read_text + split + float() por token."""
+    raw_pts = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.replace(",", " ").split()
+        try:
+            vals = [float(p) if p.lower() != "nan" else float("nan") for p in parts]
+        except Exception:
+            continue
+        if len(vals) < 2:
+            continue
+        x, y = vals[0], vals[1]
+        raw_pts.append(None if any(v != v for v in (x, y)) else (x, y))
+    rows = np.array([(np.nan, np.nan) if p is None else p for p in raw_pts], dtype=float)
+    return PathBuffer.from_rows(rows)
+
+
+def load_chunks(path: Path, chunk_bytes: int) -> PathBuffer:
+    names, ncols = read_header(path)
+    fcol = flag_column(names, ncols)
+    cols = [0, 1] if fcol is None else [0, 1, fcol]
+    builder = PathBufferBuilder(None if fcol is None else 2)
+    for rows, _, _ in iter_text_chunks(path, chunk_bytes):
+        builder.append(np.asarray(rows[:, cols], dtype=np.float32))
+    return builder.build()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", nargs="?", default=str(DEFAULT_TXT))
+    parser.add_argument("--chunk-mb", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    path = Path(args.file)
+
+    t_ref, ref = best_of(lambda: load_lines(path), args.repeat)
+    t_new, new = best_of(lambda: load_chunks(path, int(args.chunk_mb * 1024 * 1024)), args.repeat)
+    report("csv/txt", t_ref, t_new, new.n_points)
+    print(f"  max |ref - nuevo| = {np.abs(ref.coords - new.coords).max():.3e} | paths {len(ref)} / {len(new)}")
+
+
+if __name__ == "__main__":
+    main()
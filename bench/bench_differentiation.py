@@ -0,0 +1,54 @@
+"""
+Benchmark: docs.python_matlab.differentiation (bucles) vs core.differentiation (vectorizado).
+
+Uso: python -m bench.bench_differentiation [ruta_txt] [--paso MM] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from bench._common import DEFAULT_TRAJ, best_of, load_xyzc, report
+from core.differentiation import diferenciar_trayectoria_articular
+from core.dynamics import DEFAULT_PARAMS
+from core.kinematics import inverse_batch
+from core.planner import interpolar_trayectoria_array, planificar_trayectoria_array
+from docs.python_matlab.differentiation import diferenciar_trayectoria_articular as diferenciar_ref
+
+Z_HOME = 200.0
+Z_CUT = 150.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", nargs="?", default=str(DEFAULT_TRAJ))
+    parser.add_argument("--paso", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tray_int = interpolar_trayectoria_array(load_xyzc(args.file), args.paso, Z_CUT)
+    plan = planificar_trayectoria_array(tray_int, Z_HOME, Z_CUT, args.paso)
+    art, _ = inverse_batch(plan[:, :3], DEFAULT_PARAMS["L1"], DEFAULT_PARAMS["L2"], plan[:, 3:5])
+
+    t_ref, ref = best_of(lambda: diferenciar_ref(art, args.paso), args.repeat)
+    t_new, new = best_of(lambda: diferenciar_trayectoria_articular(art, args.paso), args.repeat)
+    report("diferenciar (media movil)", t_ref, t_new, len(art))
+    print(f"  max |Tiempos ref - nuevo| = {np.max(np.abs(ref[2] - new[2])):.3e}")
+    for name, i in (("Q_dot", 0), ("Q_ddot", 1)):
+        err = np.abs(ref[i] - new[i]).max() / max(np.abs(ref[i]).max(), 1e-12)
+        print(f"  max |{name} ref - nuevo| / max|{name}| = {err:.1e}")
+    # derivative="gradient": 2do orden para espaciado no uniforme; solo difiere
+    # del original donde cambia el espaciado (arranques/paradas).
+    grad = diferenciar_trayectoria_articular(art, args.paso, derivative="gradient")
+    rel = np.abs(ref[0] - grad[0]) / np.maximum(np.abs(ref[0]).max(axis=0), 1e-12)
+    p50, p99, pmax = np.percentile(rel, [50, 99, 100])
+    print(f"  gradient: |Q_dot ref - nuevo| / max|Q_dot|: p50 {p50:.1e}, p99 {p99:.1e}, max {pmax:.1e}")
+
+    t_sg, _ = best_of(lambda: diferenciar_trayectoria_articular(art, args.paso, smoothing="savgol"), args.repeat)
+    report("diferenciar (savgol)", t_ref, t_sg, len(art))
+
+
+if __name__ == "__main__":
+    main()
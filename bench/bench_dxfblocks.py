@@ -0,0 +1,124 @@
+"""
+Benchmark: INSERT explotado entidad por entidad (virtual_entities) vs core.dxfblocks.BlockTable.
+
+Uso: python -m bench.bench_dxfblocks [--inserts N] [--repeat N]
+Arma en memoria un BLOCK de pieza (contorno con bulges, agujeros, ranuras) y lo
+inserta N veces con distinta rotación; verifica que ambos caminos den la misma
+cantidad de entidades y vértices. Aparte verifica inserts espejados (extrusión
+(0, 0, -1)) y anidados con color BYBLOCK contra la explosión de ezdxf en WCS.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import ezdxf
+import ezdxf.path
+import numpy as np
+
+from bench._common import best_of, report
+from core.dxf_converter import DxfTopologyConverter
+from core.dxfblocks import BlockTable
+
+CHORD_TOL = 0.05
+
+
+def arrayed_part(inserts: int):
+    doc = ezdxf.new()
+    part = doc.blocks.new("PIEZA", base_point=(0, 0))
+    part.add_lwpolyline([(0, 0, 0), (80, 0, 0.4), (80, 40, 0), (0, 40, -0.4)], format="xyb", close=True)
+    for i in range(6):
+        part.add_circle((10 + 12 * i, 12), 3)
+        part.add_arc((10 + 12 * i, 28), 4, 0, 180)
+        part.add_line((6 + 12 * i, 28), (14 + 12 * i, 28))
+    part.add_ellipse((40, 20), major_axis=(8, 0), ratio=0.4)
+    msp = doc.modelspace()
+    for k in range(inserts):
+        msp.add_blockref("PIEZA", (100 * (k % 20), 60 * (k // 20)), dxfattribs={"rotation": 7.5 * k})
+    return doc
+
+
+def mirrored_nested():
+    """PIEZA suelta y dentro de GRUPO, derecha y espejada; GRUPO la trae con color BYBLOCK."""
+    doc = arrayed_part(0)
+    doc.blocks.get("PIEZA").add_circle((40, 20), 2, dxfattribs={"color": 0})
+    group = doc.blocks.new("GRUPO", base_point=(10, 0))
+    group.add_blockref("PIEZA", (0, 0), dxfattribs={"color": 0})
+    group.add_blockref("PIEZA", (200, 0), dxfattribs={"rotation": 30, "extrusion": (0, 0, -1), "color": 0})
+    msp = doc.modelspace()
+    msp.add_blockref("PIEZA", (0, 100), dxfattribs={"extrusion": (0, 0, -1)})
+    msp.add_blockref("PIEZA", (50, -80), dxfattribs={"rotation": 40, "xscale": 2, "extrusion": (0, 0, -1)})
+    msp.add_blockref("GRUPO", (-300, 0), dxfattribs={"rotation": 15, "color": 5})
+    msp.add_blockref("GRUPO", (300, 300), dxfattribs={"rotation": -20, "extrusion": (0, 0, -1), "color": 5})
+    msp.add_blockref("PIEZA", (0, -300), dxfattribs={"extrusion": (0, 0, -1), "rotation": 10}).grid(
+        size=(2, 3), spacing=(60, 120)
+    )
+    return doc
+
+
+def exploded_wcs(insert) -> np.ndarray:
+    """Vértices en WCS de la explosión recursiva de ezdxf (resuelve el OCS de cada entidad)."""
+    if insert.mcount > 1:
+        return np.concatenate([exploded_wcs(e) for e in insert.multi_insert()])
+    pts = []
+    for e in insert.virtual_entities():
+        if e.dxftype() == "INSERT":
+            pts.append(exploded_wcs(e))
+        else:
+            pts.append(np.array([(v.x, v.y) for v in ezdxf.path.make_path(e).flattening(CHORD_TOL)]))
+    return np.concatenate(pts)
+
+
+def check_mirrored_nested() -> None:
+    doc = mirrored_nested()
+    table = BlockTable(DxfTopologyConverter._entity_to_coords)  # noqa: SLF001
+    table.load_document(doc)
+    for insert in doc.modelspace():
+        coords, _, colors, _, _ = table.instances(insert, CHORD_TOL)
+        ref = exploded_wcs(insert)
+        box, ref_box = np.r_[coords.min(0), coords.max(0)], np.r_[ref.min(0), ref.max(0)]
+        assert np.allclose(box, ref_box, atol=2 * CHORD_TOL), (insert.dxf.name, box, ref_box)
+        # BYBLOCK (0) anidado termina con el color del INSERT de afuera
+        assert 0 not in colors
+        if insert.dxf.name == "GRUPO":
+            assert 5 in colors
+    print("  espejados/anidados: bounding box = explosión ezdxf (WCS), BYBLOCK heredado")
+
+
+def exploded(doc) -> list:
+    """Camino directo: cada INSERT se explota y cada entidad virtual se discretiza."""
+    parts = []
+    for insert in doc.modelspace():
+        for e in insert.virtual_entities():
+            g = DxfTopologyConverter._entity_to_coords(e, CHORD_TOL)  # noqa: SLF001
+            if g is not None:
+                parts.extend(g["parts"])
+    return parts
+
+
+def cached(doc) -> list:
+    table = BlockTable(DxfTopologyConverter._entity_to_coords)  # noqa: SLF001
+    table.load_document(doc)
+    packed = [table.instances(insert, CHORD_TOL) for insert in doc.modelspace()]
+    return [(coords, offsets) for coords, offsets, _, _, _ in packed]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--inserts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    doc = arrayed_part(args.inserts)
+    t_ref, ref = best_of(lambda: exploded(doc), args.repeat)
+    t_new, new = best_of(lambda: cached(doc), args.repeat)
+    n_points = sum(len(coords) for coords, _ in new)
+    report(f"{args.inserts} INSERT", t_ref, t_new, n_points)
+    assert sum(len(offsets) - 1 for _, offsets in new) == len(ref)
+    assert n_points == sum(len(p) for p in ref)
+    assert np.isfinite(np.concatenate([coords for coords, _ in new])).all()
+    check_mirrored_nested()
+
+
+if __name__ == "__main__":
+    main()
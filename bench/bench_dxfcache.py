@@ -0,0 +1,49 @@
+"""
+Benchmark: carga DXF completa (conversor + preview) vs acierto en core.dxfcache.
+
+Uso: python -m bench.bench_dxfcache [ruta_dxf] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from bench._common import ROOT, best_of, report
+from core.dxf_converter import DxfTopologyConverter
+from core.dxfcache import DxfCache
+from core.pathbuffer import PathBuffer
+from core.preview import image_to_png, render_preview
+
+DEFAULT_DXF = ROOT / "docs" / "dxf_files" / "UPC-30_ESPECIAL.dxf"
+PARAMS = {"tol_topo": 1.5, "chord_tol": 0.1}  # valores del Backend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", nargs="?", default=str(DEFAULT_DXF))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    def cold():
+        conv = DxfTopologyConverter(args.file, **PARAMS).process()
+        paths = PathBuffer.from_geoms(conv._geoms_final)  # noqa: SLF001
+        return paths, image_to_png(render_preview(paths, Path(args.file).name)), conv.travel_length
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DxfCache(tmp)
+        t_cold, (paths, preview, travel) = best_of(cold, 1)
+        cache.put(cache.key(args.file, PARAMS), paths, preview, travel)
+        t_hit, hit = best_of(lambda: cache.get(cache.key(args.file, PARAMS)), args.repeat)
+        t_key, _ = best_of(lambda: cache.key(args.file, PARAMS), args.repeat)
+        report("dxf cache", t_cold, t_hit, paths.n_points)
+        print(f"  hash del DXF {t_key * 1e3:.2f} ms | entrada {cache.size_bytes() / 1024:.0f} KiB")
+        assert np.array_equal(hit["paths"].coords, paths.coords)
+        assert np.array_equal(hit["paths"].flags, paths.flags)
+
+
+if __name__ == "__main__":
+    main()
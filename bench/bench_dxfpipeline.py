@@ -0,0 +1,101 @@
+"""
+Benchmark: etapas snap + polygonize del conversor, objeto por objeto vs shapely 2 vectorizado.
+
+Uso: python -m bench.bench_dxfpipeline [--grid N] [--repeat N] [--workers N]
+Genera una grilla N x N de cuadrados dibujados con 4 LINE cada uno (extremos
+con ruido menor a la tolerancia) y verifica que ambos caminos den lo mismo.
+También mide core.topology.process_categories con un pool de `workers`
+procesos (ya arrancado) frente al mismo trabajo en serie.
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import List
+
+import numpy as np
+import shapely
+from shapely.geometry import LineString, MultiLineString
+from shapely.ops import linemerge, polygonize, unary_union
+
+from bench._common import best_of
+from core.snapping import weld_endpoints
+from core.topology import available_cpus, pack_segments, process_categories, process_segments
+
+TOL = 0.05
+
+
+def square_segments(grid: int) -> List[np.ndarray]:
+    rng = np.random.default_rng(0)
+    corners = np.array([[0, 0], [8, 0], [8, 8], [0, 8], [0, 0]], dtype=float)
+    segs = []
+    for ix in range(grid):
+        for iy in range(grid):
+            c = corners + (ix * 10.0, iy * 10.0)
+            for k in range(4):
+                segs.append(c[k : k + 2] + rng.uniform(-TOL / 4, TOL / 4, (2, 2)))
+    return segs
+
+
+def reference(segs: List[np.ndarray]):
+    """Camino anterior: una LineString por entidad, snap por objeto, dedupe por WKT."""
+    geoms = [LineString(s) for s in segs]
+    arr = np.asarray(geoms, dtype=object)
+    endpoints = np.empty((2 * len(geoms), 2))
+    endpoints[0::2] = shapely.get_coordinates(shapely.get_point(arr, 0))
+    endpoints[1::2] = shapely.get_coordinates(shapely.get_point(arr, -1))
+    labels, centroids = weld_endpoints(endpoints, TOL)
+    snapped = []
+    for i, g in enumerate(geoms):
+        coords = list(g.coords)
+        coords[0] = tuple(centroids[labels[2 * i]])
+        coords[-1] = tuple(centroids[labels[2 * i + 1]])
+        snapped.append(LineString(coords))
+    merged = linemerge(unary_union(snapped))
+    merged = list(merged.geoms) if isinstance(merged, MultiLineString) else [merged]
+    polys = list(polygonize(merged))
+    diff = unary_union(merged).difference(unary_union(polys))
+    opens = [g for g in getattr(diff, "geoms", [diff]) if not g.is_empty]
+    uniq, seen = [], set()
+    for p in polys:
+        if p.exterior.wkt not in seen:
+            seen.add(p.exterior.wkt)
+            uniq.append(p)
+    return uniq, opens
+
+
+def vectorized(segs: List[np.ndarray]):
+    return process_segments(pack_segments(segs), TOL)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grid", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=available_cpus())
+    args = parser.parse_args()
+
+    segs = square_segments(args.grid)
+    t_ref, (ref_polys, ref_opens) = best_of(lambda: reference(segs), args.repeat)
+    t_new, (polys, opens) = best_of(lambda: vectorized(segs), args.repeat)
+    print(
+        f"{'snap + polygonize':<28} ref {t_ref * 1e3:9.2f} ms | nuevo {t_new * 1e3:9.2f} ms | "
+        f"x{t_ref / max(t_new, 1e-12):7.1f} | {len(segs)} entidades"
+    )
+    assert len(polys) == len(ref_polys) == args.grid**2 and len(opens) == len(ref_opens)
+    assert all(a.equals_exact(b, 0.0) for a, b in zip(polys, ref_polys))
+
+    if args.workers > 1:
+        seg = pack_segments(segs)
+        process_categories([seg], TOL, args.workers)  # arranque del pool
+        t_par, [(par_polys, _)] = best_of(lambda: process_categories([seg], TOL, args.workers), args.repeat)
+        name = f"pool de {args.workers} procesos"
+        print(
+            f"{name:<28} ref {t_new * 1e3:9.2f} ms | nuevo {t_par * 1e3:9.2f} ms | "
+            f"x{t_new / max(t_par, 1e-12):7.1f} | {len(segs)} entidades"
+        )
+        assert len(par_polys) == len(polys)
+
+
+if __name__ == "__main__":
+    main()
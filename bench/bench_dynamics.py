@@ -0,0 +1,72 @@
+"""
+Benchmark: dinámica inversa punto a punto (bucle de Dinamica.m) vs core.dynamics.torques_batch.
+
+Uso: python -m bench.bench_dynamics [ruta_txt] [--paso MM] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from bench._common import DEFAULT_TRAJ, best_of, load_xyzc, report
+from core.dynamics import make_params, torques_batch
+from core.kinematics import inverse_batch
+from core.planner import interpolar_trayectoria_array, planificar_trayectoria_array
+from docs.python_matlab.differentiation import diferenciar_trayectoria_articular
+from docs.python_matlab.kinematics import jacobiano
+
+Z_HOME = 200.0
+Z_CUT = 150.0
+
+
+def torques_loop(q: np.ndarray, dq: np.ndarray, ddq: np.ndarray, p: dict) -> np.ndarray:
+    """Torques.m + ModeloDin.m literal, un punto por iteración."""
+    l1, l2 = p["L1"], p["L2"]
+    lc2, lc3 = 0.3 * l1, 0.3 * l2
+    m_total = p["m1"] + p["m2"] + p["m3"]
+    b = np.asarray(p["B"], dtype=float)
+    f_ext = np.asarray(p["F_ext"], dtype=float)
+    out = np.empty_like(q)
+    for i in range(len(q)):
+        c3, s3 = np.cos(q[i, 2]), np.sin(q[i, 2])
+        mass = np.zeros((3, 3))
+        mass[0, 0] = m_total
+        mass[1, 1] = p["I2"] + p["I3"] + p["m2"] * lc2**2 + p["m3"] * (l1**2 + lc3**2 + 2 * l1 * lc3 * c3)
+        mass[1, 2] = mass[2, 1] = p["I3"] + p["m3"] * (lc3**2 + l1 * lc3 * c3)
+        mass[2, 2] = p["I3"] + p["m3"] * lc3**2
+        h = -p["m3"] * l1 * lc3 * s3
+        cor = np.zeros((3, 3))
+        cor[1, 1] = h * dq[i, 2]
+        cor[1, 2] = h * (dq[i, 1] + dq[i, 2])
+        cor[2, 1] = -h * dq[i, 1]
+        grav = np.array([m_total * p["g"], 0.0, 0.0])
+        jac = jacobiano(q[i, 0], q[i, 1], q[i, 2], l1, l2)
+        out[i] = mass @ ddq[i] + cor @ dq[i] + grav + b * dq[i] + jac.T @ f_ext
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", nargs="?", default=str(DEFAULT_TRAJ))
+    parser.add_argument("--paso", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    p = make_params()
+    tray_int = interpolar_trayectoria_array(load_xyzc(args.file), args.paso, Z_CUT)
+    plan = planificar_trayectoria_array(tray_int, Z_HOME, Z_CUT, args.paso)
+    art, _ = inverse_batch(plan[:, :3], p["L1"], p["L2"], plan[:, 3:5])
+    q_dot, q_ddot, _ = diferenciar_trayectoria_articular(art, args.paso)
+    q = art[:, :3]
+
+    t_ref, ref = best_of(lambda: torques_loop(q, q_dot, q_ddot, p), args.repeat)
+    t_new, tau = best_of(lambda: torques_batch(q, q_dot, q_ddot, p), args.repeat)
+    report("torques", t_ref, t_new, len(q))
+    print(f"  max |loop - batch| = {np.max(np.abs(ref - tau)):.3e}")
+    print(f"  pico |tau| = {np.abs(tau).max(axis=0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: jerarquía de contención O(n²) (docs/dxf_hierarchy.py) vs core.hierarchy (STRtree).
+
+Uso: python -m bench.bench_hierarchy [--grid N] [--repeat N]
+Genera una grilla N x N de piezas, cada una con un agujero y una isla dentro
+(3·N² polígonos anidados), y verifica que padres y grupos coincidan.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+import shapely
+
+from bench._common import best_of
+from core.hierarchy import build_supergroups
+from docs.dxf_hierarchy import DxfHierarchyConverter
+
+
+def nested_squares(grid: int) -> list:
+    polys = []
+    for ix in range(grid):
+        for iy in range(grid):
+            x, y = ix * 12.0, iy * 12.0
+            polys.append(shapely.box(x, y, x + 10, y + 10))
+            polys.append(shapely.box(x + 2, y + 2, x + 8, y + 8))
+            polys.append(shapely.box(x + 4, y + 4, x + 6, y + 6))
+    rng = np.random.default_rng(0)
+    return [polys[i] for i in rng.permutation(len(polys))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--grid", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    polys = nested_squares(args.grid)
+    t_ref, ref = best_of(lambda: DxfHierarchyConverter._build_supergroups(polys), 1)  # noqa: SLF001
+    t_new, new = best_of(lambda: build_supergroups(polys), args.repeat)
+    print(
+        f"{'jerarquia de contencion':<28} ref {t_ref * 1e3:9.2f} ms | nuevo {t_new * 1e3:9.2f} ms | "
+        f"x{t_ref / max(t_new, 1e-12):7.1f} | {len(polys)} poligonos"
+    )
+    assert list(ref[1]) == new[1]
+    assert ref[0] == new[0]
+
+
+if __name__ == "__main__":
+    main()
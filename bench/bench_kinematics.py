@@ -0,0 +1,49 @@
+"""
+Benchmark: core.kinematics escalar (inverse/forward) vs batch (inverse_batch/forward_batch).
+
+Uso: python -m bench.bench_kinematics [ruta_txt] [--repeat N]
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import numpy as np
+
+from bench._common import DEFAULT_TRAJ, best_of, load_xyzc, report
+from core.kinematics import forward, forward_batch, inverse, inverse_batch
+
+# Parametros de MainScaraMulticuerpo.m
+L1 = 0.650
+L2 = 0.600
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", nargs="?", default=str(DEFAULT_TRAJ))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = load_xyzc(args.file)
+    data = data[~np.isnan(data[:, :3]).any(axis=1)]
+    pos = data[:, :3] / 1000.0
+    aux = np.column_stack([data[:, 3], np.zeros(len(data))])
+    pos_list = [tuple(p) for p in pos.tolist()]
+    aux_list = [tuple(a) for a in aux.tolist()]
+
+    t_ref, ref = best_of(lambda: inverse(pos_list, L1, L2, aux_list), args.repeat)
+    t_new, (art, unreachable) = best_of(lambda: inverse_batch(pos, L1, L2, aux), args.repeat)
+    report("inverse", t_ref, t_new, len(pos))
+    err = np.max(np.abs(np.asarray(ref) - art)) if len(pos) else 0.0
+    print(f"  max |inverse - inverse_batch| = {err:.3e}, inalcanzables = {int(unreachable.sum())}")
+
+    q = art[:, :3]
+    q_list = [tuple(r) for r in q.tolist()]
+    t_ref, ref = best_of(lambda: [forward(r, L1, L2) for r in q_list], args.repeat)
+    t_new, xyz = best_of(lambda: forward_batch(q, L1, L2), args.repeat)
+    report("forward", t_ref, t_new, len(q))
+    print(f"  max |forward_batch(inverse_batch) - pos| = {np.max(np.abs(xyz - pos)):.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: core.planner de referencia (listas Python) vs rutas NumPy.
+
+Uso: python -m bench.bench_planner [archivos...] [--paso MM] [--repeat N]
+Por defecto recorre docs/trayectorias/*.txt; los archivos X,Y se completan con Z=0, FLAG=1.
+Verifica ademas que las marcas de tiempo (core.timing) no superen la velocidad
+planificada, tambien a velocidades bajas.
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+from bench._common import ROOT, best_of, report
+from core.planner import (
+    interpolar_trayectoria,
+    interpolar_trayectoria_array,
+    planificar_trayectoria,
+    planificar_trayectoria_array,
+)
+from core.timing import V_MIN, tiempos_trayectoria
+from core.trajfile import FLAG_COLUMNS, read_text_rows
+
+Z_CUT = 150.0
+Z_HOME = 200.0
+
+
+def load_rows(path: Path) -> np.ndarray:
+    """[X Y Z FLAG] en mm; sin columna Z se usa 0 y sin columna de flag se usa 1."""
+    rows, columns = read_text_rows(path)
+    names = [c.upper() for c in columns]
+    sep = np.isnan(rows[:, :2]).any(axis=1)
+    z = rows[:, names.index("Z")] if "Z" in names else np.zeros(len(rows))
+    flag_col = next((names.index(c) for c in FLAG_COLUMNS if c in names), None)
+    flag = rows[:, flag_col] if flag_col is not None else np.ones(len(rows))
+    out = np.column_stack([rows[:, :2], z, flag])
+    out[sep] = np.nan
+    return out
+
+
+def to_groups(rows: np.ndarray) -> list:
+    sep = np.isnan(rows).any(axis=1)
+    bounds = np.flatnonzero(np.diff(np.concatenate([[1], sep, [1]]).astype(int)))
+    return [rows[a:b].tolist() for a, b in zip(bounds[::2], bounds[1::2])]
+
+
+def check_timing(plan: np.ndarray) -> float:
+    """Duracion del plan; falla si algun tramo se recorre mas rapido que lo planificado."""
+    t = tiempos_trayectoria(plan)
+    ds = np.linalg.norm(np.diff(plan[:, :3], axis=0), axis=1)
+    v = np.maximum(plan[:-1, 4], plan[1:, 4])
+    mov = (v > V_MIN * (1 + 1e-9)) & (ds > 0)
+    assert (ds[mov] <= v[mov] * np.diff(t)[mov] * (1 + 1e-9)).all()
+    return float(t[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--paso", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    files = [Path(f) for f in args.files] or sorted((ROOT / "docs" / "trayectorias").glob("*.txt"))
+
+    for path in files:
+        rows = load_rows(path)
+        groups = to_groups(rows)
+        print(f"== {path.name}")
+        t_ref, ref = best_of(lambda: interpolar_trayectoria(groups, args.paso, Z_CUT), args.repeat)
+        t_new, new = best_of(lambda: interpolar_trayectoria_array(rows, args.paso, Z_CUT), args.repeat)
+        report("interpolar_trayectoria", t_ref, t_new, len(new))
+        ref = np.asarray(ref, dtype=float).reshape(-1, 4)
+        err = np.nanmax(np.abs(ref - new)) if ref.shape == new.shape and len(ref) else float("nan")
+        print(f"  max |ref - array| = {err:.3e}")
+
+        tray_int = new.tolist()
+        t_ref, ref = best_of(lambda: planificar_trayectoria(tray_int, Z_HOME, Z_CUT, args.paso), args.repeat)
+        t_new, new = best_of(lambda: planificar_trayectoria_array(new, Z_HOME, Z_CUT, args.paso), args.repeat)
+        report("planificar_trayectoria", t_ref, t_new, len(new))
+        ref = np.asarray(ref, dtype=float).reshape(-1, 5)
+        err = np.abs(ref - new).max() if ref.shape == new.shape and len(ref) else float("nan")
+        print(f"  max |ref - array| = {err:.3e}")
+
+        for speed in (600.0, 15000.0):
+            plan = planificar_trayectoria_array(
+                tray_int, Z_HOME, Z_CUT, args.paso, speed_cut=speed, speed_traslado=speed
+            )
+            print(f"  tiempos a {speed:.0f} mm/min: {check_timing(plan):.1f} s, ds/dt <= v planificada")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,24 +2,56 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from PySide6.QtCore import QObject, QUrl, Signal, Slot
+from PySide6.QtCore import QByteArray, QObject, QThreadPool, QUrl, Signal, Slot
+from PySide6.QtGui import QImage
 
-from core.dxf_converter import DxfTopologyConverter
+from core.dxfcache import DxfCache
+from core.pathbuffer import PathBuffer
+from core.pathlod import PathPyramid
+from core.preview import PreviewImageProvider
+from core.workers import CsvLoadWorker, DxfLoadWorker, PathLodWorker, TrajLoadWorker
 
 
 class Backend(QObject):
-    pointsReady = Signal(list)
+    # coords float32 (x,y), offsets int32 (npaths+1), flags int32 (npaths); ver core.pathbuffer
+    pathReady = Signal(QByteArray, QByteArray, QByteArray)
+    # mismo formato; reemplaza el nivel de detalle sin reencuadrar la vista
+    pathLevelReady = Signal(QByteArray, QByteArray, QByteArray)
+    # mismo formato; solo los paths nuevos de una carga en curso, se agregan a los ya enviados
+    pathChunkReady = Signal(QByteArray, QByteArray, QByteArray)
     boundsReady = Signal(float, float, float, float)
-    imageReady = Signal(str)
+    imageReady = Signal(str)  # image://preview/<id> (ver preview_provider)
     statusMessage = Signal(str)
+    loadProgress = Signal(str, float)  # etapa, fraccion 0..1
+    busyChanged = Signal(bool)
 
     def __init__(self):
         super().__init__()
-        self.chord_tol = 1.5  # mm
+        self.snap_tol = 1.5  # mm, union de extremos
+        self.chord_tol = 0.1  # mm, error de cuerda al discretizar curvas
+        self.dxf_cache: DxfCache | None = DxfCache()  # None = procesar siempre
+        self.dxf_stream_bytes: int | None = 64 * 1024 * 1024  # DXF desde este tamaño se leen en streaming
+        # registrar en el engine: engine.addImageProvider(PROVIDER_ID, backend.preview_provider)
+        self.preview_provider = PreviewImageProvider()
+        self._preview_seq = 0
+        self._pool = QThreadPool(self)
+        self._job_id = 0
+        self._workers: dict[int, DxfLoadWorker | CsvLoadWorker | TrajLoadWorker] = {}
+        self._partial_sent = False  # la carga CSV en curso ya envio su primer trozo
+        self._busy = False
+        # Piramide LOD del trabajo actual (ver core.pathlod)
+        self._pyramid: PathPyramid | None = None
+        self._lod_job = 0
+        self._lod_workers: dict[int, PathLodWorker] = {}
+        self._lod_wanted: int | None = None
+        self._lod_sent = -1
 
     @Slot(str, float, float)
     def loadDxf(self, url: str, viewport_w: float = 520.0, viewport_h: float = 520.0) -> None:
-        """Procesa DXF y emite puntos sin escalar (x,y en mm) con flags y breaks."""
+        """
+        Procesa DXF en un worker y emite los paths sin escalar (x,y en mm) con flags.
+        Una carga nueva cancela la anterior; solo se emiten resultados del ultimo job.
+        """
         if not url:
             self.statusMessage.emit("Ruta DXF vacia.")
             return
@@ -28,42 +60,41 @@ class Backend(QObject):
         if not path.exists():
             self.statusMessage.emit(f"DXF no encontrado: {path}")
             return
-        try:
-            conv = DxfTopologyConverter(path, tol_topo=self.chord_tol).process()
-        except Exception as exc:
-            self.statusMessage.emit(f"Error procesando DXF: {exc}")
-            return
-
-        shapes = []
-        for geom, flag in conv._geoms_final:  # noqa: SLF001
-            if geom is None:
-                continue
-            if geom.geom_type == "Polygon":
-                rings = [geom.exterior] + list(geom.interiors)
-                for r in rings:
-                    shapes.append((list(r.coords), flag))
-            else:
-                shapes.append((list(geom.coords), flag))
-
-        if not shapes:
-            self.statusMessage.emit("DXF sin geometria procesada.")
-            return
 
-        qpoints = []
-        for idx, (poly, flag) in enumerate(shapes):
-            if idx > 0:
-                qpoints.append({"break": True})
-            for x, y in poly:
-                qpoints.append({"x": x, "y": y, "flag": int(flag)})
-
-        self._emit_bounds(qpoints)
-        self._emit_preview_png(qpoints, path)
-        self.pointsReady.emit(qpoints)
-        self.statusMessage.emit(f"Cargado DXF topo ({len(qpoints)} puntos): {path.name}")
+        self.cancelLoad()
+        self._job_id += 1
+        streaming = self.dxf_stream_bytes is not None and path.stat().st_size >= self.dxf_stream_bytes
+        worker = DxfLoadWorker(self._job_id, path, self.snap_tol, self.chord_tol, self.dxf_cache, streaming)
+        worker.signals.progress.connect(self._on_load_progress)
+        worker.signals.finished.connect(self._on_dxf_loaded)
+        worker.signals.failed.connect(self._on_load_failed)
+        worker.signals.cancelled.connect(self._on_load_cancelled)
+        self._workers[self._job_id] = worker
+        self._reset_pyramid()
+        self._set_busy(True)
+        self.statusMessage.emit(f"Procesando DXF: {path.name}")
+        self._pool.start(worker)
+
+    @Slot()
+    def cancelLoad(self) -> None:
+        """
+        Cancela la carga DXF/CSV en curso (si existe). El job_id avanza para que
+        un resultado que ya estaba saliendo (p.ej. un acierto de cache) se descarte.
+        """
+        worker = self._workers.get(self._job_id)
+        if worker is not None and not worker.is_cancelled():
+            worker.cancel()
+            self._job_id += 1
+            self._set_busy(False)
 
     @Slot(str, float, float)
     def loadCsvXY(self, url: str, viewport_w: float = 520.0, viewport_h: float = 520.0) -> None:
-        """Lee CSV/TXT con columnas X,Y y emite puntos sin escalar."""
+        """
+        Lee CSV/TXT (X Y [Z] [flag], filas NaN separadoras) o .traj en un
+        worker y emite los paths sin escalar. Mientras lee un CSV/TXT, cada
+        trozo llega grueso a la vista; al terminar se emiten los paths
+        completos con su piramide LOD.
+        """
         if not url:
             self.statusMessage.emit("Ruta CSV vacia.")
             return
@@ -72,114 +103,146 @@ class Backend(QObject):
         if not path.exists():
             self.statusMessage.emit(f"CSV no encontrado: {path}")
             return
-
-        lines = path.read_text(encoding="utf-8").splitlines()
-        raw_pts = []
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            parts = line.replace(",", " ").split()
-            try:
-                vals = [float(p) if p.lower() != "nan" else float("nan") for p in parts]
-            except Exception:
-                continue
-            if len(vals) < 2:
-                continue
-            x, y = vals[0], vals[1]
-            if any(v != v for v in (x, y)):
-                raw_pts.append(None)
-            else:
-                raw_pts.append((x, y))
-
-        valid = [(x, y) for p in raw_pts if p is not None for x, y in [p]]
-        if not valid:
-            self.statusMessage.emit("CSV sin puntos numericos.")
+        self.cancelLoad()
+        self._job_id += 1
+        traj = path.suffix.lower() == ".traj"
+        worker = TrajLoadWorker(self._job_id, path) if traj else CsvLoadWorker(self._job_id, path)
+        worker.signals.progress.connect(self._on_load_progress)
+        worker.signals.partial.connect(self._on_load_partial)
+        worker.signals.finished.connect(self._on_csv_loaded)
+        worker.signals.failed.connect(self._on_load_failed)
+        worker.signals.cancelled.connect(self._on_load_cancelled)
+        self._workers[self._job_id] = worker
+        self._partial_sent = False
+        self._reset_pyramid()
+        self._set_busy(True)
+        self.statusMessage.emit(f"Leyendo {'TRAJ' if traj else 'CSV'}: {path.name}")
+        self._pool.start(worker)
+
+    @Slot(float)
+    def requestPathLevel(self, mm_per_px: float) -> None:
+        """
+        Viewer2D informa su escala (mm por px); se envia el nivel de la
+        piramide que corresponde o, si aun no esta listo, el mas cercano.
+        """
+        if self._pyramid is None:
             return
-
-        qpoints = []
-        first = True
-        for p in raw_pts:
-            if p is None:
-                first = True
-                continue
-            x, y = p
-            if not first:
-                pass
-            else:
-                if qpoints:
-                    qpoints.append({"break": True})
-                first = False
-            qpoints.append({"x": x, "y": y})
-
-        self._emit_bounds(qpoints)
-        self._emit_preview_png(qpoints, path)
-        self.pointsReady.emit(qpoints)
-        self.statusMessage.emit(f"Cargado CSV ({len(qpoints)} puntos): {path.name}")
+        self._lod_wanted = self._pyramid.level_for(mm_per_px)
+        self._send_level(self._pyramid.available(self._lod_wanted))
 
     # Internos
-    def _emit_bounds(self, qpoints: list) -> None:
-        xs = []
-        ys = []
-        for p in qpoints:
-            if not isinstance(p, dict):
-                continue
-            x = p.get("x")
-            y = p.get("y")
-            if x is None or y is None:
-                continue
-            xs.append(x)
-            ys.append(y)
-        if not xs or not ys:
+    def _set_busy(self, busy: bool) -> None:
+        if busy != self._busy:
+            self._busy = busy
+            self.busyChanged.emit(busy)
+
+    @Slot(int, str, float)
+    def _on_load_progress(self, job_id: int, stage: str, fraction: float) -> None:
+        if job_id == self._job_id:
+            self.loadProgress.emit(stage, fraction)
+
+    @Slot(int, object)
+    def _on_dxf_loaded(self, job_id: int, result: dict) -> None:
+        self._workers.pop(job_id, None)
+        if job_id != self._job_id:
             return
-        self.boundsReady.emit(float(min(xs)), float(max(xs)), float(min(ys)), float(max(ys)))
+        paths = result["paths"]
+        bounds = result["bounds"]
+        if bounds is not None:
+            self.boundsReady.emit(*bounds)
+        self._emit_preview(result["preview"])
+        self._emit_paths(result["pyramid"])
+        self.loadProgress.emit("done", 1.0)
+        self._set_busy(False)
+        self.statusMessage.emit(f"Cargado DXF topo ({paths.n_points} puntos): {result['path'].name}")
+
+    @Slot(int, object)
+    def _on_load_partial(self, job_id: int, paths: PathBuffer) -> None:
+        if job_id != self._job_id:
+            return
+        # el primer trozo reemplaza la vista; los siguientes solo se agregan
+        coords, offsets, flags = paths.as_bytes()
+        signal = self.pathChunkReady if self._partial_sent else self.pathReady
+        self._partial_sent = True
+        signal.emit(QByteArray(coords), QByteArray(offsets), QByteArray(flags))
+
+    @Slot(int, object)
+    def _on_csv_loaded(self, job_id: int, result: dict) -> None:
+        self._workers.pop(job_id, None)
+        if job_id != self._job_id:
+            return
+        self._partial_sent = False
+        paths = result["paths"]
+        if result["bounds"] is not None:
+            self.boundsReady.emit(*result["bounds"])
+        self._emit_preview(result["preview"])
+        self._emit_paths(result["pyramid"])
+        self.loadProgress.emit("done", 1.0)
+        self._set_busy(False)
+        kind = "TRAJ" if result["path"].suffix.lower() == ".traj" else "CSV"
+        self.statusMessage.emit(f"Cargado {kind} ({paths.n_points} puntos): {result['path'].name}")
+
+    @Slot(int, str)
+    def _on_load_failed(self, job_id: int, message: str) -> None:
+        self._workers.pop(job_id, None)
+        if job_id != self._job_id:
+            return
+        self._set_busy(False)
+        self.statusMessage.emit(message)
+
+    @Slot(int)
+    def _on_load_cancelled(self, job_id: int) -> None:
+        worker = self._workers.pop(job_id, None)
+        if worker is not None:
+            self.statusMessage.emit(f"Carga cancelada: {worker.path.name}")
+
+    def _reset_pyramid(self) -> None:
+        worker = self._lod_workers.get(self._lod_job)
+        if worker is not None:
+            worker.cancel()
+        self._lod_job += 1
+        self._pyramid = None
+
+    def _emit_paths(self, pyramid: PathPyramid) -> None:
+        """
+        Emite el nivel grueso (ya calculado en el worker de carga) y calcula el
+        resto en el pool.
+        """
+        self._reset_pyramid()
+        self._pyramid = pyramid
+        self._lod_wanted = None
+        self._lod_sent = 0
+        coords, offsets, flags = self._pyramid.coarse.as_bytes()
+        self.pathReady.emit(QByteArray(coords), QByteArray(offsets), QByteArray(flags))
+        if self._pyramid.pending():
+            worker = PathLodWorker(self._lod_job, self._pyramid)
+            worker.signals.level.connect(self._on_lod_level)
+            worker.signals.done.connect(self._on_lod_done)
+            self._lod_workers[self._lod_job] = worker
+            self._pool.start(worker)
+
+    @Slot(int, int, object)
+    def _on_lod_level(self, job_id: int, index: int, paths: PathBuffer) -> None:
+        if job_id != self._lod_job or self._pyramid is None:
+            return
+        self._pyramid.set_level(index, paths)
+        if self._lod_wanted is not None:
+            self._send_level(self._pyramid.available(self._lod_wanted))
 
-    def _emit_preview_png(self, qpoints: list, src_path: Path) -> None:
-        try:
-            import matplotlib
+    @Slot(int)
+    def _on_lod_done(self, job_id: int) -> None:
+        self._lod_workers.pop(job_id, None)
 
-            matplotlib.use("Agg")  # backend sin GUI
-            import matplotlib.pyplot as plt
-        except Exception as exc:  # pragma: no cover - fallback si no hay matplotlib
-            self.statusMessage.emit(f"Matplotlib no disponible: {exc}")
+    def _send_level(self, index: int) -> None:
+        if index == self._lod_sent:
             return
+        self._lod_sent = index
+        coords, offsets, flags = self._pyramid.levels[index].as_bytes()
+        self.pathLevelReady.emit(QByteArray(coords), QByteArray(offsets), QByteArray(flags))
 
-        segs = []
-        cur_x = []
-        cur_y = []
-        cur_flag = 0
-        for p in qpoints:
-            if p.get("break"):
-                if cur_x and cur_y:
-                    segs.append((cur_x, cur_y, cur_flag))
-                cur_x, cur_y, cur_flag = [], [], 0
-                continue
-            x = p.get("x")
-            y = p.get("y")
-            if x is None or y is None:
-                continue
-            cur_flag = int(p.get("flag", 0))
-            cur_x.append(x)
-            cur_y.append(y)
-        if cur_x and cur_y:
-            segs.append((cur_x, cur_y, cur_flag))
-        if not segs:
+    def _emit_preview(self, image: QImage | None) -> None:
+        """Publica el QImage en el provider con un id nuevo (nunca se reutiliza)."""
+        if image is None:
             return
-
-        fig, ax = plt.subplots(figsize=(9, 5))
-        for xs, ys, flag in segs:
-            color = "#22c55e" if flag == 1 else "#f59e0b"
-            ax.fill(xs, ys, color=color, alpha=0.25)
-            ax.plot(xs, ys, color=color, lw=1.6 if flag == 1 else 1.2)
-        ax.set_aspect("equal", adjustable="box")
-        ax.set_xlabel("X (mm)")
-        ax.set_ylabel("Y (mm)")
-        ax.grid(True, alpha=0.35)
-        ax.set_title(src_path.name)
-
-        out_dir = Path("docs/tmp")
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / "preview.png"
-        fig.savefig(out_path, dpi=180, bbox_inches="tight")
-        plt.close(fig)
-        self.imageReady.emit(str(out_path.resolve()))
+        self._preview_seq += 1
+        self.imageReady.emit(self.preview_provider.add(f"{self._job_id}-{self._preview_seq}", image))
@@ -7,35 +7,91 @@ from __future__ import annotations
 
 import argparse
 from pathlib import Path
-from typing import Iterable, List, Sequence, Tuple
+from typing import Callable, Iterable, List, Sequence, Tuple
 
 import ezdxf
+import ezdxf.path
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.interpolate import splev, splprep
-from shapely.geometry import LineString, MultiLineString, Polygon
-from shapely.ops import linemerge, polygonize, unary_union
-from sklearn.cluster import DBSCAN
+import shapely
+from shapely.geometry import LineString, Polygon
+
+from core.dxfblocks import BlockTable
+from core.dxfstream import iter_modelspace
+from core.hierarchy import containment_parents
+from core.ordering import greedy_nn_order, improve_entries, sequence_entries, travel_length, two_opt
+from core.topology import EMPTY_SEGMENTS, Segments, SegmentsBuilder, process_categories, take_segments
+from core.trajfile import write_traj_blocks
+
+# Modos de secuenciado: por centroide (historico) o por punto de entrada/salida.
+SEQUENCING_MODES: Tuple[str, ...] = ("centroid", "entry")
+
+# Etapas reportadas por process(progress=...), en orden de ejecucion.
+STAGES: Tuple[str, ...] = ("read", "snap", "polygonize", "order")
+ProgressCallback = Callable[[str, float], None]
+
+# Durante la lectura se revisa la cancelacion cada tantas entidades.
+STREAM_REPORT_EVERY = 50000
+
+
+def _arc_segments(radius: float, sweep: float, chord_tol: float, min_segments: int) -> int:
+    """Segmentos para un arco de `sweep` rad con flecha (sagitta) <= chord_tol."""
+    if radius <= 0 or sweep <= 0:
+        return min_segments
+    if chord_tol >= radius:
+        step = np.pi / 2
+    else:
+        step = 2 * np.arccos(1.0 - chord_tol / radius)
+    return max(min_segments, int(np.ceil(sweep / step)))
 
 
 class DxfTopologyConverter:
-    def __init__(self, dxf_path: str | Path, tol_topo: float = 0.05) -> None:
+    def __init__(
+        self,
+        dxf_path: str | Path,
+        tol_topo: float = 0.05,
+        chord_tol: float = 0.05,
+        improve_time: float = 0.0,
+        sequencing: str = "centroid",
+        workers: int | None = None,
+        streaming: bool = False,
+    ) -> None:
+        if sequencing not in SEQUENCING_MODES:
+            raise ValueError(f"sequencing debe ser uno de {SEQUENCING_MODES}")
         self.dxf_path = Path(dxf_path)
         self.tol_topo = tol_topo
-        self._geoms_raw: List[dict] = []
-        self._geoms_cortar: List[LineString] = []
-        self._geoms_nocortar: List[LineString] = []
+        self.chord_tol = chord_tol  # mm de error de cuerda al discretizar ARC/CIRCLE/ELLIPSE/SPLINE/bulges
+        self.improve_time = improve_time  # s de mejora 2-opt del orden (0 = desactivado)
+        self.sequencing = sequencing
+        self.workers = workers  # procesos para snap/polygonize (None = nucleos, 1 = en serie)
+        self.streaming = streaming  # lectura con iterdxf (core.dxfstream) para DXF muy grandes
+        self.travel_length = 0.0  # mm recorridos en vacio (a z_home) entre contornos
+        self._geoms_cortar: Segments = EMPTY_SEGMENTS
+        self._geoms_nocortar: Segments = EMPTY_SEGMENTS
         self._polys_cut: List[Polygon] = []
         self._opens_cut: List[LineString] = []
         self._polys_nocut: List[Polygon] = []
         self._opens_nocut: List[LineString] = []
         self._geoms_final: List[Tuple[LineString | Polygon, int]] = []
+        self._progress: ProgressCallback | None = None
+
+    def process(self, progress: ProgressCallback | None = None) -> "DxfTopologyConverter":
+        """
+        Ejecuta el pipeline completo.
 
-    def process(self) -> "DxfTopologyConverter":
-        self._read_dxf()
-        self._split_by_color()
-        self._process_categories()
-        self._build_final_order()
+        progress: callback opcional (etapa, fraccion 0..1) invocado al iniciar cada
+        etapa de STAGES. Si el callback lanza una excepcion el proceso se aborta,
+        lo que permite cancelar cargas desde un worker.
+        """
+        self._progress = progress
+        try:
+            self._report("read")
+            self._read_dxf()
+            self._process_categories()
+            self._report("order")
+            self._build_final_order()
+        finally:
+            self._progress = None
         return self
 
     def export_txt(self, out_path: str | Path) -> Path:
@@ -44,7 +100,7 @@ class DxfTopologyConverter:
         with out_path.open("w", encoding="utf-8") as f:
             f.write("X Y Z CORTAR\n")
             for i, (geom, flag) in enumerate(self._geoms_final):
-                x, y = self._coords_no_close(geom)
+                x, y = self._coords_tool(geom)
                 for xi, yi in zip(x, y):
                     f.write(f"{xi:.6f} {yi:.6f} 0.000 {flag}\n")
                 if i < len(self._geoms_final) - 1:
@@ -58,7 +114,7 @@ class DxfTopologyConverter:
         with out_path.open("w", encoding="utf-8") as f:
             f.write("X,Y,Z,C\n")
             for i, (geom, flag) in enumerate(self._geoms_final):
-                x, y = self._coords_no_close(geom)
+                x, y = self._coords_tool(geom)
                 for xi, yi in zip(x, y):
                     f.write(f"{xi:.6f},{yi:.6f},0.000,{flag}\n")
                 if i < len(self._geoms_final) - 1:
@@ -66,6 +122,19 @@ class DxfTopologyConverter:
         print(f"Exportado CSV: {out_path}")
         return out_path
 
+    def export_traj(self, out_path: str | Path, dtype=np.float64) -> Path:
+        """Exporta al formato binario .traj (un bloque por geometria, sin filas NaN)."""
+        blocks = []
+        for geom, flag in self._geoms_final:
+            x, y = self._coords_tool(geom)
+            n = len(x)
+            blocks.append(np.column_stack([x, y, np.zeros(n), np.full(n, flag, dtype=float)]))
+        out_path = write_traj_blocks(
+            out_path, blocks, columns=("X", "Y", "Z", "CORTAR"), dtype=dtype, source=self.dxf_path.name
+        )
+        print(f"Exportado TRAJ: {out_path}")
+        return out_path
+
     def plot(self, show: bool = True):
         fig, ax = plt.subplots(figsize=(9, 9))
         for p in self._polys_cut:
@@ -91,89 +160,150 @@ class DxfTopologyConverter:
 
     # Interno
     def _read_dxf(self) -> None:
+        """
+        Lee el modelspace y clasifica por color sobre la marcha. Con streaming
+        usa iterdxf (core.dxfstream) en vez de armar el documento ezdxf. Los
+        INSERT se resuelven con una BlockTable (core.dxfblocks).
+        """
         if not self.dxf_path.is_file():
             raise FileNotFoundError(f"No se encontro el DXF: {self.dxf_path}")
-        doc = ezdxf.readfile(self.dxf_path)
-        msp = doc.modelspace()
-        geoms_raw: List[dict] = []
-        for e in msp:
-            g = self._entity_to_linestring(e)
-            if g is not None:
-                geoms_raw.append(g)
-        if not geoms_raw:
-            raise ValueError("No se detectaron entidades validas en el DXF.")
-        self._geoms_raw = geoms_raw
-
-    def _split_by_color(self) -> None:
-        corte: List[LineString] = []
-        nocorte: List[LineString] = []
-        for g in self._geoms_raw:
-            if self._clasificar_color(g["color"], g["layer"]) == "NO_CORTAR":
-                nocorte.append(g["geom"])
+        blocks = BlockTable(self._entity_to_coords)
+        if self.streaming:
+            entities: Iterable = iter_modelspace(self.dxf_path, blocks)
+        else:
+            doc = ezdxf.readfile(self.dxf_path)
+            blocks.load_document(doc)
+            entities = doc.modelspace()
+        corte, nocorte = SegmentsBuilder(), SegmentsBuilder()
+        for n, e in enumerate(entities, 1):
+            if e.dxftype() == "INSERT":
+                self._collect_insert(e, blocks, corte, nocorte)
             else:
-                corte.append(g["geom"])
-        self._geoms_cortar = corte
-        self._geoms_nocortar = nocorte
+                g = self._entity_to_coords(e, self.chord_tol)
+                if g is not None:
+                    target = nocorte if self._clasificar_color(g["color"], g["layer"]) == "NO_CORTAR" else corte
+                    for part in g["parts"]:
+                        target.append(part)
+            if n % STREAM_REPORT_EVERY == 0:
+                self._report("read")  # permite cancelar lecturas largas
+        if not len(corte) and not len(nocorte):
+            raise ValueError("No se detectaron entidades validas en el DXF.")
+        self._geoms_cortar = corte.build()
+        self._geoms_nocortar = nocorte.build()
+
+    def _collect_insert(
+        self, insert, blocks: BlockTable, corte: SegmentsBuilder, nocorte: SegmentsBuilder
+    ) -> None:
+        """
+        Todas las instancias de un INSERT de una vez: la clasificacion se hace
+        por entidad del bloque y se repite para cada instancia.
+        """
+        packed = blocks.instances(insert, self.chord_tol)
+        if packed is None:
+            return
+        coords, offsets, colors, layers, n_inst = packed
+        mask = np.array([self._clasificar_color(c, lay) == "NO_CORTAR" for c, lay in zip(colors, layers)])
+        mask = np.tile(mask, n_inst)
+        if mask.all():
+            nocorte.extend((coords, offsets))
+        elif not mask.any():
+            corte.extend((coords, offsets))
+        else:
+            nocorte.extend(take_segments((coords, offsets), np.flatnonzero(mask)))
+            corte.extend(take_segments((coords, offsets), np.flatnonzero(~mask)))
 
     def _process_categories(self) -> None:
-        self._polys_cut, self._opens_cut = self._process_category(self._geoms_cortar)
-        self._polys_nocut, self._opens_nocut = self._process_category(self._geoms_nocortar)
+        """
+        Snap + polygonize de corte y no corte (core.topology). Las cargas grandes
+        se reparten por categoria y grupo disjunto en un pool de procesos; cada
+        lote hace ambas etapas, por eso "polygonize" se reporta antes de lanzarlos
+        y se repite mientras se esperan (permite cancelar).
+        """
+        self._report("snap")
+        self._report("polygonize")
+        (self._polys_cut, self._opens_cut), (self._polys_nocut, self._opens_nocut) = process_categories(
+            [self._geoms_cortar, self._geoms_nocortar],
+            self.tol_topo,
+            self.workers,
+            check=lambda: self._report("polygonize"),
+        )
 
     def _build_final_order(self) -> None:
-        polys_sorted = sorted(self._polys_cut, key=lambda p: abs(p.area))
+        polys_cut = np.asarray(self._polys_cut, dtype=object)
+        polys_sorted = polys_cut[np.argsort(np.abs(shapely.area(polys_cut)), kind="stable")].tolist()
         geoms_final: List[Tuple[LineString | Polygon, int]] = []
         geoms_final.extend((g, 1) for g in polys_sorted)
         geoms_final.extend((g, 1) for g in self._opens_cut)
         geoms_final.extend((g, 0) for g in self._polys_nocut)
         geoms_final.extend((g, 0) for g in self._opens_nocut)
-        self._geoms_final = self._reordenar_por_distancia(geoms_final)
+        if self.sequencing == "entry":
+            self._geoms_final = self._ordenar_por_entrada(geoms_final)
+        else:
+            self._geoms_final = self._reordenar_por_distancia(geoms_final)
+        self.travel_length = travel_length(
+            [np.column_stack(self._coords_no_close(g)) for g, _ in self._geoms_final],
+            [isinstance(g, Polygon) for g, _ in self._geoms_final],
+        )
 
     # Helpers
+    def _report(self, stage: str) -> None:
+        if self._progress is not None:
+            self._progress(stage, STAGES.index(stage) / len(STAGES))
+
     @staticmethod
-    def _entity_to_linestring(e) -> dict | None:
+    def _entity_to_coords(e, chord_tol: float = 0.05) -> dict | None:
+        """
+        Convierte una entidad a {"parts": [vertices (N,2), ...], "color", "layer"}.
+        Los tramos curvos se discretizan por tolerancia de cuerda (chord_tol, mm):
+        el numero de vertices escala con el radio/longitud en vez de ser fijo.
+        HATCH aporta un contorno cerrado por lazo de borde; el resto, una parte.
+        Las LineString se crean despues, en bloque, con shapely.linestrings.
+        """
         dtype = e.dxftype()
         color = getattr(e.dxf, "color", None)
         layer = getattr(e.dxf, "layer", "") or ""
-        puntos: Iterable[Sequence[float]] | None = None
+        partes: List[Iterable[Sequence[float]]] = []
         try:
             if dtype == "LINE":
                 start, end = e.dxf.start, e.dxf.end
-                puntos = [[start.x, start.y], [end.x, end.y]]
+                partes.append([[start.x, start.y], [end.x, end.y]])
             elif dtype == "LWPOLYLINE":
-                puntos = np.array(e.get_points())[:, :2]
+                if e.has_arc or e.closed:
+                    # bulges y tramo de cierre: aplanado nativo de ezdxf
+                    partes.append([(v.x, v.y) for v in ezdxf.path.make_path(e).flattening(chord_tol)])
+                else:
+                    partes.append(np.array(e.get_points())[:, :2])
             elif dtype == "POLYLINE":
-                puntos = np.array([v.dxf.location[:2] for v in e.vertices])
+                if e.is_2d_polyline or e.is_3d_polyline:
+                    partes.append([(v.x, v.y) for v in ezdxf.path.make_path(e).flattening(chord_tol)])
             elif dtype == "CIRCLE":
                 c, r = e.dxf.center, e.dxf.radius
-                t = np.linspace(0, 2 * np.pi, 200)
-                puntos = np.column_stack([c.x + r * np.cos(t), c.y + r * np.sin(t)])
+                t = np.linspace(0, 2 * np.pi, _arc_segments(r, 2 * np.pi, chord_tol, 8) + 1)
+                partes.append(np.column_stack([c.x + r * np.cos(t), c.y + r * np.sin(t)]))
             elif dtype == "ARC":
                 c, r = e.dxf.center, e.dxf.radius
                 a1, a2 = np.deg2rad(e.dxf.start_angle), np.deg2rad(e.dxf.end_angle)
                 if a2 < a1:
                     a2 += 2 * np.pi
-                t = np.linspace(a1, a2, 120)
-                puntos = np.column_stack([c.x + r * np.cos(t), c.y + r * np.sin(t)])
-            elif dtype == "SPLINE":
-                fit = np.array(getattr(e, "fit_points", []))
-                if len(fit) >= 2:
-                    tck, _ = splprep([fit[:, 0], fit[:, 1]], s=0)
-                else:
-                    ctrl = np.array(getattr(e, "control_points", []))
-                    if len(ctrl) < 2:
-                        return None
-                    tck, _ = splprep([ctrl[:, 0], ctrl[:, 1]], s=0)
-                u = np.linspace(0, 1, 200)
-                x, y = splev(u, tck)
-                puntos = np.column_stack([x, y])
+                t = np.linspace(a1, a2, _arc_segments(r, a2 - a1, chord_tol, 1) + 1)
+                partes.append(np.column_stack([c.x + r * np.cos(t), c.y + r * np.sin(t)]))
+            elif dtype in ("SPLINE", "ELLIPSE"):
+                partes.append([(v.x, v.y) for v in e.flattening(chord_tol)])
+            elif dtype == "HATCH":
+                for path in ezdxf.path.from_hatch(e):
+                    anillo = [(v.x, v.y) for v in path.flattening(chord_tol)]
+                    if len(anillo) > 2 and anillo[0] != anillo[-1]:
+                        anillo.append(anillo[0])
+                    partes.append(anillo)
             else:
                 return None
         except Exception:
             return None
 
-        if puntos is None or len(puntos) < 2:
+        parts = [np.asarray(p, dtype=float)[:, :2] for p in partes if len(p) >= 2]
+        if not parts:
             return None
-        return {"geom": LineString(puntos), "color": color, "layer": layer}
+        return {"parts": parts, "color": color, "layer": layer}
 
     @staticmethod
     def _clasificar_color(color, layer: str) -> str:
@@ -186,58 +316,16 @@ class DxfTopologyConverter:
             return "NO_CORTAR"
         return "CORTAR"
 
-    def _process_category(self, geoms: List[LineString]) -> Tuple[List[Polygon], List[LineString]]:
-        merged = self._merge_and_snap(geoms, self.tol_topo)
-        polys = list(polygonize(merged))
-        opens: List[LineString] = []
-        if merged:
-            diff = unary_union(merged).difference(unary_union(polys))
-            if isinstance(diff, LineString):
-                opens.append(diff)
-            elif isinstance(diff, MultiLineString):
-                opens.extend(list(diff.geoms))
-            elif hasattr(diff, "geoms"):
-                for g in diff.geoms:
-                    if isinstance(g, LineString):
-                        opens.append(g)
-                    elif isinstance(g, MultiLineString):
-                        opens.extend(g.geoms)
-        uniq_polys: List[Polygon] = []
-        seen = set()
-        for p in polys:
-            k = p.exterior.wkt
-            if k not in seen:
-                seen.add(k)
-                uniq_polys.append(p)
-        return uniq_polys, opens
-
     @staticmethod
-    def _merge_and_snap(geoms: List[LineString], tol: float) -> List[LineString]:
-        if not geoms:
-            return []
-        endpoints = []
-        for g in geoms:
-            c = list(g.coords)
-            endpoints.append(c[0])
-            endpoints.append(c[-1])
-        endpoints = np.array(endpoints)
-        labels = DBSCAN(eps=tol, min_samples=1).fit_predict(endpoints)
-        n_clusters = labels.max() + 1
-        centroids = np.zeros((n_clusters, 2))
-        for k in range(n_clusters):
-            centroids[k] = endpoints[labels == k].mean(axis=0)
-        snapped = []
-        for i, g in enumerate(geoms):
-            coords = list(g.coords)
-            coords[0] = tuple(centroids[labels[2 * i]])
-            coords[-1] = tuple(centroids[labels[2 * i + 1]])
-            snapped.append(LineString(coords))
-        merged = linemerge(unary_union(snapped))
-        if isinstance(merged, LineString):
-            return [merged]
-        if isinstance(merged, MultiLineString):
-            return list(merged.geoms)
-        return []
+    def _coords_tool(geom: LineString | Polygon):
+        """
+        Recorrido de la herramienta para exportar: un anillo vuelve a su vertice
+        de entrada (cierra el contorno y sale por donde entro, como asume
+        travel_length).
+        """
+        if isinstance(geom, Polygon):
+            return geom.exterior.xy
+        return geom.xy
 
     @staticmethod
     def _coords_no_close(geom: LineString | Polygon):
@@ -257,25 +345,56 @@ class DxfTopologyConverter:
     def _reordenar_por_distancia(
         self, geoms: List[Tuple[LineString | Polygon, int]]
     ) -> List[Tuple[LineString | Polygon, int]]:
+        """
+        Vecino mas cercano entre centroides (calculados una sola vez) usando cKDTree,
+        partiendo de la geometria mas cercana al origen. Si improve_time > 0 se
+        aplica una pasada 2-opt con ese presupuesto (s) para acortar el recorrido.
+        """
         if not geoms:
             return geoms
-        remaining = geoms.copy()
+        centers = shapely.get_coordinates(shapely.centroid([g for g, _ in geoms]))
+        if len(centers) != len(geoms):
+            centers = np.array([self._centro_geom(g) for g, _ in geoms])
+        start = int(np.argmin(np.hypot(centers[:, 0], centers[:, 1])))
+        order = greedy_nn_order(centers, start)
+        if self.improve_time > 0:
+            order = two_opt(centers, order, time_budget=self.improve_time)
+        return [geoms[i] for i in order]
+
+    def _ordenar_por_entrada(
+        self, geoms: List[Tuple[LineString | Polygon, int]]
+    ) -> List[Tuple[LineString | Polygon, int]]:
+        """
+        Elige orden, vertice de entrada de cada anillo y sentido de cada cadena
+        abierta minimizando el recorrido en vacio. Los contornos de corte
+        interiores se visitan antes que su contenedor (jerarquia de
+        core.hierarchy). Si improve_time > 0 se mejora la secuencia con
+        improve_entries (2-opt + reeleccion de entradas) con ese presupuesto (s).
+        """
+        if not geoms:
+            return geoms
+        paths = [np.column_stack(self._coords_no_close(g)) for g, _ in geoms]
+        closed = [isinstance(g, Polygon) for g, _ in geoms]
+        parents = np.full(len(geoms), -1, dtype=np.intp)
+        cut_idx = [i for i, (g, f) in enumerate(geoms) if f == 1 and isinstance(g, Polygon)]
+        if cut_idx:
+            cut_idx = np.asarray(cut_idx, dtype=np.intp)
+            rings = shapely.get_exterior_ring([geoms[i][0] for i in cut_idx])
+            cut_parents = containment_parents(shapely.polygons(rings))
+            inner = cut_parents != -1
+            parents[cut_idx[inner]] = cut_idx[cut_parents[inner]]
+        seq, _ = sequence_entries(paths, closed, parents)
+        if self.improve_time > 0:
+            seq = improve_entries(paths, closed, seq, parents, time_budget=self.improve_time)
         ordered: List[Tuple[LineString | Polygon, int]] = []
-        remaining.sort(key=lambda g: np.hypot(*self._centro_geom(g[0])))
-        current_geom, current_flag = remaining.pop(0)
-        ordered.append((current_geom, current_flag))
-        while remaining:
-            cur_cx, cur_cy = self._centro_geom(current_geom)
-            nxt_idx, nxt_item = min(
-                enumerate(remaining),
-                key=lambda item: np.hypot(
-                    self._centro_geom(item[1][0])[0] - cur_cx,
-                    self._centro_geom(item[1][0])[1] - cur_cy,
-                ),
-            )
-            current_geom, current_flag = nxt_item
-            ordered.append((current_geom, current_flag))
-            remaining.pop(nxt_idx)
+        for idx, vert, rev in seq:
+            geom, flag = geoms[idx]
+            if closed[idx] and vert:
+                ring = list(geom.exterior.coords)[:-1]
+                geom = Polygon(ring[vert:] + ring[:vert], [list(h.coords) for h in geom.interiors])
+            elif rev:
+                geom = LineString(list(geom.coords)[::-1])
+            ordered.append((geom, flag))
         return ordered
 
 
@@ -292,7 +411,30 @@ def main():
         "--tol",
         type=float,
         default=0.05,
-        help="Tolerancia para unir extremos (DBSCAN), en mm",
+        help="Tolerancia para unir extremos, en mm",
+    )
+    parser.add_argument(
+        "--chord-tol",
+        type=float,
+        default=0.05,
+        help="Error de cuerda maximo al discretizar arcos/circulos/splines, en mm",
+    )
+    parser.add_argument(
+        "--opt-time",
+        type=float,
+        default=0.0,
+        help="Segundos de mejora 2-opt sobre el orden de corte (0 = solo vecino mas cercano)",
+    )
+    parser.add_argument(
+        "--sequencing",
+        choices=SEQUENCING_MODES,
+        default="centroid",
+        help="Orden por centroide o por punto de entrada/salida (minimiza recorrido en vacio)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Lee el DXF en streaming (iterdxf): memoria acotada para archivos muy grandes",
     )
     parser.add_argument(
         "--out",
@@ -301,10 +443,19 @@ def main():
         help="Ruta de salida del TXT (CSV se generara con misma ruta y extension .csv)",
     )
     args = parser.parse_args()
-    converter = DxfTopologyConverter(args.dxf, tol_topo=args.tol).process()
+    converter = DxfTopologyConverter(
+        args.dxf,
+        tol_topo=args.tol,
+        chord_tol=args.chord_tol,
+        improve_time=args.opt_time,
+        sequencing=args.sequencing,
+        streaming=args.stream,
+    ).process()
+    print(f"Recorrido en vacio: {converter.travel_length:.1f} mm")
     txt_path = Path(args.out)
     converter.export_txt(txt_path)
     converter.export_csv(txt_path.with_suffix(".csv"))
+    converter.export_traj(txt_path.with_suffix(".traj"))
     
     
     converter.plot(show=True)
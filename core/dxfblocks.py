@@ -0,0 +1,146 @@
+"""
+Referencias INSERT/BLOCK con geometría cacheada.
+
+BlockTable discretiza cada BLOCK una sola vez por tolerancia de cuerda (clave
+(nombre, chord_tol)), en coordenadas locales (punto base restado) y con los
+INSERT anidados ya expandidos. Cada INSERT solo aplica su transformación afín
+(escala, rotación, traslación y la grilla MINSERT) al arreglo de vértices
+cacheado con un producto matricial: una pieza insertada 200 veces cuesta una
+discretización más 200 multiplicaciones, no 200 explosiones de entidades
+virtuales.
+
+Las entidades con color BYBLOCK (0) o capa "0" heredan color/capa del INSERT,
+como en CAD. Lo usan tanto la lectura normal (ezdxf.readfile) como la lectura
+en streaming (core.dxfstream).
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+from ezdxf.math import OCS, Z_AXIS
+
+# entidad -> {"parts": [vertices (N,2), ...], "color", "layer"} o None
+EntityToCoords = Callable[[object, float], "dict | None"]
+# (coords (N,2), offsets (K+1,), colores (K,), capas (K,))
+BlockGeometry = Tuple[np.ndarray, np.ndarray, list, list]
+
+# BLOCK de espacio modelo/papel: su contenido no es una definición referenciable
+LAYOUT_BLOCKS = ("*MODEL_SPACE", "*PAPER_SPACE")
+
+
+def insert_transforms(dxf) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (A (2,2), t (M,2)) de un INSERT: la instancia m lleva un punto local p a
+    p @ A.T + t[m]. M = filas x columnas de la grilla MINSERT (1 si no lo es).
+    Punto de inserción, rotación y grilla están en el OCS del INSERT: con
+    extrusión (0, 0, -1) (bloque espejado) todo queda reflejado en X.
+    """
+    rot = math.radians(dxf.get("rotation", 0.0))
+    c, s = math.cos(rot), math.sin(rot)
+    rotation = np.array([[c, -s], [s, c]])
+    a = rotation * (dxf.get("xscale", 1.0), dxf.get("yscale", 1.0))
+    rows = max(int(dxf.get("row_count", 1)), 1)
+    cols = max(int(dxf.get("column_count", 1)), 1)
+    grid = np.stack(np.meshgrid(np.arange(cols), np.arange(rows)), axis=-1).reshape(-1, 2)
+    grid = grid * (dxf.get("column_spacing", 0.0), dxf.get("row_spacing", 0.0))
+    t = grid @ rotation.T + (dxf.insert[0], dxf.insert[1])
+    ocs = OCS(dxf.get("extrusion", Z_AXIS))
+    if ocs.transform:
+        # ejes X/Y del OCS proyectados al plano XY del WCS
+        to_wcs = np.array([[ocs.ux.x, ocs.uy.x], [ocs.ux.y, ocs.uy.y]])
+        a, t = to_wcs @ a, t @ to_wcs.T
+    return a, t
+
+
+class BlockTable:
+    """Geometría discretizada por (bloque, tolerancia); ver docstring del módulo."""
+
+    def __init__(self, to_coords: EntityToCoords) -> None:
+        self._to_coords = to_coords
+        self._defs: Dict[str, Tuple[Tuple[float, float], list]] = {}
+        self._cache: Dict[Tuple[str, float], BlockGeometry | None] = {}
+        self._building: set = set()
+
+    def __len__(self) -> int:
+        return len(self._defs)
+
+    def define(self, name: str, base: Sequence[float], entities: Iterable) -> None:
+        """Registra un BLOCK; se discretiza en el primer uso."""
+        self._defs[name] = ((float(base[0]), float(base[1])), list(entities))
+        for key in [k for k in self._cache if k[0] == name]:
+            del self._cache[key]
+
+    def load_document(self, doc) -> None:
+        """Todas las definiciones de bloque de un documento ezdxf."""
+        for block in doc.blocks:
+            if not block.name.upper().startswith(LAYOUT_BLOCKS):
+                self.define(block.name, block.block.dxf.base_point, block)
+
+    def geometry(self, name: str, chord_tol: float) -> BlockGeometry | None:
+        """Geometría local del bloque, o None si está vacío, no existe o es recursivo."""
+        key = (name, chord_tol)
+        if key in self._cache:
+            return self._cache[key]
+        if name not in self._defs or key in self._building:
+            return None
+        self._building.add(key)
+        try:
+            (bx, by), entities = self._defs[name]
+            blocks: List[np.ndarray] = []
+            colors: list = []
+            layers: list = []
+            for e in entities:
+                if e.dxftype() == "INSERT":
+                    packed = self.instances(e, chord_tol)
+                    if packed is None:
+                        continue
+                    coords, offsets, ins_colors, ins_layers, n_inst = packed
+                    blocks.extend(np.split(coords, offsets[1:-1]))
+                    colors.extend(ins_colors * n_inst)
+                    layers.extend(ins_layers * n_inst)
+                    continue
+                g = self._to_coords(e, chord_tol)
+                if g is None:
+                    continue
+                blocks.extend(g["parts"])
+                colors.extend([g["color"]] * len(g["parts"]))
+                layers.extend([g["layer"]] * len(g["parts"]))
+        finally:
+            self._building.discard(key)
+        geo = None
+        if blocks:
+            offsets = np.zeros(len(blocks) + 1, dtype=np.intp)
+            np.cumsum([len(b) for b in blocks], out=offsets[1:])
+            geo = (np.concatenate(blocks) - (bx, by), offsets, colors, layers)
+        self._cache[key] = geo
+        return geo
+
+    def instances(self, insert, chord_tol: float) -> Tuple[np.ndarray, np.ndarray, list, list, int] | None:
+        """
+        Todas las instancias de un INSERT empaquetadas: (coords, offsets,
+        colores y capas por entidad del bloque ya heredados, cantidad de
+        instancias). Las entidades de la instancia m son las del bloque en el
+        mismo orden, desplazadas m * len(colores). Inserts con la misma escala
+        comparten la discretización cacheada.
+        """
+        dxf = insert.dxf
+        a, t = insert_transforms(dxf)
+        # la escala multiplica el error de cuerda: se discretiza en el bloque con chord_tol / escala
+        scale = max(abs(dxf.get("xscale", 1.0)), abs(dxf.get("yscale", 1.0)))
+        geo = self.geometry(dxf.name, chord_tol / scale if scale > 0 else chord_tol)
+        if geo is None:
+            return None
+        coords, offsets, colors, layers = geo
+        pts = (coords @ a.T)[None, :, :] + t[:, None, :]
+        n_inst = len(t)
+        n_pts = len(coords)
+        all_offsets = (offsets[:-1][None, :] + n_pts * np.arange(n_inst)[:, None]).ravel()
+        all_offsets = np.append(all_offsets, n_inst * n_pts)
+        color = getattr(dxf, "color", None)
+        layer = getattr(dxf, "layer", "") or ""
+        colors = [color if c == 0 else c for c in colors]
+        layers = [layer if lay == "0" else lay for lay in layers]
+        return pts.reshape(-1, 2), all_offsets, colors, layers, n_inst
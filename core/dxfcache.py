@@ -0,0 +1,218 @@
+"""
+Cache en disco de resultados del conversor DXF.
+
+Clave = blake2b(contenido del DXF) + parámetros del conversor (tol_topo,
+chord_tol, ...) + CACHE_VERSION. Cada entrada son dos archivos:
+    <clave>.traj   paths finales (X, Y float32, un bloque por anillo, en el
+                   orden de corte); flags, bounds, travel_length y crc32 de los
+                   datos van en los metadatos JSON
+    <clave>.png    preview renderizado
+Una recarga abre el .traj con np.memmap (sin copiar) y verifica el crc32; si
+la entrada está incompleta o corrupta se borra y cuenta como fallo.
+
+Desalojo LRU por tamaño total: el mtime de la entrada se actualiza en cada
+acierto y al superar max_bytes se borran las más viejas.
+
+Cada escritura va a un temporal propio (<clave>.*.tmp) que luego se renombra,
+así dos cargas del mismo DXF no se pisan. Los temporales que quedan de una
+escritura interrumpida se borran en evict() pasado STALE_TMP_SECONDS.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Mapping, Tuple
+
+import numpy as np
+
+from core.pathbuffer import PathBuffer
+from core.trajfile import TrajFile, write_traj
+
+CACHE_VERSION = 2  # 2: INSERT/ELLIPSE/HATCH y polilineas cerradas
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[1] / "docs" / "tmp" / "dxf_cache"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+STALE_TMP_SECONDS = 3600.0  # mas viejo que esto, un .tmp no es una escritura en curso
+_CHUNK = 1 << 20
+
+
+def file_digest(path: str | Path) -> str:
+    """blake2b (128 bits) del contenido del archivo."""
+    h = hashlib.blake2b(digest_size=16)
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(path: str | Path, params: Mapping[str, object]) -> str:
+    """Clave de la entrada: contenido del DXF + parámetros del conversor."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(file_digest(path).encode("ascii"))
+    h.update(json.dumps({"v": CACHE_VERSION, **params}, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _crc(*arrays: np.ndarray) -> int:
+    crc = 0
+    for a in arrays:
+        crc = zlib.crc32(memoryview(np.ascontiguousarray(a)).cast("B"), crc)
+    return crc
+
+
+class DxfCache:
+    """Cache LRU de paths + preview por clave (ver docstring del módulo)."""
+
+    def __init__(self, root: str | Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+
+    def key(self, path: str | Path, params: Mapping[str, object]) -> str:
+        return cache_key(path, params)
+
+    def _files(self, key: str) -> Tuple[Path, Path]:
+        return self.root / f"{key}.traj", self.root / f"{key}.png"
+
+    def get(self, key: str) -> Dict[str, object] | None:
+        """
+        Entrada como dict {paths, bounds, preview, travel_length} o None.
+        `paths.coords` queda mapeado en memoria sobre el .traj.
+        """
+        traj_path, png_path = self._files(key)
+        if not traj_path.is_file():
+            return None
+        try:
+            traj = TrajFile(traj_path)
+            meta = traj.meta
+            if meta.get("cache_version") != CACHE_VERSION or meta.get("key") != key:
+                raise ValueError("entrada de otra version")
+            if _crc(traj.data, traj.offsets) != meta["crc32"]:
+                raise ValueError("crc32 no coincide")
+            preview = png_path if meta.get("preview") else None
+            if preview is not None and not preview.is_file():
+                raise ValueError("falta el preview")
+            paths = PathBuffer(traj.data, traj.offsets, meta["flags"])
+        except (OSError, ValueError, KeyError, TypeError):
+            self.remove(key)
+            return None
+        os.utime(traj_path)  # LRU: ultimo uso
+        bounds = meta.get("bounds")
+        return {
+            "paths": paths,
+            "bounds": tuple(bounds) if bounds is not None else None,
+            "preview": preview.resolve() if preview is not None else None,
+            "travel_length": float(meta.get("travel_length", 0.0)),
+        }
+
+    def put(
+        self,
+        key: str,
+        paths: PathBuffer,
+        preview: bytes | str | Path | None = None,
+        travel_length: float = 0.0,
+        source: str = "",
+    ) -> Path:
+        """
+        Guarda una entrada (escritura atómica) y aplica el límite de tamaño.
+        preview: PNG en bytes o ruta a un PNG existente.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        traj_path, png_path = self._files(key)
+        coords = paths.coords.astype("<f4", copy=False)
+        offsets = paths.offsets.astype("<u8")
+        if preview is not None:
+            tmp_png = self._tmp_file(key, ".png.tmp")
+            try:
+                if isinstance(preview, bytes):
+                    tmp_png.write_bytes(preview)
+                else:
+                    shutil.copyfile(preview, tmp_png)
+                os.replace(tmp_png, png_path)
+            finally:
+                tmp_png.unlink(missing_ok=True)
+        tmp = self._tmp_file(key, ".traj.tmp")
+        try:
+            write_traj(
+                tmp,
+                coords,
+                offsets,
+                columns=("X", "Y"),
+                dtype=np.float32,
+                source=source,
+                key=key,
+                cache_version=CACHE_VERSION,
+                flags=paths.flags.tolist(),
+                bounds=paths.bounds(),
+                travel_length=float(travel_length),
+                preview=preview is not None,
+                crc32=_crc(coords, offsets),
+            )
+            os.replace(tmp, traj_path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        self.evict()
+        return traj_path
+
+    def _tmp_file(self, key: str, suffix: str) -> Path:
+        """Temporal vacío y de nombre único en root (no lo comparten dos escrituras)."""
+        with tempfile.NamedTemporaryFile(dir=self.root, prefix=f"{key}.", suffix=suffix, delete=False) as f:
+            return Path(f.name)
+
+    def remove(self, key: str) -> None:
+        for p in self._files(key):
+            try:
+                p.unlink(missing_ok=True)
+            except OSError:  # p.ej. aun mapeado en Windows; se reintenta en el proximo evict
+                pass
+
+    def entries(self) -> List[Tuple[str, int, float]]:
+        """[(clave, bytes, mtime)] de las entradas, de la más vieja a la más nueva."""
+        if not self.root.is_dir():
+            return []
+        out = []
+        for traj_path in self.root.glob("*.traj"):
+            try:
+                st = traj_path.stat()
+            except OSError:
+                continue
+            png_path = traj_path.with_suffix(".png")
+            size = st.st_size + (png_path.stat().st_size if png_path.is_file() else 0)
+            out.append((traj_path.stem, size, st.st_mtime))
+        out.sort(key=lambda e: e[2])
+        return out
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def _remove_stale_tmp(self) -> None:
+        """Borra temporales de escrituras interrumpidas (los recientes pueden estar en curso)."""
+        if not self.root.is_dir():
+            return
+        limit = time.time() - STALE_TMP_SECONDS
+        for tmp in self.root.glob("*.tmp"):
+            try:
+                if tmp.stat().st_mtime < limit:
+                    tmp.unlink()
+            except OSError:
+                pass
+
+    def evict(self) -> None:
+        """Borra temporales viejos y las entradas menos usadas hasta quedar bajo max_bytes."""
+        self._remove_stale_tmp()
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= size
+
+    def clear(self) -> None:
+        for key, _, _ in self.entries():
+            self.remove(key)
@@ -0,0 +1,65 @@
+"""
+Lectura DXF en streaming (ezdxf.addons.iterdxf) para archivos muy grandes.
+
+ezdxf.readfile arma el modelo de objetos completo antes de recorrer el
+modelspace; con archivos de nesting de cientos de MB eso agota la memoria.
+iter_modelspace lee el archivo entidad por entidad: solo quedan en memoria las
+definiciones de bloque (core.dxfblocks.BlockTable) y la geometría ya
+discretizada que arme quien consume las entidades.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, Sequence
+
+from ezdxf.addons import iterdxf
+
+from core.dxfblocks import LAYOUT_BLOCKS, BlockTable
+
+_BLOCK_TYPES = set(iterdxf.SUPPORTED_TYPES) | {"BLOCK", "ENDBLK"}
+
+
+def _linked(entities: Iterator) -> Iterator:
+    """Une VERTEX/ATTRIB/SEQEND a su POLYLINE/INSERT (como IterDXF.modelspace)."""
+    link = iterdxf.entity_linker()
+    queued = None
+    for e in entities:
+        if e.dxftype() in ("BLOCK", "ENDBLK") or not link(e):
+            if queued is not None:
+                yield queued
+            queued = e
+    if queued is not None:
+        yield queued
+
+
+def read_blocks(doc: iterdxf.IterDXF, table: BlockTable) -> None:
+    """Carga la sección BLOCKS de un IterDXF en la tabla."""
+    if "BLOCKS" not in doc.sections:
+        return
+    name = None
+    base: Sequence[float] = (0.0, 0.0)
+    entities: list = []
+    for e in _linked(doc.load_entities(doc.sections["BLOCKS"] + 1, _BLOCK_TYPES)):
+        kind = e.dxftype()
+        if kind == "BLOCK":
+            name, base, entities = e.dxf.name, e.dxf.base_point, []
+        elif kind == "ENDBLK":
+            if name is not None and not name.upper().startswith(LAYOUT_BLOCKS):
+                table.define(name, base, entities)
+            name = None
+        elif name is not None:
+            entities.append(e)
+
+
+def iter_modelspace(path: str | Path, table: BlockTable) -> Iterator:
+    """
+    Entidades del modelspace leídas en streaming. Antes de la primera se carga
+    la sección BLOCKS en `table`, para que los INSERT se puedan resolver.
+    """
+    doc = iterdxf.opendxf(str(path))
+    try:
+        read_blocks(doc, table)
+        yield from doc.modelspace()
+    finally:
+        doc.close()
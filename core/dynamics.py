@@ -0,0 +1,144 @@
+"""
+Dinámica inversa vectorizada del SCARA P-R-R.
+
+Port de docs/MATLAB/Dinamica.m, Torques.m y ModeloDin.m: en lugar de armar
+M, C y G de 3x3 punto por punto, se construyen pilas (N,3,3) y el torque se
+resuelve con einsum para la trayectoria completa:
+
+    tau = M(q)·q̈ + C(q,q̇)·q̇ + G + B∘q̇ + Jᵀ(q)·F_ext
+
+Units:
+- q: [d1 (m), th2 (rad), th3 (rad)].
+- tau: [N, N·m, N·m].
+"""
+
+from __future__ import annotations
+
+from typing import Mapping, Tuple
+
+import numpy as np
+
+from core.kinematics import jacobian_batch
+
+# Parámetros de MainScaraMulticuerpo.m
+DEFAULT_PARAMS: dict = {
+    "L1": 0.650,  # [m] brazo 1
+    "L2": 0.600,  # [m] brazo 2
+    "g": 9.81,  # [m/s^2]
+    "m1": 5.0,  # [kg] eslabón 1 (prismático)
+    "m2": 1.8,  # [kg] eslabón 2 (hombro)
+    "m3": 1.2,  # [kg] eslabón 3 (codo)
+    "I2": 0.10,  # [kg·m^2]
+    "I3": 0.05,  # [kg·m^2]
+    "B": (5.0, 0.15, 0.15),  # fricción viscosa [N·s/m, N·m·s/rad, N·m·s/rad]
+    "F_ext": (0.5, 0.5, 8.0),  # carga externa de la herramienta [N]
+    "Qdot_max": (1.0, 4.0, 4.0),  # [m/s, rad/s, rad/s]
+    "Qddot_max": (5.0, 30.0, 30.0),  # [m/s^2, rad/s^2, rad/s^2]
+}
+
+
+def make_params(params: Mapping | None = None, **overrides) -> dict:
+    """DEFAULT_PARAMS actualizado con params y overrides (equivale al struct de MATLAB)."""
+    out = dict(DEFAULT_PARAMS)
+    if params:
+        out.update(params)
+    out.update(overrides)
+    return out
+
+
+def _as_q(name: str, arr: np.ndarray) -> np.ndarray:
+    a = np.asarray(arr, dtype=float)
+    if a.ndim != 2 or a.shape[1] < 3:
+        raise ValueError(f"{name} debe ser (N,3)")
+    return a[:, :3]
+
+
+def _centros_masa(p: Mapping) -> Tuple[float, float]:
+    # ModeloDin.m: centro de masa al 30% de cada brazo (lc2 / lc3 en MainScaraMulticuerpo.m)
+    return p.get("lc2", 0.3 * p["L1"]), p.get("lc3", 0.3 * p["L2"])
+
+
+def modelo_din_batch(
+    q: np.ndarray, dq: np.ndarray, params: Mapping | None = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Versión vectorizada de ModeloDin.m.
+    Retorna (M (N,3,3), C (N,3,3), G (N,3)).
+    """
+    p = make_params(params)
+    q = _as_q("q", q)
+    dq = _as_q("dq", dq)
+    n = q.shape[0]
+    l1 = p["L1"]
+    m2, m3 = p["m2"], p["m3"]
+    i2, i3 = p["I2"], p["I3"]
+    lc2, lc3 = _centros_masa(p)
+    m_total = p["m1"] + m2 + m3
+    c3 = np.cos(q[:, 2])
+    s3 = np.sin(q[:, 2])
+
+    mass = np.zeros((n, 3, 3), dtype=float)
+    mass[:, 0, 0] = m_total
+    mass[:, 1, 1] = i2 + i3 + m2 * lc2**2 + m3 * (l1**2 + lc3**2 + 2 * l1 * lc3 * c3)
+    mass[:, 1, 2] = i3 + m3 * (lc3**2 + l1 * lc3 * c3)
+    mass[:, 2, 1] = mass[:, 1, 2]
+    mass[:, 2, 2] = i3 + m3 * lc3**2
+
+    h = -m3 * l1 * lc3 * s3
+    cor = np.zeros((n, 3, 3), dtype=float)
+    cor[:, 1, 1] = h * dq[:, 2]
+    cor[:, 1, 2] = h * (dq[:, 1] + dq[:, 2])
+    cor[:, 2, 1] = -h * dq[:, 1]
+
+    grav = np.zeros((n, 3), dtype=float)
+    grav[:, 0] = m_total * p["g"]  # plano XY horizontal: sin gravedad en th2/th3
+    return mass, cor, grav
+
+
+def torques_batch(
+    q: np.ndarray, dq: np.ndarray, ddq: np.ndarray, params: Mapping | None = None
+) -> np.ndarray:
+    """
+    Versión vectorizada de Torques.m para (N,3) q, q̇, q̈. Retorna tau (N,3).
+    Las filas con algún NaN en la entrada quedan en NaN, como en MATLAB.
+    """
+    p = make_params(params)
+    q = _as_q("q", q)
+    dq = _as_q("dq", dq)
+    ddq = _as_q("ddq", ddq)
+    if not (len(q) == len(dq) == len(ddq)):
+        raise ValueError("q, dq y ddq deben tener la misma longitud")
+    mass, cor, grav = modelo_din_batch(q, dq, p)
+    tau = np.einsum("nij,nj->ni", mass, ddq) + np.einsum("nij,nj->ni", cor, dq) + grav
+    if p.get("B") is not None:
+        tau += np.asarray(p["B"], dtype=float).reshape(3) * dq
+    f_ext = p.get("F_ext")
+    if f_ext is not None and np.any(np.asarray(f_ext) != 0):
+        jac = jacobian_batch(q, p["L1"], p["L2"])
+        tau += np.einsum("nji,j->ni", jac, np.asarray(f_ext, dtype=float).reshape(3))
+    tau[np.isnan(tau).any(axis=1)] = np.nan
+    return tau
+
+
+def dinamica_batch(
+    tray_art: np.ndarray, q_dot: np.ndarray, q_ddot: np.ndarray, params: Mapping | None = None
+) -> np.ndarray:
+    """
+    Equivalente a Dinamica.m con el perfil q̇/q̈ ya calculado.
+    Retorna (N,12) [q | q̇ | q̈ | tau].
+    """
+    q = _as_q("tray_art", tray_art)
+    tau = torques_batch(q, q_dot, q_ddot, params)
+    return np.hstack([q, np.asarray(q_dot, dtype=float)[:, :3], np.asarray(q_ddot, dtype=float)[:, :3], tau])
+
+
+def excesos_torque(tau: np.ndarray, tau_max: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Verificación de límites de motor.
+    Retorna (mascara (N,3) |tau| > tau_max, pico |tau| por articulación (3,)).
+    """
+    tau = np.asarray(tau, dtype=float)
+    tau_abs = np.abs(tau)
+    mask = tau_abs > np.asarray(tau_max, dtype=float).reshape(3)
+    peak = np.nanmax(tau_abs, axis=0) if len(tau) else np.zeros(3)
+    return mask, peak
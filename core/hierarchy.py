@@ -0,0 +1,67 @@
+"""
+Jerarquía de contención entre polígonos (qué contorno está dentro de cuál).
+
+Misma regla que DxfHierarchyConverter._build_supergroups (docs/dxf_hierarchy.py):
+el padre de i es el polígono de menor área, estrictamente mayor que la de i,
+que contiene el punto representativo de i (empates por índice). Los grupos
+reúnen cada polígono bajo su raíz.
+
+En vez de probar todos contra todos (O(n²) llamadas a contains) se consulta un
+STRtree con los puntos representativos: shapely 2 filtra por bbox en el árbol y
+evalúa el predicado sobre geometrías preparadas en una sola llamada vectorizada.
+La elección del padre y las raíces se resuelven con numpy.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+
+
+def containment_parents(polys: Sequence[Polygon]) -> np.ndarray:
+    """Padre inmediato de cada polígono (índice) o -1 si no está contenido."""
+    n = len(polys)
+    parents = np.full(n, -1, dtype=np.intp)
+    if n == 0:
+        return parents
+    geoms = np.asarray(polys, dtype=object)
+    areas = shapely.area(geoms)
+    reps = shapely.point_on_surface(geoms)
+    tree = shapely.STRtree(geoms)
+    child, cont = tree.query(reps, predicate="within")
+    keep = areas[cont] > areas[child]
+    child, cont = child[keep], cont[keep]
+    if len(child):
+        # por hijo, el contenedor de menor (área, índice)
+        order = np.lexsort((cont, areas[cont], child))
+        child, cont = child[order], cont[order]
+        first = np.ones(len(child), dtype=bool)
+        first[1:] = child[1:] != child[:-1]
+        parents[child[first]] = cont[first]
+    return parents
+
+
+def root_of(parents: np.ndarray) -> np.ndarray:
+    """Raíz de cada nodo por saltos de puntero (O(n log profundidad))."""
+    parents = np.asarray(parents, dtype=np.intp)
+    roots = np.where(parents >= 0, parents, np.arange(len(parents)))
+    while True:
+        nxt = roots[roots]
+        if np.array_equal(nxt, roots):
+            return roots
+        roots = nxt
+
+
+def build_supergroups(polys: Sequence[Polygon]) -> Tuple[Dict[int, List[int]], List[int]]:
+    """
+    ({raíz: [índices del grupo]}, padres) con el mismo formato que
+    DxfHierarchyConverter._build_supergroups.
+    """
+    parents = containment_parents(polys)
+    supergroups: Dict[int, List[int]] = {}
+    for i, root in enumerate(root_of(parents).tolist()):
+        supergroups.setdefault(root, []).append(i)
+    return supergroups, parents.tolist()
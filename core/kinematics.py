@@ -4,6 +4,9 @@ Kinematics utilities for the SCARA P-R-R robot.
 Units:
 - Distances in meters.
 - Angles in radians.
+
+forward/inverse work point by point; forward_batch/inverse_batch/jacobian_batch
+are the vectorized NumPy equivalents for whole trajectories (N,3) in a single pass.
 """
 
 from __future__ import annotations
@@ -11,6 +14,11 @@ from __future__ import annotations
 import math
 from typing import Iterable, List, Sequence, Tuple
 
+import numpy as np
+
+ELBOW_DOWN = "down"  # th3 >= 0 (configuración histórica de inverse)
+ELBOW_UP = "up"  # th3 <= 0
+
 
 def forward(q_art: Sequence[float], l1: float, l2: float) -> Tuple[float, float, float]:
     """
@@ -67,3 +75,99 @@ def inverse(
         tray_art.append((d1, th2, th3, flag, v))
 
     return tray_art
+
+
+def forward_batch(q_art: np.ndarray, l1: float, l2: float) -> np.ndarray:
+    """
+    Cinemática directa vectorizada: (N,3) [d1, th2, th3] -> (N,3) [x, y, z].
+    Acepta también (N,5) [d1, th2, th3, flag, v]; se usan las 3 primeras columnas.
+    """
+    q = np.asarray(q_art, dtype=float)
+    if q.ndim != 2 or q.shape[1] < 3:
+        raise ValueError("q_art debe ser (N,3) [d1, th2, th3]")
+    th2 = q[:, 1]
+    th23 = th2 + q[:, 2]
+    out = np.empty((q.shape[0], 3), dtype=float)
+    out[:, 0] = l1 * np.cos(th2) + l2 * np.cos(th23)
+    out[:, 1] = l1 * np.sin(th2) + l2 * np.sin(th23)
+    out[:, 2] = q[:, 0]
+    return out
+
+
+def inverse_batch(
+    tray_cart_pos: np.ndarray,
+    l1: float,
+    l2: float,
+    tray_cart_aux: np.ndarray | None = None,
+    elbow: str = ELBOW_DOWN,
+    tol: float = 1e-9,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cinemática inversa vectorizada para trayectorias completas.
+
+    Entradas:
+        tray_cart_pos: (N,3) [x, y, z] en metros.
+        l1, l2: longitudes de los brazos (m).
+        tray_cart_aux: (N,2) [flag, v] por punto; si es None se rellena con ceros.
+        elbow: ELBOW_DOWN ("down", igual que inverse) o ELBOW_UP ("up").
+        tol: holgura (m) sobre los límites del espacio de trabajo antes de
+            marcar un punto como inalcanzable (absorbe el redondeo).
+    Salida:
+        (tray_art, unreachable):
+        tray_art (N,5) [d1, th2, th3, flag, v]; los puntos inalcanzables se
+        proyectan al borde del espacio de trabajo como en inverse.
+        unreachable (N,) bool, True donde r > l1+l2 o r < |l1-l2|.
+    """
+    if elbow not in (ELBOW_DOWN, ELBOW_UP):
+        raise ValueError(f"elbow debe ser '{ELBOW_DOWN}' o '{ELBOW_UP}'")
+    pos = np.asarray(tray_cart_pos, dtype=float)
+    if pos.ndim != 2 or pos.shape[1] < 3:
+        raise ValueError("tray_cart_pos debe ser (N,3) [x, y, z]")
+    n = pos.shape[0]
+    if tray_cart_aux is None:
+        aux = np.zeros((n, 2), dtype=float)
+    else:
+        aux = np.asarray(tray_cart_aux, dtype=float)
+        if aux.shape != (n, 2):
+            raise ValueError("tray_cart_pos y tray_cart_aux deben tener la misma longitud")
+
+    x = pos[:, 0]
+    y = pos[:, 1]
+    r_sq = x * x + y * y
+    r = np.sqrt(r_sq)
+    unreachable = (r > (l1 + l2) + tol) | (r < abs(l1 - l2) - tol)
+
+    cos_th3 = np.clip((r_sq - l1 * l1 - l2 * l2) / (2 * l1 * l2), -1.0, 1.0)
+    sin_th3 = np.sqrt(1.0 - cos_th3 * cos_th3)
+    if elbow == ELBOW_UP:
+        sin_th3 = -sin_th3
+    th3 = np.arctan2(sin_th3, cos_th3)
+    th2 = np.arctan2(y, x) - np.arctan2(l2 * sin_th3, l1 + l2 * cos_th3)
+
+    tray_art = np.empty((n, 5), dtype=float)
+    tray_art[:, 0] = pos[:, 2]
+    tray_art[:, 1] = th2
+    tray_art[:, 2] = th3
+    tray_art[:, 3:5] = aux
+    return tray_art, unreachable
+
+
+def jacobian_batch(q_art: np.ndarray, l1: float, l2: float) -> np.ndarray:
+    """
+    Jacobiano lineal vectorizado (N,3,3) de [d1, th2, th3] -> [x, y, z]
+    (mismo orden de filas/columnas que Jacobiano.m).
+    """
+    q = np.asarray(q_art, dtype=float)
+    if q.ndim != 2 or q.shape[1] < 3:
+        raise ValueError("q_art debe ser (N,3) [d1, th2, th3]")
+    th2 = q[:, 1]
+    th23 = th2 + q[:, 2]
+    s2, c2 = np.sin(th2), np.cos(th2)
+    s23, c23 = np.sin(th23), np.cos(th23)
+    jac = np.zeros((q.shape[0], 3, 3), dtype=float)
+    jac[:, 2, 0] = 1.0
+    jac[:, 0, 1] = -l1 * s2 - l2 * s23
+    jac[:, 1, 1] = l1 * c2 + l2 * c23
+    jac[:, 0, 2] = -l2 * s23
+    jac[:, 1, 2] = l2 * c23
+    return jac
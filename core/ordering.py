@@ -0,0 +1,334 @@
+"""
+Ordenamiento de recorridos sobre puntos 2D (centros de geometrias).
+
+- greedy_nn_order: vecino mas cercano voraz con cKDTree (reconstruido a medida
+  que se visitan puntos), O(n log n) en la practica.
+- two_opt: mejora 2-opt de camino abierto con listas de vecinos y presupuesto
+  de tiempo.
+- sequence_entries: orden + vertice de entrada + sentido por contorno,
+  minimizando el recorrido en vacio y respetando interior antes que exterior.
+- improve_entries: mejora local (2-opt + reeleccion de entradas) de una
+  secuencia de sequence_entries, con presupuesto de tiempo.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+def path_length(points: np.ndarray, order: np.ndarray) -> float:
+    """Longitud del camino abierto que visita points en el orden dado."""
+    if len(order) < 2:
+        return 0.0
+    p = points[order]
+    return float(np.hypot(*np.diff(p, axis=0).T).sum())
+
+
+def greedy_nn_order(points: np.ndarray, start: int = 0) -> np.ndarray:
+    """
+    Orden voraz por vecino mas cercano partiendo de `start`.
+    points: (N,2). Retorna indices (N,).
+    """
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    order = np.empty(n, dtype=np.intp)
+    if n == 0:
+        return order
+    visited = np.zeros(n, dtype=bool)
+    idx_map = np.arange(n)
+    tree = cKDTree(points)
+    cur = start
+    visited[cur] = True
+    order[0] = cur
+    for step in range(1, n):
+        remaining = n - step
+        # Reconstruir cuando la mitad del arbol ya esta visitada (borrado amortizado)
+        if len(idx_map) > 64 and remaining * 2 < len(idx_map):
+            idx_map = np.flatnonzero(~visited)
+            tree = cKDTree(points[idx_map])
+        k = min(8, len(idx_map))
+        while True:
+            _, ii = tree.query(points[cur], k=k)
+            cand = idx_map[np.atleast_1d(ii)]
+            free = ~visited[cand]
+            if free.any():
+                cur = int(cand[np.argmax(free)])
+                break
+            k = min(2 * k, len(idx_map))
+        visited[cur] = True
+        order[step] = cur
+    return order
+
+
+def two_opt(
+    points: np.ndarray,
+    order: np.ndarray,
+    time_budget: float = 0.5,
+    n_neighbors: int = 8,
+) -> np.ndarray:
+    """
+    Mejora 2-opt de un camino abierto (el primer punto queda fijo).
+
+    Solo evalua movimientos que crean una arista hacia uno de los n_neighbors
+    vecinos mas cercanos, y se detiene al agotar time_budget (s) o al no
+    encontrar mejoras. Retorna un nuevo orden (no modifica el de entrada).
+    """
+    points = np.asarray(points, dtype=float)
+    path = np.array(order, dtype=np.intp)
+    n = len(path)
+    if n < 4 or time_budget <= 0:
+        return path
+    deadline = time.perf_counter() + time_budget
+    k = min(n_neighbors + 1, n)
+    _, nbrs = cKDTree(points).query(points, k=k)
+    nbrs = nbrs[:, 1:]
+    pos = np.empty(n, dtype=np.intp)
+    pos[path] = np.arange(n)
+
+    def dist(a: int, b: int) -> float:
+        return float(np.hypot(*(points[a] - points[b])))
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(n):
+            if time.perf_counter() >= deadline:
+                break
+            a = path[i]
+            d_succ = dist(a, path[i + 1]) if i + 1 < n else None
+            for c in nbrs[a]:
+                d_ac = dist(a, c)
+                if d_succ is not None and d_ac >= d_succ:
+                    break
+                j = pos[c]
+                lo, hi = (i, j) if i < j else (j, i)
+                if hi - lo < 2:
+                    continue
+                p_lo, p_lo1 = path[lo], path[lo + 1]
+                p_hi = path[hi]
+                delta = dist(p_lo, p_hi) - dist(p_lo, p_lo1)
+                if hi + 1 < n:
+                    p_hi1 = path[hi + 1]
+                    delta += dist(p_lo1, p_hi1) - dist(p_hi, p_hi1)
+                if delta < -1e-9:
+                    # invertir tramo lo+1..hi
+                    path[lo + 1 : hi + 1] = path[lo + 1 : hi + 1][::-1].copy()
+                    pos[path[lo + 1 : hi + 1]] = np.arange(lo + 1, hi + 1)
+                    improved = True
+                    break
+    return path
+
+
+def sequence_entries(
+    paths: Sequence[np.ndarray],
+    closed: Sequence[bool],
+    parents: Sequence[int] | None = None,
+    start: Tuple[float, float] = (0.0, 0.0),
+) -> Tuple[List[Tuple[int, int, bool]], float]:
+    """
+    Secuencia voraz por punto de entrada (no por centroide).
+
+    paths: lista de arrays (M_i,2) sin vertice de cierre repetido.
+    closed: True si el path es un anillo (cualquier vertice puede ser entrada y
+        la salida coincide con la entrada); False para cadenas abiertas (entrada
+        por cualquiera de los extremos, salida por el otro).
+    parents: indice del contenedor de cada path (-1 si no tiene). Un contenedor
+        solo se habilita cuando todos sus hijos ya fueron visitados
+        (interior antes que exterior).
+    start: posicion inicial de la herramienta.
+
+    Retorna ([(idx_path, idx_vertice_entrada, invertido)], recorrido_en_vacio),
+    donde el recorrido en vacio suma las distancias salida -> siguiente entrada.
+    """
+    n = len(paths)
+    if n == 0:
+        return [], 0.0
+    parents = np.full(n, -1, dtype=np.intp) if parents is None else np.asarray(parents, dtype=np.intp)
+    pending = np.bincount(parents[parents >= 0], minlength=n)
+    done = np.array([len(p) == 0 for p in paths], dtype=bool)
+    empty = np.flatnonzero(done)
+    for i in empty:
+        if parents[i] >= 0:
+            pending[parents[i]] -= 1
+
+    pts_l, item_l, vert_l = [], [], []
+    for i, p in enumerate(paths):
+        m = len(p)
+        verts = np.arange(m) if closed[i] or m < 2 else np.array([0, m - 1])
+        pts_l.append(np.asarray(p, dtype=float)[verts, :2])
+        item_l.append(np.full(len(verts), i, dtype=np.intp))
+        vert_l.append(verts)
+    pts_all = np.concatenate(pts_l)
+    item_all = np.concatenate(item_l)
+    vert_all = np.concatenate(vert_l)
+
+    idx_map = np.arange(len(pts_all))
+    tree = cKDTree(pts_all)
+    n_dead = 0
+    cur = np.asarray(start, dtype=float)
+    travel = 0.0
+    seq: List[Tuple[int, int, bool]] = []
+    for _ in range(n - len(empty)):
+        if len(idx_map) > 64 and n_dead * 2 > len(idx_map):
+            idx_map = idx_map[~done[item_all[idx_map]]]
+            tree = cKDTree(pts_all[idx_map])
+            n_dead = 0
+        k = min(16, len(idx_map))
+        chosen = -1
+        while True:
+            _, ii = tree.query(cur, k=k)
+            cand = idx_map[np.atleast_1d(ii)]
+            items = item_all[cand]
+            ok = ~done[items] & (pending[items] == 0)
+            if ok.any():
+                chosen = int(cand[np.argmax(ok)])
+                break
+            if k >= len(idx_map):
+                break
+            k = min(2 * k, len(idx_map))
+        if chosen < 0:
+            # jerarquia inconsistente: tomar cualquier pendiente
+            rest = idx_map[~done[item_all[idx_map]]]
+            chosen = int(rest[np.argmin(np.hypot(*(pts_all[rest] - cur).T))])
+        item = int(item_all[chosen])
+        vert = int(vert_all[chosen])
+        p = paths[item]
+        entry = pts_all[chosen]
+        travel += float(np.hypot(*(entry - cur)))
+        if closed[item]:
+            seq.append((item, vert, False))
+            cur = entry
+        else:
+            rev = vert != 0
+            seq.append((item, vert, rev))
+            cur = np.asarray(p[0 if rev else len(p) - 1][:2], dtype=float)
+        done[item] = True
+        n_dead += len(pts_l[item])
+        if parents[item] >= 0:
+            pending[parents[item]] -= 1
+    # paths vacios al final, sin recorrido
+    seq.extend((int(i), 0, False) for i in empty)
+    return seq, travel
+
+
+def _endpoints(paths: Sequence[np.ndarray], closed: Sequence[bool], seq) -> Tuple[np.ndarray, np.ndarray]:
+    """Entrada y salida (K,2) de cada elemento (idx, vertice, invertido) de seq."""
+    entry = np.empty((len(seq), 2))
+    exit_ = np.empty((len(seq), 2))
+    for k, (i, vert, rev) in enumerate(seq):
+        p = np.asarray(paths[i], dtype=float)[:, :2]
+        if closed[i]:
+            entry[k] = exit_[k] = p[vert]
+        else:
+            entry[k], exit_[k] = (p[-1], p[0]) if rev else (p[0], p[-1])
+    return entry, exit_
+
+
+def improve_entries(
+    paths: Sequence[np.ndarray],
+    closed: Sequence[bool],
+    seq: List[Tuple[int, int, bool]],
+    parents: Sequence[int] | None = None,
+    start: Tuple[float, float] = (0.0, 0.0),
+    time_budget: float = 0.5,
+) -> List[Tuple[int, int, bool]]:
+    """
+    Mejora local de una secuencia de sequence_entries hasta agotar time_budget
+    (s) o no encontrar mejoras:
+    - 2-opt: invertir un tramo de la secuencia invierte tambien el sentido de
+      sus cadenas abiertas (los anillos salen por donde entran), asi que solo
+      cambian las dos uniones de los bordes. Se descartan inversiones que
+      pondrian un contenedor antes que su hijo.
+    - reeleccion: cada anillo toma el vertice y cada cadena el sentido que
+      minimizan llegada + salida hacia sus vecinos en la secuencia.
+    Los paths vacios (al final de seq) no se tocan.
+    """
+    tail = [s for s in seq if not len(paths[s[0]])]
+    seq = [s for s in seq if len(paths[s[0]])]
+    n = len(seq)
+    if n < 2 or time_budget <= 0:
+        return seq + tail
+    deadline = time.perf_counter() + time_budget
+    parents = np.full(len(paths), -1, dtype=np.intp) if parents is None else np.asarray(parents, dtype=np.intp)
+    start = np.asarray(start, dtype=float)
+    entry, exit_ = _endpoints(paths, closed, seq)
+    items = np.array([s[0] for s in seq], dtype=np.intp)
+
+    def hierarchy_ok(lo: int, hi: int) -> bool:
+        # invertir seq[lo..hi] solo rompe pares hijo-contenedor que esten ambos adentro
+        inside = items[lo : hi + 1]
+        return not np.isin(parents[inside], inside).any()
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        # 2-opt: prev = salida antes del tramo (o el inicio), nxt = entrada despues del tramo
+        for lo in range(n - 1):
+            if time.perf_counter() >= deadline:
+                break
+            prev = exit_[lo - 1] if lo > 0 else start
+            his = np.arange(lo + 1, n)
+            old = np.hypot(*(entry[lo] - prev))
+            new = np.hypot(*(exit_[his] - prev).T)
+            has_next = his + 1 < n
+            nxt = entry[np.minimum(his + 1, n - 1)]
+            old = old + np.where(has_next, np.hypot(*(nxt - exit_[his]).T), 0.0)
+            new = new + np.where(has_next, np.hypot(*(nxt - entry[lo]).T), 0.0)
+            delta = new - old
+            for j in np.argsort(delta):
+                if delta[j] >= -1e-9:
+                    break
+                hi = int(his[j])
+                if not hierarchy_ok(lo, hi):
+                    continue
+                seg = slice(lo, hi + 1)
+                seq[seg] = [(i, v, r) if closed[i] else (i, len(paths[i]) - 1 - v, not r) for i, v, r in seq[seg][::-1]]
+                items[seg] = items[seg][::-1].copy()
+                entry[seg], exit_[seg] = exit_[seg][::-1].copy(), entry[seg][::-1].copy()
+                improved = True
+                break
+        # reeleccion de entrada (anillos) y sentido (cadenas) con los vecinos fijos
+        for k, (i, vert, rev) in enumerate(seq):
+            prev = exit_[k - 1] if k > 0 else start
+            p = np.asarray(paths[i], dtype=float)[:, :2]
+            if closed[i]:
+                cost = np.hypot(*(p - prev).T)
+                if k + 1 < n:
+                    cost = cost + np.hypot(*(entry[k + 1] - p).T)
+                best = int(np.argmin(cost))
+                if cost[best] < cost[vert] - 1e-9:
+                    seq[k] = (i, best, rev)
+                    entry[k] = exit_[k] = p[best]
+                    improved = True
+            elif len(p) >= 2:
+                ends = (p[0], p[-1]) if not rev else (p[-1], p[0])
+                nxt = entry[k + 1] if k + 1 < n else None
+                keep = np.hypot(*(ends[0] - prev)) + (np.hypot(*(nxt - ends[1])) if nxt is not None else 0.0)
+                flip = np.hypot(*(ends[1] - prev)) + (np.hypot(*(nxt - ends[0])) if nxt is not None else 0.0)
+                if flip < keep - 1e-9:
+                    seq[k] = (i, len(p) - 1 - vert if len(p) > 1 else vert, not rev)
+                    entry[k], exit_[k] = ends[1], ends[0]
+                    improved = True
+    return seq + tail
+
+
+def travel_length(
+    paths: Sequence[np.ndarray],
+    closed: Sequence[bool],
+    start: Tuple[float, float] = (0.0, 0.0),
+) -> float:
+    """Recorrido en vacio de paths ya orientados: se entra por el primer vertice y,
+    si el path es abierto, se sale por el ultimo."""
+    cur = np.asarray(start, dtype=float)
+    total = 0.0
+    for p, is_closed in zip(paths, closed):
+        p = np.asarray(p, dtype=float)
+        if len(p) == 0:
+            continue
+        total += float(np.hypot(*(p[0, :2] - cur)))
+        cur = p[0, :2] if is_closed else p[-1, :2]
+    return total
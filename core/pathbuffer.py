@@ -0,0 +1,208 @@
+"""
+Polilíneas 2D empaquetadas para la vista 2D.
+
+En lugar de una lista de dicts {x, y, flag} + {break: True} (un objeto JS por
+punto del lado QML), la geometría viaja como tres buffers contiguos:
+    coords  (N,2) float32   x, y en mm de todos los puntos, concatenados
+    offsets (M+1,) int32    el path i ocupa coords[offsets[i]:offsets[i+1]]
+    flags   (M,) int32      flag por path (1 corte, otro valor = traslado)
+El backend los envía como QByteArray y QML los lee como Float32Array/Int32Array.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+
+class PathBuffer:
+    """Conjunto de polilíneas en buffers planos (ver docstring del módulo)."""
+
+    __slots__ = ("coords", "offsets", "flags")
+
+    def __init__(self, coords: np.ndarray, offsets: np.ndarray, flags: np.ndarray | None = None) -> None:
+        self.coords = np.ascontiguousarray(np.asarray(coords, dtype=np.float32).reshape(-1, 2))
+        self.offsets = np.ascontiguousarray(np.asarray(offsets, dtype=np.int32))
+        n_paths = len(self.offsets) - 1
+        if flags is None:
+            flags = np.ones(max(n_paths, 0), dtype=np.int32)
+        self.flags = np.ascontiguousarray(np.asarray(flags, dtype=np.int32))
+        if n_paths < 0 or self.offsets[0] != 0 or self.offsets[-1] != len(self.coords):
+            raise ValueError("offsets debe empezar en 0 y terminar en len(coords)")
+        if len(self.flags) != n_paths:
+            raise ValueError("flags debe tener un valor por path")
+
+    @classmethod
+    def empty(cls) -> "PathBuffer":
+        return cls(np.empty((0, 2)), np.zeros(1, dtype=np.int32))
+
+    @classmethod
+    def from_blocks(cls, blocks: Iterable[np.ndarray], flags: Iterable[int] | None = None) -> "PathBuffer":
+        """Lista de arrays (M_i, >=2) -> buffer; los bloques vacíos se omiten."""
+        blocks = list(blocks)
+        flags_l = [1] * len(blocks) if flags is None else list(flags)
+        keep = [i for i, b in enumerate(blocks) if len(b)]
+        if not keep:
+            return cls.empty()
+        coords = np.concatenate([np.asarray(blocks[i], dtype=float)[:, :2] for i in keep])
+        lengths = np.array([len(blocks[i]) for i in keep])
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        return cls(coords, offsets, [flags_l[i] for i in keep])
+
+    @classmethod
+    def from_geoms(cls, geoms_final: Sequence[Tuple[object, int]]) -> "PathBuffer":
+        """[(geom, flag)] del conversor; cada anillo de un Polygon es un path."""
+        blocks: List[np.ndarray] = []
+        flags: List[int] = []
+        for geom, flag in geoms_final:
+            if geom is None:
+                continue
+            if geom.geom_type == "Polygon":
+                rings = [geom.exterior] + list(geom.interiors)
+            else:
+                rings = [geom]
+            for r in rings:
+                blocks.append(np.asarray(r.coords, dtype=float))
+                flags.append(int(flag))
+        return cls.from_blocks(blocks, flags)
+
+    @classmethod
+    def from_rows(cls, rows: np.ndarray, flag_col: int | None = None) -> "PathBuffer":
+        """
+        Arreglo con filas NaN separadoras (TXT/CSV) -> buffer.
+        flag_col: columna de flag; el path toma el flag de su último punto
+        (lo mismo que hacía el Canvas al pintar). None = flag 1.
+        """
+        rows = np.asarray(rows)
+        if rows.dtype.kind != "f":
+            rows = rows.astype(float)
+        if rows.size == 0:
+            return cls.empty()
+        rows = rows.reshape(len(rows), -1)
+        sep = np.isnan(rows[:, :2]).any(axis=1)
+        keep = ~sep
+        starts = keep & np.concatenate([[True], sep[:-1]])
+        block_id = np.cumsum(starts)[keep] - 1
+        counts = np.bincount(block_id) if block_id.size else np.empty(0, dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        data = rows[keep]
+        if flag_col is None or len(data) == 0:
+            flags = None
+        else:
+            flags = np.nan_to_num(data[offsets[1:] - 1, flag_col], nan=1.0).astype(np.int32)
+        return cls(data[:, :2], offsets, flags)
+
+    @classmethod
+    def concat(cls, buffers: Sequence["PathBuffer"]) -> "PathBuffer":
+        """Une buffers en uno (los paths se mantienen separados)."""
+        buffers = [b for b in buffers if len(b)]
+        if not buffers:
+            return cls.empty()
+        shift = np.cumsum([0] + [b.n_points for b in buffers[:-1]])
+        offsets = np.concatenate([[0]] + [b.offsets[1:] + s for b, s in zip(buffers, shift)])
+        return cls(
+            np.concatenate([b.coords for b in buffers]),
+            offsets,
+            np.concatenate([b.flags for b in buffers]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_points(self) -> int:
+        return len(self.coords)
+
+    def path(self, i: int) -> np.ndarray:
+        return self.coords[self.offsets[i] : self.offsets[i + 1]]
+
+    def iter_paths(self) -> Iterator[Tuple[np.ndarray, int]]:
+        for i in range(len(self)):
+            yield self.path(i), int(self.flags[i])
+
+    def bounds(self) -> Tuple[float, float, float, float] | None:
+        """(xmin, xmax, ymin, ymax) o None si no hay puntos."""
+        if not len(self.coords):
+            return None
+        lo = self.coords.min(axis=0)
+        hi = self.coords.max(axis=0)
+        return float(lo[0]), float(hi[0]), float(lo[1]), float(hi[1])
+
+    def as_bytes(self) -> Tuple[bytes, bytes, bytes]:
+        """(coords, offsets, flags) en bytes little-endian para QByteArray."""
+        return (
+            self.coords.astype("<f4", copy=False).tobytes(),
+            self.offsets.astype("<i4", copy=False).tobytes(),
+            self.flags.astype("<i4", copy=False).tobytes(),
+        )
+
+
+def ensure_capacity(buf: np.ndarray, need: int, factor: float = 1.5) -> np.ndarray:
+    """buf con capacidad >= need (crece `factor` veces para amortizar las copias)."""
+    if need <= len(buf):
+        return buf
+    out = np.empty((max(need, int(len(buf) * factor)),) + buf.shape[1:], dtype=buf.dtype)
+    out[: len(buf)] = buf
+    return out
+
+
+class PathBufferBuilder:
+    """
+    Arma un PathBuffer desde filas leídas por trozos (mismo contrato que
+    PathBuffer.from_rows: filas NaN separadoras, flag del último punto). Los
+    puntos se escriben en un buffer float32 que crece, sin guardar los trozos
+    ni concatenarlos al final; un path puede seguir en el trozo siguiente.
+    """
+
+    def __init__(self, flag_col: int | None = None, capacity: int = 0) -> None:
+        self.flag_col = flag_col
+        self._coords = np.empty((capacity, 2), dtype=np.float32)
+        self._starts = np.empty(0, dtype=np.int64)  # primer punto de cada path
+        self._flags = np.empty(0, dtype=np.int32)
+        self._n = 0
+        self._n_paths = 0
+        self._open = False  # el último path sigue abierto (el trozo no terminó en separador)
+
+    @property
+    def n_points(self) -> int:
+        return self._n
+
+    def reserve(self, n_points: int) -> None:
+        """Preasigna lugar para n_points puntos (p.ej. estimado por bytes leídos)."""
+        self._coords = ensure_capacity(self._coords, n_points, factor=1.0)
+
+    def append(self, rows: np.ndarray) -> None:
+        rows = np.asarray(rows)
+        if not rows.size:
+            return
+        rows = rows.reshape(len(rows), -1)
+        sep = np.isnan(rows[:, :2]).any(axis=1)
+        keep = ~sep
+        starts = keep & np.concatenate([[not self._open], sep[:-1]])
+        self._open = bool(keep[-1])
+        data = rows[keep]
+        m = len(data)
+        if not m:
+            return
+        self._coords = ensure_capacity(self._coords, self._n + m)
+        self._coords[self._n : self._n + m] = data[:, :2]
+        new_starts = self._n + np.flatnonzero(starts[keep])
+        k = self._n_paths + len(new_starts)
+        self._starts = ensure_capacity(self._starts, k)
+        self._starts[self._n_paths : k] = new_starts
+        self._flags = ensure_capacity(self._flags, k)
+        self._flags[self._n_paths : k] = 1
+        if self.flag_col is not None:
+            # path de cada punto (el primero puede venir del trozo anterior) y su último punto
+            pid = self._n_paths - 1 + np.cumsum(starts[keep])
+            last = np.concatenate([pid[1:] != pid[:-1], [True]])
+            self._flags[pid[last]] = np.nan_to_num(data[last, self.flag_col], nan=1.0).astype(np.int32)
+        self._n += m
+        self._n_paths = k
+
+    def build(self) -> PathBuffer:
+        if not self._n:
+            return PathBuffer.empty()
+        offsets = np.append(self._starts[: self._n_paths], self._n)
+        return PathBuffer(self._coords[: self._n], offsets, self._flags[: self._n_paths])
@@ -0,0 +1,115 @@
+"""
+Pirámide de niveles de detalle (LOD) para la vista 2D.
+
+Por cada trabajo cargado se precalculan versiones simplificadas con
+Douglas-Peucker (shapely.simplify, vectorizado sobre todos los paths) a
+tolerancias en mm que se reducen a la mitad por nivel:
+    nivel 0       tol = extent / COARSE_DIVISOR (grueso, se envía al cargar)
+    nivel k       tol_0 / 2^k
+    último nivel  tol = 0 (datos originales)
+El backend envía a Viewer2D el nivel más grueso cuya tolerancia no supera
+LOD_TOL_PIXELS px al zoom actual.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import List
+
+import numpy as np
+import shapely
+
+from core.pathbuffer import PathBuffer
+
+LOD_TOL_PIXELS = 0.5  # error máximo aceptado en pantalla (px)
+COARSE_DIVISOR = 512.0  # nivel 0: ~1 px con la pieza entera en ~500 px
+MIN_TOL = 0.01  # mm; por debajo se usan los datos originales
+
+
+def simplify_paths(paths: PathBuffer, tol: float) -> PathBuffer:
+    """Douglas-Peucker por path; conserva extremos, flags y paths de un punto."""
+    if tol <= 0 or not paths.n_points:
+        return paths
+    counts = np.diff(paths.offsets)
+    pid = np.repeat(np.arange(len(paths)), counts)
+    multi = counts >= 2
+    # shapely necesita índices consecutivos: solo paths de 2+ puntos
+    line_ids = np.flatnonzero(multi)
+    sel = multi[pid]
+    local = np.cumsum(multi) - 1
+    lines = shapely.linestrings(paths.coords[sel].astype(float), indices=local[pid[sel]])
+    simple = shapely.simplify(lines, tol, preserve_topology=False)
+    xy, idx = shapely.get_coordinates(simple, return_index=True)
+
+    all_xy = np.concatenate([xy, paths.coords[~sel]])
+    all_pid = np.concatenate([line_ids[idx], pid[~sel]])
+    order = np.argsort(all_pid, kind="stable")
+    new_counts = np.bincount(all_pid, minlength=len(paths))
+    offsets = np.concatenate([[0], np.cumsum(new_counts)])
+    return PathBuffer(all_xy[order], offsets, paths.flags)
+
+
+def pyramid_tolerances(paths: PathBuffer, min_tol: float = MIN_TOL) -> List[float]:
+    """Tolerancias (mm) de grueso a fino; la última es 0 (original)."""
+    bounds = paths.bounds()
+    if bounds is None:
+        return [0.0]
+    extent = max(bounds[1] - bounds[0], bounds[3] - bounds[2])
+    tol = extent / COARSE_DIVISOR
+    out: List[float] = []
+    while tol >= min_tol:
+        out.append(tol)
+        tol /= 2.0
+    out.append(0.0)
+    return out
+
+
+class PathPyramid:
+    """
+    Niveles de un trabajo. `levels[i]` es None hasta que se calcula; el nivel 0
+    se calcula al construir (coarse) y el resto en segundo plano (set_level).
+    """
+
+    def __init__(self, paths: PathBuffer, min_tol: float = MIN_TOL) -> None:
+        self.tolerances = pyramid_tolerances(paths, min_tol)
+        self.levels: List[PathBuffer | None] = [None] * len(self.tolerances)
+        self.levels[-1] = paths
+        if len(self.levels) > 1:
+            self.levels[0] = simplify_paths(paths, self.tolerances[0])
+
+    @property
+    def full(self) -> PathBuffer:
+        return self.levels[-1]
+
+    @property
+    def coarse(self) -> PathBuffer:
+        return self.levels[0]
+
+    def pending(self) -> List[int]:
+        return [i for i, lvl in enumerate(self.levels) if lvl is None]
+
+    def set_level(self, i: int, paths: PathBuffer) -> None:
+        self.levels[i] = paths
+
+    def level_for(self, mm_per_px: float, tol_px: float = LOD_TOL_PIXELS) -> int:
+        """Nivel más grueso cuya tolerancia es <= tol_px píxeles al zoom dado."""
+        target = tol_px * mm_per_px
+        if not math.isfinite(target) or target <= 0:
+            return len(self.levels) - 1
+        for i, tol in enumerate(self.tolerances):
+            if tol <= target:
+                return i
+        return len(self.levels) - 1
+
+    def available(self, i: int) -> int:
+        """
+        Nivel ya calculado más cercano a i: primero el más fino de los gruesos
+        (se refina cuando llega el nivel pedido), luego los más finos.
+        """
+        for j in range(i, -1, -1):
+            if self.levels[j] is not None:
+                return j
+        for j in range(i + 1, len(self.levels)):
+            if self.levels[j] is not None:
+                return j
+        return len(self.levels) - 1
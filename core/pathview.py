@@ -0,0 +1,413 @@
+"""
+Render 2D de paths sobre el scene graph de Qt Quick.
+
+PathView2D es un QQuickItem registrado para QML que recibe los buffers de
+core.pathbuffer (QByteArray) y arma QSGGeometryNode en modo DrawTriangles con
+los vertices en mm: relleno translucido de los lazos cerrados (triangulacion
+de Delaunay restringida de shapely, como el fill del Canvas y del preview) y
+trazos de corte / traslado como quads de lineWidth px. No se usa DrawLines con
+setLineWidth: la mayoria de los backends RHI dibuja esas lineas de 1 px.
+
+Pan y rotacion solo cambian la matriz del QSGTransformNode raiz. El relleno se
+triangula en un QThreadPool al cambiar los datos (la triangulacion de un
+trabajo grande tarda ~1 s) y aparece cuando termina; los trazos se arman al
+cambiar los datos o la escala (su ancho es en px). El nivel de detalle lo
+decide el backend con la piramide de core.pathlod (Viewer2D.detailRequested ->
+Backend.requestPathLevel).
+"""
+
+from __future__ import annotations
+
+import ctypes
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+import shapely
+from PySide6.QtCore import Property, QByteArray, QObject, QRunnable, QThreadPool, Signal, Slot
+from PySide6.QtGui import QColor, QMatrix4x4
+from PySide6.QtQml import qmlRegisterType
+from PySide6.QtQuick import (
+    QQuickItem,
+    QSGFlatColorMaterial,
+    QSGGeometry,
+    QSGGeometryNode,
+    QSGNode,
+    QSGTransformNode,
+)
+
+from core.pathbuffer import ensure_capacity
+
+QML_IMPORT_NAME = "RoboticHMI"
+QML_IMPORT_MAJOR_VERSION = 1
+
+CLOSE_TOL = 1e-3  # mm; primer y ultimo punto a esta distancia = lazo cerrado (rellenable)
+FILL_ALPHA = 0.25  # como core.preview
+# QSGGeometry guarda una referencia al AttributeSet: debe vivir tanto como la geometria
+_POINT2D = QSGGeometry.defaultAttributes_Point2D()
+
+
+def _unpack(coords: QByteArray, offsets: QByteArray, flags: QByteArray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Buffers de core.pathbuffer -> (coords (N,2), path_id, is_cut) por punto."""
+    xy = np.frombuffer(bytes(coords), dtype="<f4").reshape(-1, 2)
+    offs = np.frombuffer(bytes(offsets), dtype="<i4")
+    fl = np.frombuffer(bytes(flags), dtype="<i4")
+    if len(offs) < 2 or len(xy) == 0:
+        return np.empty((0, 2), dtype=np.float32), np.empty(0, dtype=np.int32), np.empty(0, dtype=bool)
+    counts = np.diff(offs)
+    path_id = np.repeat(np.arange(len(counts), dtype=np.int32), counts)
+    return np.ascontiguousarray(xy, dtype=np.float32), path_id, np.repeat(fl == 1, counts)
+
+
+def stroke_triangles(coords: np.ndarray, path_id: np.ndarray, half_width: float) -> np.ndarray:
+    """
+    Triangulos (6S,2) float32 de los segmentos consecutivos de cada path, cada
+    uno como un quad de ancho 2*half_width (mm) a lo largo del segmento.
+    """
+    if len(coords) < 2:
+        return np.empty((0, 2), dtype=np.float32)
+    seg = np.flatnonzero(path_id[1:] == path_id[:-1])
+    p0 = coords[seg].astype(np.float64)
+    p1 = coords[seg + 1].astype(np.float64)
+    d = p1 - p0
+    length = np.hypot(d[:, 0], d[:, 1])
+    length[length == 0] = 1.0
+    normal = np.column_stack([-d[:, 1], d[:, 0]]) * (half_width / length)[:, None]
+    a, b, c, e = p0 + normal, p0 - normal, p1 + normal, p1 - normal
+    return np.stack([a, b, c, c, b, e], axis=1).reshape(-1, 2).astype(np.float32)
+
+
+def fill_triangles(coords: np.ndarray, path_id: np.ndarray) -> np.ndarray:
+    """
+    Triangulos (3T,2) float32 que rellenan cada path cerrado (primer y ultimo
+    punto a menos de CLOSE_TOL) de 3+ vertices. Cada lazo se rellena por
+    separado, como el Canvas anterior; los que se cortan a si mismos se
+    corrigen con make_valid antes de triangular.
+    """
+    n = len(coords)
+    if n < 4:
+        return np.empty((0, 2), dtype=np.float32)
+    starts = np.flatnonzero(np.concatenate([[True], path_id[1:] != path_id[:-1]]))
+    ends = np.append(starts[1:], n) - 1
+    closed = (ends - starts >= 3) & (np.hypot(*(coords[starts] - coords[ends]).T) < CLOSE_TOL)
+    if not closed.any():
+        return np.empty((0, 2), dtype=np.float32)
+    counts = (ends - starts + 1)[closed]
+    idx = np.concatenate([np.arange(a, b + 1) for a, b in zip(starts[closed], ends[closed])])
+    rings = shapely.linearrings(coords[idx].astype(np.float64), indices=np.repeat(np.arange(len(counts)), counts))
+    polys = shapely.polygons(rings)
+    bad = ~shapely.is_valid(polys)
+    if bad.any():
+        polys[bad] = shapely.make_valid(polys[bad], method="structure", keep_collapsed=False)
+    tris = shapely.get_parts(shapely.constrained_delaunay_triangles(polys))
+    if not len(tris):
+        return np.empty((0, 2), dtype=np.float32)
+    # cada triangulo es un anillo de 4 coordenadas (cerrado): se descarta la ultima
+    ring = shapely.get_coordinates(shapely.get_exterior_ring(tris)).reshape(-1, 4, 2)
+    return ring[:, :3].reshape(-1, 2).astype(np.float32)
+
+
+class _FillSignals(QObject):
+    done = Signal(int, object)  # job, (relleno traslado, relleno corte) o None si se cancelo
+
+
+class _FillWorker(QRunnable):
+    """Triangula el relleno de corte y traslado fuera del hilo de GUI."""
+
+    def __init__(self, job: int, coords: np.ndarray, path_id: np.ndarray, is_cut: np.ndarray) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.job = job
+        self.data = (coords, path_id, is_cut)
+        self.signals = _FillSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def run(self) -> None:
+        coords, path_id, is_cut = self.data
+        fills = None
+        if not self._cancel.is_set():
+            fills = tuple(fill_triangles(coords[m], path_id[m]) for m in (~is_cut, is_cut))
+        self.signals.done.emit(self.job, fills)
+
+
+class PathView2D(QQuickItem):
+    """Vista de paths para Viewer2D (ver docstring del modulo)."""
+
+    viewChanged = Signal()
+    styleChanged = Signal()
+    pathChanged = Signal()
+
+    def __init__(self, parent: QQuickItem | None = None) -> None:
+        super().__init__(parent)
+        self.setFlag(QQuickItem.ItemHasContents, True)
+        self._coords = np.empty((0, 2), dtype=np.float32)
+        self._path_id = np.empty(0, dtype=np.int32)
+        self._is_cut = np.empty(0, dtype=bool)  # por punto
+        self._extent = 0.0
+        self._bounds: List[float] = []  # xmin, xmax, ymin, ymax (vacio sin datos)
+        self._store: Dict[str, np.ndarray] = {}  # arreglos con capacidad de sobra (appendPath)
+        self._geometry_dirty = False
+        # triangulos de relleno (traslado, corte); _fill_dirty: falta subirlos al scene graph
+        self._fills: Tuple[np.ndarray, np.ndarray] = (np.empty((0, 2), dtype=np.float32),) * 2
+        self._fill_dirty = False
+        self._fill_pool = QThreadPool(self)
+        self._fill_pool.setMaxThreadCount(1)
+        self._fill_job = 0
+        self._fill_workers: Dict[int, _FillWorker] = {}
+        self._stroke_scale = 0.0  # escala (px/mm) con la que se armaron los trazos
+        self._sg_nodes: Tuple[QSGTransformNode, List[QSGGeometryNode]] | None = None
+        self._axis = [-300.0, 300.0, -300.0, 300.0]
+        self._margin_ratio = 0.05
+        self._rotation = 0.0
+        self._line_width = 2.0
+        self._cut_color = QColor(0, 128, 0, 204)
+        self._travel_color = QColor(255, 102, 0, 230)
+
+    # Datos
+    @Slot(QByteArray, QByteArray, QByteArray)
+    def setPath(self, coords: QByteArray, offsets: QByteArray, flags: QByteArray) -> None:
+        xy, path_id, is_cut = _unpack(coords, offsets, flags)
+        if len(xy) == 0:
+            self.clear()
+            return
+        self._coords, self._path_id, self._is_cut = xy, path_id, is_cut
+        self._store = {}
+        self._set_bounds(xy.min(axis=0), xy.max(axis=0))
+        self._data_changed()
+
+    @Slot(QByteArray, QByteArray, QByteArray)
+    def appendPath(self, coords: QByteArray, offsets: QByteArray, flags: QByteArray) -> None:
+        """
+        Agrega paths al final (trozos de una carga en curso) sin reenviar los
+        anteriores. Los arreglos crecen con capacidad de sobra (ensure_capacity).
+        """
+        xy, path_id, is_cut = _unpack(coords, offsets, flags)
+        if len(xy) == 0:
+            return
+        n, m = len(self._coords), len(xy)
+        first = int(self._path_id[-1]) + 1 if n else 0
+        lo, hi = xy.min(axis=0), xy.max(axis=0)
+        if n:
+            lo = np.minimum(lo, self._bounds[0::2])
+            hi = np.maximum(hi, self._bounds[1::2])
+        for name, chunk in (("_coords", xy), ("_path_id", path_id + first), ("_is_cut", is_cut)):
+            buf = ensure_capacity(self._store.get(name, getattr(self, name)), n + m)
+            buf[n : n + m] = chunk
+            self._store[name] = buf
+            setattr(self, name, buf[: n + m])
+        self._set_bounds(lo, hi)
+        self._data_changed()
+
+    @Slot()
+    def clear(self) -> None:
+        self._coords = np.empty((0, 2), dtype=np.float32)
+        self._path_id = np.empty(0, dtype=np.int32)
+        self._is_cut = np.empty(0, dtype=bool)
+        self._extent = 0.0
+        self._bounds = []
+        self._store = {}
+        self._data_changed()
+
+    def _set_bounds(self, lo: np.ndarray, hi: np.ndarray) -> None:
+        self._extent = float((hi - lo).max())
+        self._bounds = [float(lo[0]), float(hi[0]), float(lo[1]), float(hi[1])]
+
+    def _data_changed(self) -> None:
+        self._geometry_dirty = True
+        self._start_fill()
+        self.pathChanged.emit()
+        self.update()
+
+    def _start_fill(self) -> None:
+        worker = self._fill_workers.get(self._fill_job)
+        if worker is not None:
+            worker.cancel()
+        self._fill_job += 1
+        self._fills = (np.empty((0, 2), dtype=np.float32),) * 2
+        self._fill_dirty = True
+        if len(self._coords):
+            worker = _FillWorker(self._fill_job, self._coords, self._path_id, self._is_cut)
+            worker.signals.done.connect(self._on_fill_done)
+            self._fill_workers[self._fill_job] = worker
+            self._fill_pool.start(worker)
+
+    @Slot(int, object)
+    def _on_fill_done(self, job: int, fills: Tuple[np.ndarray, np.ndarray] | None) -> None:
+        self._fill_workers.pop(job, None)
+        if job == self._fill_job and fills is not None:
+            self._fills = fills
+            self._fill_dirty = True
+            self.update()
+
+    @Property(int, notify=pathChanged)
+    def pointCount(self) -> int:
+        return len(self._coords)
+
+    @Property("QVariantList", notify=pathChanged)
+    def bounds(self) -> List[float]:
+        """[xmin, xmax, ymin, ymax] en mm de los datos cargados; vacio sin datos."""
+        return list(self._bounds)
+
+    # Vista (mismas convenciones que View2DCanvas)
+    def _set_axis(self, i: int, value: float) -> None:
+        if self._axis[i] != value:
+            self._axis[i] = float(value)
+            self.viewChanged.emit()
+            self.update()
+
+    axisMinX = Property(float, lambda self: self._axis[0], lambda self, v: self._set_axis(0, v), notify=viewChanged)
+    axisMaxX = Property(float, lambda self: self._axis[1], lambda self, v: self._set_axis(1, v), notify=viewChanged)
+    axisMinY = Property(float, lambda self: self._axis[2], lambda self, v: self._set_axis(2, v), notify=viewChanged)
+    axisMaxY = Property(float, lambda self: self._axis[3], lambda self, v: self._set_axis(3, v), notify=viewChanged)
+
+    def _get_margin(self) -> float:
+        return self._margin_ratio
+
+    def _set_margin(self, value: float) -> None:
+        if self._margin_ratio != value:
+            self._margin_ratio = float(value)
+            self.viewChanged.emit()
+            self.update()
+
+    marginRatio = Property(float, _get_margin, _set_margin, notify=viewChanged)
+
+    def _get_rotation(self) -> float:
+        return self._rotation
+
+    def _set_rotation(self, value: float) -> None:
+        if self._rotation != value:
+            self._rotation = float(value)
+            self.viewChanged.emit()
+            self.update()
+
+    rotationDeg = Property(float, _get_rotation, _set_rotation, notify=viewChanged)
+
+    # Estilo
+    def _get_line_width(self) -> float:
+        return self._line_width
+
+    def _set_line_width(self, value: float) -> None:
+        if self._line_width != value:
+            self._line_width = float(value)
+            self._geometry_dirty = True
+            self.styleChanged.emit()
+            self.update()
+
+    lineWidth = Property(float, _get_line_width, _set_line_width, notify=styleChanged)
+
+    def _get_cut_color(self) -> QColor:
+        return self._cut_color
+
+    def _set_cut_color(self, value: QColor) -> None:
+        self._cut_color = QColor(value)
+        self._geometry_dirty = True
+        self.styleChanged.emit()
+        self.update()
+
+    cutColor = Property(QColor, _get_cut_color, _set_cut_color, notify=styleChanged)
+
+    def _get_travel_color(self) -> QColor:
+        return self._travel_color
+
+    def _set_travel_color(self, value: QColor) -> None:
+        self._travel_color = QColor(value)
+        self._geometry_dirty = True
+        self.styleChanged.emit()
+        self.update()
+
+    travelColor = Property(QColor, _get_travel_color, _set_travel_color, notify=styleChanged)
+
+    # Transformacion mm -> px
+    def _scale(self) -> float:
+        w, h = self.width(), self.height()
+        margin = min(w, h) * self._margin_ratio
+        range_x = max(self._axis[1] - self._axis[0], 1e-6)
+        range_y = max(self._axis[3] - self._axis[2], 1e-6)
+        return min((w - 2 * margin) / range_x, (h - 2 * margin) / range_y)
+
+    def _matrix(self) -> QMatrix4x4:
+        w, h = self.width(), self.height()
+        margin = min(w, h) * self._margin_ratio
+        s = self._scale()
+        cx = (self._axis[0] + self._axis[1]) / 2
+        cy = (self._axis[2] + self._axis[3]) / 2
+        m = QMatrix4x4()
+        m.translate(w / 2, h / 2)
+        m.rotate(self._rotation, 0, 0, 1)
+        m.translate(-w / 2, -h / 2)
+        # centro de datos en px, igual que xPx/yPx del Canvas
+        m.translate(margin + (self._axis[1] - self._axis[0]) * s / 2, margin + (self._axis[3] - self._axis[2]) * s / 2)
+        m.scale(s, -s)
+        m.translate(-cx, -cy)
+        return m
+
+    # Scene graph
+    @staticmethod
+    def _make_node() -> QSGGeometryNode:
+        node = QSGGeometryNode()
+        geometry = QSGGeometry(_POINT2D, 0)
+        geometry.setDrawingMode(QSGGeometry.DrawingMode.DrawTriangles)
+        node.setGeometry(geometry)
+        node.setFlag(QSGNode.OwnsGeometry)
+        node.setMaterial(QSGFlatColorMaterial())
+        node.setFlag(QSGNode.OwnsMaterial)
+        # el wrapper de Python es dueño del nodo (self._sg_nodes); si la raiz
+        # tambien lo borrara habria doble liberacion
+        node.setFlag(QSGNode.OwnedByParent, False)
+        return node
+
+    @staticmethod
+    def _upload(node: QSGGeometryNode, verts: np.ndarray, color: QColor) -> None:
+        geometry = node.geometry()
+        geometry.allocate(len(verts))
+        if len(verts):
+            ctypes.memmove(int(geometry.vertexData()), verts.ctypes.data, verts.nbytes)
+        node.material().setColor(color)
+        node.markDirty(QSGNode.DirtyGeometry | QSGNode.DirtyMaterial)
+
+    def _by_kind(self) -> Tuple[Tuple[np.ndarray, np.ndarray, QColor], ...]:
+        # un path es de corte o no en todos sus puntos; traslado debajo de corte
+        cut = self._is_cut
+        return (
+            (self._coords[~cut], self._path_id[~cut], self._travel_color),
+            (self._coords[cut], self._path_id[cut], self._cut_color),
+        )
+
+    def updatePaintNode(self, old_node: QSGNode, _data) -> QSGNode:
+        if old_node is None or self._sg_nodes is None:
+            # se guardan las referencias: los wrappers de los hijos no sobreviven a firstChild()
+            root = QSGTransformNode()
+            # relleno traslado, relleno corte, trazo traslado, trazo corte
+            nodes = [self._make_node() for _ in range(4)]
+            for node in nodes:
+                root.appendChildNode(node)
+            self._sg_nodes = (root, nodes)
+            self._geometry_dirty = True
+        root, nodes = self._sg_nodes
+        if self._fill_dirty or self._geometry_dirty:
+            for node, verts, color in zip(nodes[:2], self._fills, (self._travel_color, self._cut_color)):
+                fill = QColor(color)
+                fill.setAlphaF(FILL_ALPHA)
+                self._upload(node, verts, fill)
+            self._fill_dirty = False
+        scale = self._scale()
+        if scale > 0 and (self._geometry_dirty or abs(scale / self._stroke_scale - 1) > 1e-3):
+            for node, (coords, pid, color) in zip(nodes[2:], self._by_kind()):
+                self._upload(node, stroke_triangles(coords, pid, self._line_width / 2 / scale), color)
+            self._stroke_scale = scale
+            self._geometry_dirty = False
+        root.setMatrix(self._matrix())
+        root.markDirty(QSGNode.DirtyMatrix)
+        return root
+
+    def geometryChange(self, new_geometry, old_geometry) -> None:
+        super().geometryChange(new_geometry, old_geometry)
+        self.update()
+
+
+def register_qml_types() -> None:
+    """Registra PathView2D en QML (import RoboticHMI 1.0). Llamar antes de cargar QML."""
+    qmlRegisterType(PathView2D, QML_IMPORT_NAME, QML_IMPORT_MAJOR_VERSION, 0, "PathView2D")
@@ -15,6 +15,8 @@ from __future__ import annotations
 import math
 from typing import Iterable, List, Sequence, Tuple
 
+import numpy as np
+
 Point4 = Sequence[float]  # [x, y, z, flag]
 Point5 = Sequence[float]  # [x, y, z, flag, v]
 
@@ -127,6 +129,151 @@ def interpolar_trayectoria(
     return tray_int
 
 
+def _as_block_array(
+    tray_bruta: Iterable[Iterable[Point4]] | np.ndarray,
+    block_index: Sequence[int] | np.ndarray | None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Normaliza la entrada a (datos (M,4), inicio_de_bloque (M,) bool).
+
+    - lista de grupos: cada grupo es un bloque.
+    - ndarray (M,4) + block_index: bloques = tramos contiguos con el mismo indice.
+    - ndarray (M,4) sin block_index: las filas con NaN separan bloques.
+    """
+    if isinstance(tray_bruta, np.ndarray):
+        arr = np.asarray(tray_bruta, dtype=float)
+        if arr.ndim != 2 or arr.shape[1] < 4:
+            raise ValueError("tray_bruta debe ser (M,4) [X,Y,Z,FLAG]")
+        arr = arr[:, :4]
+        if block_index is None:
+            sep = np.isnan(arr).any(axis=1)
+            arr = arr[~sep]
+            new = (~sep & np.concatenate([[True], sep[:-1]]))[~sep]
+        else:
+            bid = np.asarray(block_index)
+            if bid.shape != (arr.shape[0],):
+                raise ValueError("block_index debe tener una entrada por fila")
+            new = np.concatenate([[True], bid[1:] != bid[:-1]]) if len(bid) else np.empty(0, dtype=bool)
+        return arr, new
+
+    groups = []
+    for g in tray_bruta:
+        rows = [list(p) for p in g if p is not None]
+        if rows:
+            groups.append(np.asarray(rows, dtype=float).reshape(len(rows), -1)[:, :4])
+    if not groups:
+        return np.empty((0, 4)), np.empty(0, dtype=bool)
+    new = np.zeros(sum(len(g) for g in groups), dtype=bool)
+    new[np.cumsum([0] + [len(g) for g in groups[:-1]])] = True
+    return np.concatenate(groups), new
+
+
+def interpolar_trayectoria_array(
+    tray_bruta: Iterable[Iterable[Point4]] | np.ndarray,
+    paso: float = 1.0,
+    z_cut: float | None = None,
+    block_index: Sequence[int] | np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Version vectorizada de interpolar_trayectoria (misma salida dentro de ~1e-9 mm).
+
+    Procesa todos los bloques en una sola pasada NumPy: distancia acumulada con
+    np.hypot/np.cumsum y muestreo por paso con busqueda vectorizada.
+
+    tray_bruta: lista de grupos [X,Y,Z,FLAG] (mm), o ndarray (M,4) con block_index
+        por fila (o con filas NaN como separadores si block_index es None).
+    Retorna: ndarray (N,4) [X,Y,Z,FLAG] con filas NaN separando bloques.
+    """
+    if z_cut is None:
+        raise ValueError("z_cut es requerido")
+    data, new = _as_block_array(tray_bruta, block_index)
+    if len(data) == 0:
+        return np.empty((0, 4))
+    run = np.cumsum(new) - 1
+    starts = np.flatnonzero(new)
+    nb = len(starts)
+    flags = data[:, 3]
+    flag_bloque = flags[starts]
+
+    # 1) grupos validos: algun flag != 0
+    valid = np.bincount(run, weights=(flags != 0), minlength=nb) > 0
+    valid_rank = np.cumsum(valid) - 1
+    n_valid = int(valid.sum())
+
+    # 2) filas limpias (sin NaN en X/Y) de grupos validos
+    rows = np.flatnonzero(valid[run] & ~(np.isnan(data[:, 0]) | np.isnan(data[:, 1])))
+    if len(rows) == 0:
+        return np.empty((0, 4))
+    r_blk = run[rows]
+    nz = np.bincount(r_blk, minlength=nb)
+    blocks = np.flatnonzero(nz)
+    cnt_clean = nz[blocks]
+    first = np.cumsum(cnt_clean) - cnt_clean  # posicion en `rows` del primer punto de cada bloque
+    last = first + cnt_clean - 1
+    x = data[rows, 0]
+    y = data[rows, 1]
+    z = np.where(flag_bloque[r_blk] == 1, z_cut, data[rows, 2])
+    z_init = z[first]
+
+    seg = np.empty(len(rows))
+    seg[0] = 0.0
+    seg[1:] = np.hypot(np.diff(x), np.diff(y))
+    seg[first] = 0.0
+    cum = np.cumsum(seg)
+    dist = cum - np.repeat(cum[first], cnt_clean)
+    L = dist[last]
+
+    short = (L < paso) | (cnt_clean < 2)
+    n_int = np.floor(L / paso).astype(np.int64) + 1
+    extra = (n_int - 1) * paso < L
+    cnt = np.where(short, cnt_clean, n_int + extra)
+    sep_after = valid_rank[blocks] < n_valid - 1
+    out_len = cnt + sep_after
+    out_start = np.cumsum(out_len) - out_len
+    out = np.full((int(out_len.sum()), 4), np.nan)
+
+    # bloques cortos: se copian los puntos originales
+    sb = np.flatnonzero(short)
+    if len(sb):
+        m = cnt_clean[sb]
+        k = np.arange(m.sum()) - np.repeat(np.cumsum(m) - m, m)
+        src = np.repeat(first[sb], m) + k
+        dst = np.repeat(out_start[sb], m) + k
+        out[dst, 0] = x[src]
+        out[dst, 1] = y[src]
+        out[dst, 2] = np.repeat(z_init[sb], m)
+        out[dst, 3] = data[rows[src], 3]
+
+    # bloques largos: muestreo cada `paso` + punto final exacto
+    lb = np.flatnonzero(~short)
+    if len(lb):
+        m = cnt[lb]
+        tb = np.repeat(np.arange(len(lb)), m)
+        k = np.arange(m.sum()) - np.repeat(np.cumsum(m) - m, m)
+        s = k * paso
+        is_end = k == m[tb] - 1
+        end_fix = is_end & extra[lb][tb]
+        s[end_fix] = L[lb][tb][end_fix]
+        # eje global monotono: cada bloque desplazado mas alla del anterior
+        shift = np.cumsum(L + paso + 1.0) - (L + paso + 1.0)
+        key = dist + np.repeat(shift, cnt_clean)
+        j = np.searchsorted(key, s + shift[lb][tb], side="right") - 1
+        j = np.clip(j, first[lb][tb], last[lb][tb] - 1)
+        dd = dist[j + 1] - dist[j]
+        ratio = np.divide(s - dist[j], dd, out=np.zeros_like(s), where=dd != 0)
+        xi = x[j] + ratio * (x[j + 1] - x[j])
+        yi = y[j] + ratio * (y[j + 1] - y[j])
+        at_end = s >= L[lb][tb]
+        xi[at_end] = x[last[lb][tb][at_end]]
+        yi[at_end] = y[last[lb][tb][at_end]]
+        dst = np.repeat(out_start[lb], m) + k
+        out[dst, 0] = xi
+        out[dst, 1] = yi
+        out[dst, 2] = np.repeat(z_init[lb], m)
+        out[dst, 3] = np.repeat(flag_bloque[blocks[lb]], m)
+    return out
+
+
 def _split_blocks(tray_int: Sequence[Sequence[float]]) -> List[List[List[float]]]:
     blocks: List[List[List[float]]] = []
     current: List[List[float]] = []
@@ -304,3 +451,191 @@ def planificar_trayectoria(
         tray_out.append([x / 1000.0, y / 1000.0, z / 1000.0, f, v_out])
 
     return tray_out
+
+
+def _ramp(start: np.ndarray, delta: np.ndarray, denom: np.ndarray, count: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Filas i=1..count[j] de start[j] + i*delta[j]/denom[j] para todos los tramos j,
+    con la misma aritmetica que los bucles de planificar_trayectoria.
+    Retorna (valores, tramo de cada fila, i de cada fila).
+    """
+    count = np.asarray(count, dtype=np.int64)
+    seg = np.repeat(np.arange(len(count)), count)
+    i = np.arange(int(count.sum())) - np.repeat(np.cumsum(count) - count, count) + 1
+    return start[seg] + i * delta[seg] / denom[seg], seg, i
+
+
+def _n_steps(span: np.ndarray, paso: float) -> np.ndarray:
+    """max(2, ceil(|span| / paso)) vectorizado."""
+    return np.maximum(2, np.ceil(np.abs(span) / paso).astype(np.int64))
+
+
+def planificar_trayectoria_array(
+    tray_int: Sequence[Sequence[float]] | np.ndarray,
+    z_home: float,
+    z_cut: float,
+    paso: float = 1.0,
+    speed_cut: float = 5000.0,
+    speed_traslado: float = 15000.0,
+    a_max_cart: float = 2000.0,
+) -> np.ndarray:
+    """
+    Version con arreglos NumPy de planificar_trayectoria (misma salida [x,y,z,flag,v]
+    en metros y m/s, dentro de redondeo).
+
+    Las transiciones (punto de ruptura, subida a z_home, traslado XY y bajada) se
+    generan para todos los bloques a la vez sobre un arreglo preasignado. El
+    perfil trapezoidal usa la forma cerrada v_i^2 = min_k (v_k^2 + 2*a*dL*|i-k|):
+    cada punto con v=0 obligado (cambio de flag, reposo) actua como ruptura que
+    domina a todo lo anterior/posterior, por lo que ambas pasadas se resuelven con
+    un minimo acumulado en lugar de un bucle secuencial.
+    """
+    V_tras_ms = (speed_traslado / 1000.0) / 60.0
+    A_max_ms2 = a_max_cart / 1000.0
+    dL_cart = paso / 1000.0
+
+    arr = np.asarray(tray_int, dtype=float)
+    if arr.size == 0:
+        return np.empty((0, 5))
+    arr = arr.reshape(len(arr), -1)[:, :4]
+    sep = np.isnan(arr).any(axis=1)
+    data = arr[~sep]
+    if len(data) == 0:
+        return np.empty((0, 5))
+    starts = np.flatnonzero((~sep & np.concatenate([[True], sep[:-1]]))[~sep])
+    ends = np.append(starts[1:], len(data))
+    nb = ends - starts
+    last = ends - 1
+    flag_block = data[starts, 3].astype(np.int64)
+
+    # Bloque inicial + plunge a z_cut
+    z_end0 = data[last[0], 2]
+    nZ = int(_n_steps(np.array([z_cut - z_end0]), paso)[0])
+    z_plunge, _, _ = _ramp(np.array([z_end0]), np.array([z_cut - z_end0]), np.array([nZ - 1]), np.array([nZ - 1]))
+
+    # Transiciones de los bloques 1..B-1 (vectorizadas por bloque)
+    b = np.arange(1, len(starts))
+    p_prev = data[last[b - 1], :3].copy()
+    if len(b):
+        p_prev[0, 2] = z_plunge[-1]
+    p_ini = data[starts[b], :3]
+    z_prev = p_prev[:, 2]
+    z_next = p_ini[:, 2]
+    n1 = _n_steps(z_home - z_prev, paso)
+    c1 = np.where(np.abs(z_home - z_prev) > 1e-6, n1 - 1, 0)
+    dx = p_ini[:, 0] - p_prev[:, 0]
+    dy = p_ini[:, 1] - p_prev[:, 1]
+    dist_xy = np.hypot(dx, dy)
+    c2 = np.where(dist_xy > 1e-9, _n_steps(dist_xy, paso), 0)
+    n3 = _n_steps(z_next - z_home, paso)
+    c3 = np.where(np.abs(z_home - z_next) > 1e-6, n3 - 1, 0)
+    c_main = nb[b]
+    blk_len = 1 + c1 + c2 + c3 + c_main
+    head = nb[0] + nZ - 1
+    blk_start = head + np.cumsum(blk_len) - blk_len
+    body = head + int(blk_len.sum())
+
+    # Subida final a z_home + reposo (depende solo de la ultima fila)
+    if len(b):
+        p_fin = data[last[-1], :3]
+        flag_fin = int(data[last[-1], 3])
+    else:
+        p_fin = np.array([data[last[0], 0], data[last[0], 1], z_plunge[-1]])
+        flag_fin = 1
+    lift_end = abs(p_fin[2] - z_home) > 1e-9 and flag_fin != 2
+    n_end = int(_n_steps(np.array([z_home - p_fin[2]]), paso)[0]) if lift_end else 1
+    add_rest = lift_end or flag_fin != 2
+    total = body + (n_end - 1) + int(add_rest)
+
+    out = np.empty((total, 5))
+    # bloque inicial
+    out[: nb[0], :4] = data[: nb[0]]
+    out[: nb[0], 4] = 0.0 if flag_block[0] == 2 else V_tras_ms
+    pl = slice(nb[0], head)
+    out[pl, 0] = data[last[0], 0]
+    out[pl, 1] = data[last[0], 1]
+    out[pl, 2] = z_plunge
+    out[pl, 3] = 3
+    out[pl, 4] = V_tras_ms
+    out[head - 1, 3] = 1
+    out[head - 1, 4] = 0.0
+
+    if len(b):
+        # punto de ruptura
+        out[blk_start, 0:3] = p_prev
+        out[blk_start, 3] = 3
+        out[blk_start, 4] = V_tras_ms
+        # subida
+        z_up, seg, i = _ramp(z_prev, z_home - z_prev, n1 - 1, c1)
+        rows = blk_start[seg] + i
+        out[rows, 0] = p_prev[seg, 0]
+        out[rows, 1] = p_prev[seg, 1]
+        out[rows, 2] = z_up
+        out[rows, 3] = 3
+        out[rows, 4] = V_tras_ms
+        # traslado XY a z_home
+        x_lin, seg, i = _ramp(p_prev[:, 0], dx, np.maximum(c2, 1), c2)
+        y_lin = p_prev[seg, 1] + i * dy[seg] / c2[seg]
+        rows = blk_start[seg] + c1[seg] + i
+        out[rows, 0] = x_lin
+        out[rows, 1] = y_lin
+        out[rows, 2] = z_home
+        out[rows, 3] = 3
+        out[rows, 4] = V_tras_ms
+        # bajada
+        z_dn, seg, i = _ramp(np.full(len(b), float(z_home)), z_next - z_home, n3 - 1, c3)
+        rows = blk_start[seg] + c1[seg] + c2[seg] + i
+        out[rows, 0] = p_ini[seg, 0]
+        out[rows, 1] = p_ini[seg, 1]
+        out[rows, 2] = z_dn
+        out[rows, 3] = 3
+        out[rows, 4] = V_tras_ms
+        has_dn = c3 > 0
+        dn_last = (blk_start + c1 + c2 + c3)[has_dn]
+        out[dn_last, 3] = 1
+        out[dn_last, 4] = 0.0
+        # bloque principal
+        m_start = blk_start + 1 + c1 + c2 + c3
+        seg = np.repeat(np.arange(len(b)), c_main)
+        k = np.arange(int(c_main.sum())) - np.repeat(np.cumsum(c_main) - c_main, c_main)
+        rows = m_start[seg] + k
+        out[rows, :4] = data[starts[b][seg] + k]
+        fb = flag_block[b]
+        out[rows, 4] = np.where(fb[seg] == 2, 0.0, V_tras_ms)
+        cut_last = (m_start + c_main - 1)[fb == 1]
+        out[cut_last, 4] = 0.0
+
+    if lift_end:
+        z_e, _, _ = _ramp(np.array([p_fin[2]]), np.array([z_home - p_fin[2]]), np.array([n_end - 1]), np.array([n_end - 1]))
+        rows = slice(body, body + n_end - 1)
+        out[rows, 0] = p_fin[0]
+        out[rows, 1] = p_fin[1]
+        out[rows, 2] = z_e
+        out[rows, 3] = 3
+        out[rows, 4] = V_tras_ms
+    if add_rest:
+        out[-1] = [out[-2, 0], out[-2, 1], z_home, 2, 0.0]
+
+    # Perfil trapezoidal (forma cerrada)
+    f = out[:, 3].astype(np.int64)
+    f_prev, f_cur = f[:-1], f[1:]
+    c = 2 * A_max_ms2 * dL_cart
+    idx_c = np.arange(total) * c
+
+    reset_f = np.ones(total, dtype=bool)  # el primer punto arranca en v=0
+    reset_f[1:] = (
+        (f_cur == 2) | (f_prev == 2) | ((f_cur == 1) & (f_prev != 1)) | ((f_cur == 3) & (f_prev == 1))
+    )
+    v_sq = np.where(reset_f, 0.0, out[:, 4] ** 2)
+    v_sq = np.minimum.accumulate(v_sq - idx_c) + idx_c
+    v_fwd = np.sqrt(np.maximum(v_sq, 0.0))
+
+    reset_b = np.ones(total, dtype=bool)  # el ultimo punto termina en v=0
+    reset_b[:-1] = (f_prev == 2) | (f_cur == 2) | ((f_prev == 1) & (f_cur != 1))
+    v_sq = np.where(reset_b, 0.0, v_fwd**2)
+    v_sq = np.minimum.accumulate((v_sq + idx_c)[::-1])[::-1] - idx_c
+    v = np.sqrt(np.maximum(v_sq, 0.0))
+
+    out[:, 0:3] /= 1000.0
+    out[:, 4] = np.where(np.isfinite(v) & (v >= 1e-6), v, 1e-6)
+    return out
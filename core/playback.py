@@ -0,0 +1,233 @@
+"""
+Reproducción de trayectorias articulares para RobotView.
+
+PlaybackController (QObject) reemplaza el parseo en JS + Timer con saltos fijos
+de RobotView.qml:
+- La trayectoria [d1 (m), th2 (rad), th3 (rad), ...] se lee una vez: los .traj
+  se abren con np.memmap; los TXT/CSV con core.textstream.
+- Cada fila tiene su tiempo: columna T si existe, si no los tiempos de
+  DiferenciarTrayectoriaArticular.m a partir de V (5ta columna, m/s), y como
+  último recurso DEFAULT_RATE_HZ filas por segundo (el ritmo del Timer original).
+- Un QTimer preciso a FRAME_MS solo dispara la actualización; la posición sale
+  de un QElapsedTimer (reloj monotónico) por el factor de velocidad, y la pose
+  se interpola linealmente entre filas. La carga de la GUI cambia la cantidad
+  de cuadros, no la velocidad de la reproducción.
+QML solo ve la pose actual (d1mm, th2deg, th3deg) y el estado.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+from PySide6.QtCore import Property, QElapsedTimer, QObject, Qt, QTimer, QUrl, Signal, Slot
+
+from core.differentiation import tiempos_articulares
+from core.textstream import iter_text_chunks, read_header
+from core.trajfile import TrajFile
+
+DEFAULT_RATE_HZ = 50.0  # filas/s sin tiempos (Timer de 20 ms, 1 fila por tick)
+FRAME_MS = 16
+TIME_COLUMNS = ("T", "TIME", "TIEMPO")
+
+
+def _read_rows(path: Path) -> tuple:
+    """(filas (N, ncols), nombres de columna en mayúsculas o None)."""
+    if path.suffix.lower() == ".traj":
+        traj = TrajFile(path)
+        names = [c.upper() for c in traj.columns] or None
+        return traj.data, names
+    names, ncols = read_header(path)
+    chunks = [rows for rows, _, _ in iter_text_chunks(path)]
+    rows = np.concatenate(chunks) if chunks else np.empty((0, max(ncols, 3)))
+    return rows, [n.upper() for n in names] if names else None
+
+
+def tabla_reproduccion(rows: np.ndarray, names: list | None = None, paso: float = 1.0) -> tuple:
+    """
+    Filas articulares -> (tiempos (N,) s desde 0, q (N,3) [d1 mm, th2 deg, th3 deg]).
+    Se descartan las filas NaN separadoras; los ángulos se desenrollan para que
+    la interpolación no salte en ±pi.
+    """
+    rows = np.asarray(rows, dtype=float)
+    t_col = next((i for i, n in enumerate(names or []) if n in TIME_COLUMNS), None)
+    q_cols = [c for c in range(rows.shape[1]) if c != t_col][:3]
+    if len(q_cols) < 3:
+        raise ValueError("la trayectoria articular necesita columnas d1 th2 th3")
+    rows = rows[~np.isnan(rows[:, q_cols]).any(axis=1)]
+    q = rows[:, q_cols].copy()
+    if t_col is not None:
+        t = rows[:, t_col]
+    elif rows.shape[1] >= 5:
+        t = tiempos_articulares(rows[:, 4], paso)
+    else:
+        t = np.arange(len(rows)) / DEFAULT_RATE_HZ
+    if len(t):
+        t = np.maximum.accumulate(t - t[0])
+    q[:, 1:3] = np.unwrap(q[:, 1:3], axis=0)
+    q[:, 0] *= 1000.0
+    q[:, 1:3] = np.degrees(q[:, 1:3])
+    return t, q
+
+
+class PlaybackController(QObject):
+    """Reloj de reproducción + pose interpolada (ver docstring del módulo)."""
+
+    poseChanged = Signal()
+    stateChanged = Signal()
+    trajectoryChanged = Signal()
+    statusMessage = Signal(str)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._t = np.zeros(0)
+        self._q = np.zeros((0, 3))
+        self._pose = np.zeros(3)
+        self._index = 0
+        self._position = 0.0  # s de trayectoria
+        self._speed = 1.0
+        self._playing = False
+        self._anchor = 0.0  # posición al arrancar el reloj
+        self._clock = QElapsedTimer()
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.setInterval(FRAME_MS)
+        self._timer.timeout.connect(self._tick)
+
+    # Carga
+    @Slot(str)
+    def load(self, url: str) -> None:
+        qurl = QUrl(url)
+        path = Path(qurl.toLocalFile() if qurl.isLocalFile() else url)
+        try:
+            rows, names = _read_rows(path)
+            t, q = tabla_reproduccion(rows, names)
+        except (OSError, ValueError) as exc:
+            self.statusMessage.emit(f"No se pudo leer la trayectoria: {exc}")
+            return
+        self.stop()
+        self._t, self._q = t, q
+        self.trajectoryChanged.emit()
+        self._seek(0.0)
+        self.statusMessage.emit(f"Trayectoria cargada puntos: {len(t)}")
+
+    # Control
+    @Slot()
+    def play(self) -> None:
+        if not len(self._t) or self._playing:
+            return
+        if self._position >= self.duration:
+            self._seek(0.0)
+        self._playing = True
+        self._restart_clock()
+        self._timer.start()
+        self.stateChanged.emit()
+
+    @Slot()
+    def stop(self) -> None:
+        """Pausa en la posición actual."""
+        if not self._playing:
+            return
+        self._advance()
+        self._playing = False
+        self._timer.stop()
+        self.stateChanged.emit()
+
+    @Slot(float)
+    def seek(self, seconds: float) -> None:
+        self._seek(seconds)
+        if self._playing:
+            self._restart_clock()
+
+    @Slot(float)
+    def scrub(self, fraction: float) -> None:
+        """Salta a una fracción 0..1 de la duración."""
+        self.seek(float(np.clip(fraction, 0.0, 1.0)) * self.duration)
+
+    def _get_speed(self) -> float:
+        return self._speed
+
+    @Slot(float)
+    def setSpeed(self, factor: float) -> None:
+        factor = max(float(factor), 1e-3)
+        if factor == self._speed:
+            return
+        if self._playing:
+            self._advance()
+            self._restart_clock()
+        self._speed = factor
+        self.stateChanged.emit()
+
+    speed = Property(float, _get_speed, setSpeed, notify=stateChanged)
+
+    # Estado para QML
+    @Property(bool, notify=stateChanged)
+    def playing(self) -> bool:
+        return self._playing
+
+    @Property(int, notify=trajectoryChanged)
+    def pointCount(self) -> int:
+        return len(self._t)
+
+    @Property(float, notify=trajectoryChanged)
+    def duration(self) -> float:
+        return float(self._t[-1]) if len(self._t) else 0.0
+
+    @Property(float, notify=poseChanged)
+    def position(self) -> float:
+        return self._position
+
+    @Property(float, notify=poseChanged)
+    def progress(self) -> float:
+        return self._position / self.duration if self.duration > 0 else 0.0
+
+    @Property(int, notify=poseChanged)
+    def index(self) -> int:
+        return self._index
+
+    @Property(float, notify=poseChanged)
+    def d1mm(self) -> float:
+        return float(self._pose[0])
+
+    @Property(float, notify=poseChanged)
+    def th2deg(self) -> float:
+        return float(self._pose[1])
+
+    @Property(float, notify=poseChanged)
+    def th3deg(self) -> float:
+        return float(self._pose[2])
+
+    # Internos
+    def _restart_clock(self) -> None:
+        self._anchor = self._position
+        self._clock.start()
+
+    def _advance(self) -> None:
+        self._position = min(self._anchor + self._clock.nsecsElapsed() * 1e-9 * self._speed, self.duration)
+
+    def _tick(self) -> None:
+        self._advance()
+        self._update_pose()
+        if self._position >= self.duration:
+            self._playing = False
+            self._timer.stop()
+            self.stateChanged.emit()
+
+    def _seek(self, seconds: float) -> None:
+        self._position = float(np.clip(seconds, 0.0, self.duration))
+        self._anchor = self._position
+        self._update_pose()
+
+    def _update_pose(self) -> None:
+        t = self._t
+        if not len(t):
+            return
+        i = int(np.searchsorted(t, self._position, side="right")) - 1
+        i = min(max(i, 0), len(t) - 1)
+        if i + 1 < len(t) and t[i + 1] > t[i]:
+            w = (self._position - t[i]) / (t[i + 1] - t[i])
+            self._pose = self._q[i] + w * (self._q[i + 1] - self._q[i])
+        else:
+            self._pose = self._q[i]
+        self._index = i
+        self.poseChanged.emit()
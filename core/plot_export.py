@@ -12,6 +12,8 @@ from typing import List, Tuple
 
 import matplotlib.pyplot as plt
 
+from core.trajfile import TrajFile
+
 
 def _parse_line(raw: str) -> Tuple[float, float, float, int] | None:
     raw = raw.strip()
@@ -36,6 +38,8 @@ def _parse_line(raw: str) -> Tuple[float, float, float, int] | None:
 
 def load_segments(file_path: Path) -> List[Tuple[List[float], List[float], int]]:
     """Devuelve lista de segmentos (xs, ys, flag)."""
+    if file_path.suffix.lower() == ".traj":
+        return _load_segments_traj(file_path)
     text = file_path.read_text(encoding="utf-8", errors="ignore").splitlines()
     segs: List[Tuple[List[float], List[float], int]] = []
     cur_x: List[float] = []
@@ -58,6 +62,17 @@ def load_segments(file_path: Path) -> List[Tuple[List[float], List[float], int]]
     return segs
 
 
+def _load_segments_traj(file_path: Path) -> List[Tuple[List[float], List[float], int]]:
+    traj = TrajFile(file_path)
+    segs: List[Tuple[List[float], List[float], int]] = []
+    for block in traj.iter_blocks():
+        if not len(block):
+            continue
+        flag = int(block[-1, 3]) if block.shape[1] > 3 else 0
+        segs.append((block[:, 0].tolist(), block[:, 1].tolist(), flag))
+    return segs
+
+
 def plot_file(file_path: Path, save_path: Path | None = None) -> None:
     segs = load_segments(file_path)
     if not segs:
@@ -88,7 +103,7 @@ def main() -> None:
         type=str,
         nargs="?",
         default=str(DEFAULT_EXPORT_PATH),
-        help=f"Ruta al TXT/CSV exportado (X,Y[,Z,C]). Por defecto: {DEFAULT_EXPORT_PATH}",
+        help=f"Ruta al TXT/CSV/TRAJ exportado (X,Y[,Z,C]). Por defecto: {DEFAULT_EXPORT_PATH}",
     )
     parser.add_argument("--save", type=str, default=None, help="Ruta opcional para guardar PNG.")
     args = parser.parse_args()
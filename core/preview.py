@@ -0,0 +1,140 @@
+"""
+Preview raster de una carga (reemplaza el PNG de matplotlib).
+
+render_preview dibuja el PathBuffer en un QImage con QPainter; antes se
+simplifica a ~0.5 px (core.pathlod.simplify_paths), así el costo depende del
+tamaño de la imagen y no de la cantidad de puntos. QImage/QPainter se pueden
+usar fuera del hilo de GUI, por lo que los workers lo llaman directamente.
+
+Las imágenes no se escriben a disco: PreviewImageProvider las sirve a QML como
+image://preview/<id>, con un id nuevo por carga (sin archivo compartido que dos
+cargas puedan pisarse).
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QPointF, QRectF, QSize, Qt
+from PySide6.QtGui import QColor, QFont, QGuiApplication, QImage, QPainter, QPen, QPolygonF
+from PySide6.QtQuick import QQuickImageProvider
+
+from core.pathbuffer import PathBuffer
+from core.pathlod import simplify_paths
+
+PROVIDER_ID = "preview"
+PREVIEW_SIZE = (1600, 900)
+_MARGIN = 48
+_CUT = QColor("#22c55e")
+_TRAVEL = QColor("#f59e0b")
+
+
+def render_preview(paths: PathBuffer, title: str = "", size: tuple = PREVIEW_SIZE) -> QImage | None:
+    """PathBuffer -> QImage (fondo blanco, grilla, paths de corte/traslado y título)."""
+    bounds = paths.bounds()
+    if bounds is None:
+        return None
+    w, h = size
+    xmin, xmax, ymin, ymax = bounds
+    span_x = max(xmax - xmin, 1e-6)
+    span_y = max(ymax - ymin, 1e-6)
+    scale = min((w - 2 * _MARGIN) / span_x, (h - 2 * _MARGIN) / span_y)
+    ox = (w - span_x * scale) / 2 - xmin * scale
+    oy = (h + span_y * scale) / 2 + ymin * scale
+
+    simple = simplify_paths(paths, 0.5 / scale)
+    px = np.empty_like(simple.coords, dtype=float)
+    px[:, 0] = simple.coords[:, 0] * scale + ox
+    px[:, 1] = oy - simple.coords[:, 1] * scale
+
+    image = QImage(w, h, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.white)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    _draw_grid(painter, w, h, scale, ox, oy)
+    for i in range(len(simple)):
+        pts = px[simple.offsets[i] : simple.offsets[i + 1]]
+        if len(pts) < 2:
+            continue
+        cut = int(simple.flags[i]) == 1
+        color = _CUT if cut else _TRAVEL
+        poly = QPolygonF([QPointF(x, y) for x, y in pts])
+        fill = QColor(color)
+        fill.setAlphaF(0.25)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(fill)
+        painter.drawPolygon(poly)
+        painter.setBrush(Qt.NoBrush)
+        painter.setPen(QPen(color, 2.0 if cut else 1.5))
+        painter.drawPolyline(poly)
+    if title and QGuiApplication.instance() is not None:  # las fuentes requieren la app
+        painter.setPen(QColor("#0f172a"))
+        painter.setFont(QFont("sans-serif", 14))
+        painter.drawText(QRectF(0, 8, w, _MARGIN - 8), Qt.AlignHCenter | Qt.AlignVCenter, title)
+    painter.end()
+    return image
+
+
+def _draw_grid(painter: QPainter, w: int, h: int, scale: float, ox: float, oy: float) -> None:
+    # paso "lindo" (1, 2, 5 x 10^k) de ~12 líneas, igual que Viewer2D.niceStep
+    rough = max(w, h) / scale / 12
+    pow10 = 10 ** np.floor(np.log10(rough))
+    frac = rough / pow10
+    step = (1 if frac < 1.5 else 2 if frac < 3.5 else 5 if frac < 7.5 else 10) * pow10
+    painter.setPen(QPen(QColor(0, 0, 0, 30), 1.0))
+    for gx in np.arange(np.ceil(-ox / scale / step), np.floor((w - ox) / scale / step) + 1) * step:
+        x = gx * scale + ox
+        painter.drawLine(QPointF(x, 0), QPointF(x, h))
+    for gy in np.arange(np.ceil((oy - h) / scale / step), np.floor(oy / scale / step) + 1) * step:
+        y = oy - gy * scale
+        painter.drawLine(QPointF(0, y), QPointF(w, y))
+
+
+def image_to_png(image: QImage) -> bytes:
+    """QImage -> bytes PNG (para el cache de DXF)."""
+    data = QByteArray()
+    buf = QBuffer(data)
+    buf.open(QIODevice.WriteOnly)
+    image.save(buf, "PNG")
+    buf.close()
+    return bytes(data)
+
+
+def load_png(path: str | Path) -> QImage | None:
+    image = QImage(str(path))
+    return None if image.isNull() else image
+
+
+class PreviewImageProvider(QQuickImageProvider):
+    """
+    Sirve los previews en memoria a QML (image://preview/<id>). Guarda solo las
+    últimas `keep` imágenes; requestImage corre en el hilo de carga de QML.
+    """
+
+    def __init__(self, keep: int = 4) -> None:
+        super().__init__(QQuickImageProvider.Image)
+        self._images: OrderedDict[str, QImage] = OrderedDict()
+        self._lock = threading.Lock()
+        self._keep = keep
+
+    def add(self, image_id: str, image: QImage) -> str:
+        """Registra la imagen y retorna su URL para QML."""
+        with self._lock:
+            self._images[image_id] = image
+            while len(self._images) > self._keep:
+                self._images.popitem(last=False)
+        return f"image://{PROVIDER_ID}/{image_id}"
+
+    def requestImage(self, image_id: str, size: QSize, requested_size: QSize) -> QImage:
+        with self._lock:
+            image = self._images.get(image_id)
+        if image is None:
+            return QImage()
+        if requested_size.isValid() and not requested_size.isEmpty():
+            image = image.scaled(requested_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        size.setWidth(image.width())
+        size.setHeight(image.height())
+        return image
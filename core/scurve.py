@@ -0,0 +1,214 @@
+"""
+Perfil de velocidad con límite de jerk (curva S) y límites articulares.
+
+Parte de la salida de planificar_trayectoria (N,5) [x,y,z,flag,v] en m y m/s y
+recalcula v respetando:
+- Q̇_max / Q̈_max por articulación (MainScaraMulticuerpo.m). Con el Jacobiano
+  batch se obtiene q' = dq/ds a lo largo del camino; la velocidad de camino se
+  limita a Q̇_max/|q'| y Q̈_max/|q''| (mitad del presupuesto para la
+  aceleración tangencial y mitad para el término centrípeto). Cerca de una
+  singularidad |q'| crece y el tramo se frena solo.
+- a_max_cart, con aceleración variable por punto resuelta en forma cerrada
+  (mínimo acumulado sobre la distancia ponderada, igual que
+  planificar_trayectoria_array).
+- j_max: el perfil trapezoidal de cada movimiento reposo-a-reposo se filtra en
+  el tiempo con una media móvil de ancho T = 2*a_max/j_max (interpolación FIR).
+  El filtro actúa sobre la rapidez escalar, así que el camino no cambia; la
+  distancia recorrida se conserva y cada movimiento dura T más.
+
+Los puntos con v=0 del plan (cambios de flag, reposo) siguen siendo paradas.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from core.dynamics import DEFAULT_PARAMS
+from core.kinematics import inverse_batch, jacobian_batch
+from core.timing import SERVO_RATE_HZ, V_MIN, tiempos_trayectoria
+
+
+def _solve_damped(jac: np.ndarray, vec: np.ndarray, damping: float) -> np.ndarray:
+    """x = (JᵀJ + λ²I)⁻¹ Jᵀ vec por punto (mínimos cuadrados amortiguados)."""
+    jt = np.transpose(jac, (0, 2, 1))
+    lhs = jt @ jac + (damping**2) * np.eye(3)
+    rhs = np.einsum("nji,nj->ni", jac, vec)
+    return np.linalg.solve(lhs, rhs[..., None])[..., 0]
+
+
+def limites_articulares(
+    tray_plan: np.ndarray,
+    l1: float = DEFAULT_PARAMS["L1"],
+    l2: float = DEFAULT_PARAMS["L2"],
+    qdot_max: Sequence[float] = DEFAULT_PARAMS["Qdot_max"],
+    qddot_max: Sequence[float] = DEFAULT_PARAMS["Qddot_max"],
+    damping: float = 1e-3,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Límites de camino por punto impuestos por las articulaciones.
+    Retorna (v_cap (N,) m/s, a_cap (N,) m/s^2); inf donde no hay restricción.
+    """
+    pos = np.asarray(tray_plan, dtype=float)[:, :3]
+    n = len(pos)
+    if n < 2:
+        return np.full(n, np.inf), np.full(n, np.inf)
+    qdot_max = np.asarray(qdot_max, dtype=float).reshape(3)
+    qddot_max = np.asarray(qddot_max, dtype=float).reshape(3)
+
+    d = np.diff(pos, axis=0)
+    ds = np.linalg.norm(d, axis=1)
+    moving = ds > 1e-12
+    tan = np.zeros_like(d)
+    tan[moving] = d[moving] / ds[moving, None]
+
+    q, _ = inverse_batch(pos, l1, l2)
+    q = q[:, :3]
+    q[:, 1] = np.unwrap(q[:, 1])
+    q_mid = 0.5 * (q[:-1] + q[1:])
+    # q' = J⁻¹·t en el punto medio de cada tramo
+    qp_seg = _solve_damped(jacobian_batch(q_mid, l1, l2), tan, damping)
+    qp_seg[~moving] = 0.0
+
+    qp_in = np.vstack([qp_seg[:1], qp_seg])
+    qp_out = np.vstack([qp_seg, qp_seg[-1:]])
+    qp = np.maximum(np.abs(qp_in), np.abs(qp_out))
+    ds_in = np.concatenate([[0.0], ds])
+    ds_out = np.concatenate([ds, [0.0]])
+    ok = (ds_in > 1e-12) & (ds_out > 1e-12)
+    qpp = np.zeros_like(qp)
+    qpp[ok] = np.abs(qp_out[ok] - qp_in[ok]) / (0.5 * (ds_in[ok] + ds_out[ok]))[:, None]
+
+    with np.errstate(divide="ignore"):
+        v_cap = np.minimum(
+            np.min(qdot_max / qp, axis=1),
+            np.min(np.sqrt(0.5 * qddot_max / qpp), axis=1),
+        )
+        a_cap = np.min(0.5 * qddot_max / qp, axis=1)
+    return v_cap, a_cap
+
+
+def perfil_limitado(
+    ds: np.ndarray, v_cap: np.ndarray, a_cap: np.ndarray, paradas: np.ndarray
+) -> np.ndarray:
+    """
+    Perfil de aceleración limitada con a variable por tramo.
+
+    u_i = min_k (v_cap_k^2 + 2·Σ a·ds entre k e i), resuelto hacia adelante y
+    hacia atrás con np.minimum.accumulate; `paradas` fuerza v=0.
+    """
+    cap2 = np.where(paradas, 0.0, np.square(np.minimum(v_cap, 1e9)))
+    a_seg = np.minimum(a_cap[:-1], a_cap[1:])
+    dist = np.concatenate([[0.0], np.cumsum(2.0 * a_seg * ds)])
+    u = dist + np.minimum.accumulate(cap2 - dist)
+    u = np.minimum.accumulate((u + dist)[::-1])[::-1] - dist
+    return np.sqrt(np.maximum(u, 0.0))
+
+
+def _filtro_jerk(
+    s: np.ndarray, v: np.ndarray, t: np.ndarray, paradas: np.ndarray, rate_hz: float, ancho: float
+) -> np.ndarray:
+    """
+    Media móvil causal de ancho `ancho` (s) sobre v(t), por movimiento
+    reposo-a-reposo, devuelta en las abscisas s de los puntos.
+    """
+    w = int(round(ancho * rate_hz))
+    b = np.flatnonzero(paradas)
+    if w < 2 or len(b) < 2:
+        return v
+    dt = 1.0 / rate_hz
+    length = s[b[1:]] - s[b[:-1]]
+    n_k = np.where(length > 1e-12, np.ceil((t[b[1:]] - t[b[:-1]]) * rate_hz).astype(np.int64) + 1, 0)
+    k_count = len(n_k)
+
+    # muestras uniformes de v(t) de cada movimiento, con w ceros detrás
+    seg = np.repeat(np.arange(k_count), n_k)
+    loc = np.arange(int(n_k.sum())) - np.repeat(np.cumsum(n_k) - n_k, n_k)
+    tg = np.minimum(t[b[:-1]][seg] + loc * dt, t[b[1:]][seg])
+    span = n_k + w
+    buf = np.zeros(int(span.sum()))
+    buf[(np.cumsum(span) - span)[seg] + loc] = np.interp(tg, t, v)
+
+    csum = np.concatenate([[0.0], np.cumsum(np.concatenate([np.zeros(w - 1), buf]))])
+    vf = (csum[w:] - csum[:-w]) / w
+    seg_buf = np.repeat(np.arange(k_count), span)
+
+    # conservar la distancia exacta de cada movimiento
+    step = vf * dt
+    total = np.bincount(seg_buf, step, minlength=k_count)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(total > 0, length / total, 0.0)
+    step *= scale[seg_buf]
+    vf *= scale[seg_buf]
+    c = np.cumsum(step)
+    c_start = (c - step)[np.cumsum(span) - span]
+    s_f = s[b[:-1]][seg_buf] + c - c_start[seg_buf]
+    out = np.interp(s, s_f, vf)
+    out[paradas] = 0.0
+    return out
+
+
+def planificar_jerk(
+    tray_plan: Sequence[Sequence[float]] | np.ndarray,
+    j_max: float | None = 50.0,
+    a_max_cart: float = 2000.0,
+    v_max: float | None = None,
+    l1: float = DEFAULT_PARAMS["L1"],
+    l2: float = DEFAULT_PARAMS["L2"],
+    qdot_max: Sequence[float] = DEFAULT_PARAMS["Qdot_max"],
+    qddot_max: Sequence[float] = DEFAULT_PARAMS["Qddot_max"],
+    rate_hz: float = SERVO_RATE_HZ,
+    damping: float = 1e-3,
+    max_iter: int = 8,
+) -> np.ndarray:
+    """
+    Re-planifica la velocidad de una trayectoria ya planificada.
+
+    tray_plan: (N,5) [x,y,z,flag,v] en m y m/s (salida de planificar_trayectoria).
+    j_max: jerk de camino (m/s^3); None o <=0 desactiva el filtro.
+    a_max_cart: aceleración cartesiana máxima (mm/s^2, como el planificador).
+    v_max: techo de velocidad (m/s); None = máximo v del plan.
+    max_iter: pasadas perfil + filtro para que la curva filtrada no supere los
+        límites articulares; si no converge se recorta (jerk no garantizado ahí).
+    Retorna (N,5) con el mismo contrato [x,y,z,flag,v] (v >= 1e-6).
+    """
+    plan = np.array(tray_plan, dtype=float)
+    if plan.size == 0:
+        return np.empty((0, 5))
+    if plan.ndim != 2 or plan.shape[1] < 5:
+        raise ValueError("tray_plan debe ser (N,5) [x y z flag v]")
+    plan = plan[:, :5]
+    n = len(plan)
+    if n < 2:
+        plan[:, 4] = V_MIN
+        return plan
+
+    a_max = a_max_cart / 1000.0
+    paradas = plan[:, 4] <= V_MIN * (1 + 1e-9)
+    paradas[[0, -1]] = True
+    v_top = float(plan[:, 4].max()) if v_max is None else float(v_max)
+
+    ds = np.linalg.norm(np.diff(plan[:, :3], axis=0), axis=1)
+    v_cap, a_cap = limites_articulares(plan, l1, l2, qdot_max, qddot_max, damping)
+    v_cap = np.minimum(v_cap, v_top)
+    a_cap = np.minimum(a_cap, a_max)
+    v = perfil_limitado(ds, v_cap, a_cap, paradas)
+
+    if j_max is not None and j_max > 0:
+        s = np.concatenate([[0.0], np.cumsum(ds)])
+        cap = v_cap.copy()
+        v_f = v  # max_iter = 0: sin pasadas de filtro
+        for _ in range(max_iter):
+            t = tiempos_trayectoria(np.column_stack([plan[:, :4], v]), a_max_cart)
+            v_f = _filtro_jerk(s, v, t, paradas, rate_hz, 2.0 * a_max / j_max)
+            over = v_f > v_cap * (1 + 1e-6)
+            if not over.any():
+                break
+            # la media móvil sobrepasó un límite local: bajar el techo ahí y repetir
+            cap[over] *= v_cap[over] / v_f[over]
+            v = perfil_limitado(ds, cap, a_cap, paradas)
+        v = np.minimum(v_f, v_cap)
+
+    plan[:, 4] = np.where(np.isfinite(v) & (v >= V_MIN), v, V_MIN)
+    return plan
@@ -0,0 +1,40 @@
+"""
+Soldadura de extremos de segmentos (endpoint welding).
+
+Reemplaza DBSCAN(eps=tol, min_samples=1): con min_samples=1 cada cluster es una
+componente conexa del grafo "distancia <= tol", que se obtiene con pares de un
+cKDTree y connected_components (union-find) sin depender de scikit-learn.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+
+def weld_endpoints(points: np.ndarray, tol: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Agrupa puntos a distancia <= tol (encadenado) y calcula el centroide de cada grupo.
+
+    points: (N,2). Retorna (labels (N,), centroids (K,2)). Las etiquetas se numeran
+    en orden de primera aparicion, igual que DBSCAN(min_samples=1).
+    """
+    points = np.asarray(points, dtype=float)
+    n = len(points)
+    if n == 0:
+        return np.empty(0, dtype=np.intp), np.empty((0, 2))
+    pairs = cKDTree(points).query_pairs(r=tol, output_type="ndarray")
+    graph = coo_matrix((np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])), shape=(n, n))
+    n_clusters, labels = connected_components(graph, directed=False)
+    counts = np.bincount(labels, minlength=n_clusters)
+    centroids = np.column_stack(
+        [
+            np.bincount(labels, weights=points[:, 0], minlength=n_clusters) / counts,
+            np.bincount(labels, weights=points[:, 1], minlength=n_clusters) / counts,
+        ]
+    )
+    return labels, centroids
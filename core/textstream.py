@@ -0,0 +1,126 @@
+"""
+Lectura por bloques de trayectorias TXT/CSV (X Y [Z] [flag], filas NaN separadoras).
+
+El archivo se lee en trozos de `chunk_bytes` cortados en el último salto de
+línea; cada trozo se parsea con np.loadtxt (parser en C). Si un trozo tiene
+filas con distinta cantidad de columnas (p.ej. "NaN NaN" en un archivo de 4
+columnas) se cae al parseo línea a línea solo para ese trozo. Nunca se carga
+el texto completo en memoria.
+"""
+
+from __future__ import annotations
+
+import io
+import warnings
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from core.trajfile import FLAG_COLUMNS
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def _is_number(token: str) -> bool:
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def read_header(path: str | Path) -> Tuple[List[str] | None, int]:
+    """
+    (nombres de columna o None, número de columnas) según la primera línea
+    no vacía que no sea comentario.
+    """
+    with Path(path).open("r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            tokens = line.replace(",", " ").split()
+            if not tokens or tokens[0].startswith("#"):
+                continue
+            if all(_is_number(t) for t in tokens):
+                return None, len(tokens)
+            return tokens, len(tokens)
+    return None, 0
+
+
+def flag_column(names: List[str] | None, ncols: int) -> int | None:
+    """Columna de flag: por nombre (FLAG_COLUMNS) o la 4ta si hay 4 o más."""
+    if names:
+        for i, name in enumerate(names):
+            if name.upper() in FLAG_COLUMNS:
+                return i
+    return 3 if ncols >= 4 else None
+
+
+def _parse_lines(text: bytes, ncols: int) -> np.ndarray:
+    """Parseo tolerante: ignora líneas no numéricas, rellena con NaN."""
+    rows = []
+    for line in text.decode("utf-8", errors="ignore").splitlines():
+        tokens = line.split()
+        if not tokens or tokens[0].startswith("#"):
+            continue
+        try:
+            vals = [float(t) for t in tokens[:ncols]]
+        except ValueError:
+            continue
+        if len(vals) < 2:
+            continue
+        rows.append(vals + [np.nan] * (ncols - len(vals)))
+    return np.array(rows, dtype=float).reshape(-1, ncols)
+
+
+def _parse_chunk(text: bytes, ncols: int) -> np.ndarray:
+    text = text.replace(b",", b" ")
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)  # trozo solo con comentarios
+            return np.loadtxt(io.BytesIO(text), comments="#", ndmin=2, usecols=range(ncols))
+    except ValueError:
+        return _parse_lines(text, ncols)
+
+
+def iter_text_chunks(
+    path: str | Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES
+) -> Iterator[Tuple[np.ndarray, int, int]]:
+    """
+    Genera (filas (n, ncols) float64, bytes leídos, bytes totales) por trozo.
+    Las filas NaN separadoras se conservan; la cabecera se salta.
+    """
+    path = Path(path)
+    names, ncols = read_header(path)
+    if ncols < 2:
+        return
+    total = path.stat().st_size
+    done = 0
+    skip_header = names is not None
+    tail = b""
+    with path.open("rb") as f:
+        while True:
+            block = f.read(chunk_bytes)
+            eof = not block
+            text = tail + block
+            if not eof:
+                cut = text.rfind(b"\n") + 1
+                if cut == 0:
+                    tail = text
+                    continue
+                text, tail = text[:cut], text[cut:]
+            done += len(block)
+            if skip_header:
+                # la cabecera es la primera línea no comentario: se descarta una vez
+                lines = text.split(b"\n")
+                for i, line in enumerate(lines):
+                    stripped = line.strip()
+                    if stripped and not stripped.startswith(b"#"):
+                        text = b"\n".join(lines[i + 1 :])
+                        skip_header = False
+                        break
+            if text.strip():
+                rows = _parse_chunk(text, ncols)
+                if len(rows):
+                    yield rows, done, total
+            if eof:
+                return
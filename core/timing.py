@@ -0,0 +1,130 @@
+"""
+Parametrizacion temporal de trayectorias planificadas.
+
+planificar_trayectoria entrega puntos a paso fijo en distancia con una velocidad
+por punto; el controlador y el timer de QML necesitan muestras a periodo fijo.
+Este modulo integra el perfil de velocidad en marcas de tiempo y remuestrea a la
+frecuencia del servo (p.ej. 1 kHz) con interpolacion lineal vectorizada.
+
+Entrada: (N,5) [x, y, z, flag, v] en m y m/s (salida de core.planner).
+Salida remuestreada: (M,6) [t, x, y, z, flag, v].
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, Sequence
+
+import numpy as np
+
+SERVO_RATE_HZ = 1000.0
+COLUMNS = ("T", "X", "Y", "Z", "FLAG", "V")
+V_MIN = 1e-6  # piso de velocidad de planificar_trayectoria: el punto esta en reposo
+
+
+def tiempos_trayectoria(
+    tray_plan: Sequence[Sequence[float]] | np.ndarray,
+    a_max_cart: float = 2000.0,
+) -> np.ndarray:
+    """
+    Marcas de tiempo (s) de cada punto planificado.
+
+    Entre dos puntos se asume aceleracion constante: dt = 2*ds / (v0 + v1),
+    asi la velocidad media ds/dt nunca supera la planificada. Solo un tramo
+    con ambos extremos en reposo (v <= V_MIN), donde esa cuenta tiende a
+    infinito, usa el tiempo de recorrerlo arrancando y frenando a a_max_cart
+    (mm/s^2): 2*sqrt(ds/a).
+    """
+    plan = _as_plan(tray_plan)
+    if len(plan) == 0:
+        return np.empty(0)
+    ds = np.linalg.norm(np.diff(plan[:, 0:3], axis=0), axis=1)
+    v = plan[:, 4]
+    v_sum = v[:-1] + v[1:]
+    reposo = v_sum <= 2.0 * V_MIN * (1 + 1e-9)
+    a = a_max_cart / 1000.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dt = np.where(reposo, 2.0 * np.sqrt(ds / a), 2.0 * ds / v_sum)
+    return np.concatenate([[0.0], np.cumsum(dt)])
+
+
+def remuestrear(
+    tray_plan: Sequence[Sequence[float]] | np.ndarray,
+    rate_hz: float = SERVO_RATE_HZ,
+    tiempos: np.ndarray | None = None,
+    a_max_cart: float = 2000.0,
+) -> np.ndarray:
+    """Remuestrea la trayectoria completa a rate_hz. Retorna (M,6) [t,x,y,z,flag,v]."""
+    chunks = list(iter_remuestreo(tray_plan, rate_hz, tiempos=tiempos, a_max_cart=a_max_cart))
+    return np.concatenate(chunks) if chunks else np.empty((0, len(COLUMNS)))
+
+
+def iter_remuestreo(
+    tray_plan: Sequence[Sequence[float]] | np.ndarray,
+    rate_hz: float = SERVO_RATE_HZ,
+    chunk: int = 8192,
+    tiempos: np.ndarray | None = None,
+    a_max_cart: float = 2000.0,
+) -> Iterator[np.ndarray]:
+    """
+    Generador de bloques (<=chunk, 6) remuestreados a periodo fijo 1/rate_hz.
+
+    Solo el bloque en curso vive en memoria, por lo que trabajos largos a 1 kHz
+    pueden enviarse al controlador (o escribirse a disco) sin materializar todo
+    el arreglo. La ultima muestra coincide con el ultimo punto planificado.
+    """
+    if rate_hz <= 0:
+        raise ValueError("rate_hz debe ser > 0")
+    plan = _as_plan(tray_plan)
+    if len(plan) == 0:
+        return
+    t = tiempos_trayectoria(plan, a_max_cart) if tiempos is None else np.asarray(tiempos, dtype=float)
+    if len(t) != len(plan):
+        raise ValueError("tiempos no coincide con el numero de puntos")
+    period = 1.0 / rate_hz
+    n_samples = int(np.floor(t[-1] * rate_hz + 1e-9)) + 1
+    for k0 in range(0, n_samples, chunk):
+        k = np.arange(k0, min(k0 + chunk, n_samples))
+        yield _sample(plan, t, k * period)
+    if t[-1] - (n_samples - 1) * period > 1e-9:
+        yield _sample(plan, t, t[-1:])
+
+
+def muestrear(
+    tray_plan: Sequence[Sequence[float]] | np.ndarray,
+    tiempos: np.ndarray,
+    t_query: np.ndarray | float,
+) -> np.ndarray:
+    """Estado [t,x,y,z,flag,v] en instantes arbitrarios (p.ej. reproduccion en tiempo real)."""
+    return _sample(_as_plan(tray_plan), np.asarray(tiempos, dtype=float), np.atleast_1d(t_query).astype(float))
+
+
+def _sample(plan: np.ndarray, t: np.ndarray, tq: np.ndarray) -> np.ndarray:
+    """Interpolacion lineal de xyz/v; el flag es el del punto destino del tramo."""
+    tq = np.clip(tq, t[0], t[-1])
+    j = np.clip(np.searchsorted(t, tq, side="right"), 1, len(t) - 1)
+    if len(t) == 1:
+        j = np.zeros(len(tq), dtype=np.intp)
+        i = j
+        frac = np.zeros(len(tq))
+    else:
+        i = j - 1
+        span = t[j] - t[i]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac = np.where(span > 0, (tq - t[i]) / span, 1.0)
+    out = np.empty((len(tq), len(COLUMNS)))
+    out[:, 0] = tq
+    p0 = plan[i]
+    p1 = plan[j]
+    out[:, 1:4] = p0[:, 0:3] + frac[:, None] * (p1[:, 0:3] - p0[:, 0:3])
+    out[:, 4] = np.where(frac > 0, p1[:, 3], p0[:, 3])
+    out[:, 5] = p0[:, 4] + frac * (p1[:, 4] - p0[:, 4])
+    return out
+
+
+def _as_plan(tray_plan) -> np.ndarray:
+    plan = np.asarray(tray_plan, dtype=float)
+    if plan.size == 0:
+        return np.empty((0, 5))
+    if plan.ndim != 2 or plan.shape[1] < 5:
+        raise ValueError("tray_plan debe ser (N,5) [x y z flag v]")
+    return plan[:, :5]
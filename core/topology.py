@@ -0,0 +1,287 @@
+"""
+Reconstrucción topológica de una categoría de segmentos (snap + polygonize).
+
+Las entidades viajan empaquetadas como Segments = (coords (N,2) float64,
+offsets (K+1,)): la entidad k ocupa coords[offsets[k]:offsets[k+1]].
+
+process_categories reparte el trabajo en un ProcessPoolExecutor: cada categoría
+(corte / no corte) se divide en grupos espacialmente disjuntos (cajas
+envolventes que no se tocan, ampliadas en tol) y los grupos se juntan en lotes
+de tamaño parecido. Como los grupos no se tocan, soldar y poligonizar cada lote
+por separado da las mismas geometrías que procesar la categoría completa; los
+resultados se concatenan en el orden de los lotes, sin depender de qué proceso
+termine primero.
+
+Los procesos hijos (spawn) importan este módulo, que solo necesita
+numpy/shapely/scipy, pero también vuelven a ejecutar los imports de nivel
+superior de __main__ (main.py: PySide6, ezdxf, matplotlib); por eso el pool se
+crea una sola vez y se reutiliza entre cargas.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+import shapely
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from core.snapping import weld_endpoints
+
+Segments = Tuple[np.ndarray, np.ndarray]
+EMPTY_SEGMENTS: Segments = (np.empty((0, 2)), np.zeros(1, dtype=np.intp))
+
+# Debajo de esta cantidad de entidades el arranque de procesos (~2 s la primera vez) no compensa
+PARALLEL_MIN_SEGMENTS = 20000
+BATCHES_PER_WORKER = 2
+# Cada cuánto (s) se llama a `check` mientras se esperan los lotes del pool
+CHECK_INTERVAL = 0.1
+
+_POOL: ProcessPoolExecutor | None = None
+_POOL_WORKERS = 0
+_POOL_LOCK = threading.Lock()  # cargas concurrentes (QThreadPool) comparten el pool
+
+
+def pack_segments(blocks: Sequence[np.ndarray]) -> Segments:
+    """Lista de vertices (N_k,2) -> Segments."""
+    if not blocks:
+        return EMPTY_SEGMENTS
+    offsets = np.zeros(len(blocks) + 1, dtype=np.intp)
+    np.cumsum([len(b) for b in blocks], out=offsets[1:])
+    return np.concatenate(blocks), offsets
+
+
+class SegmentsBuilder:
+    """
+    Acumula entidades de a una y las empaqueta por trozos de `chunk` entidades,
+    así una lectura larga no guarda un array suelto por entidad.
+    """
+
+    def __init__(self, chunk: int = 65536) -> None:
+        self._chunk = chunk
+        self._pending: List[np.ndarray] = []
+        self._coords: List[np.ndarray] = []
+        self._lengths: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(n) for n in self._lengths) + len(self._pending)
+
+    def append(self, coords: np.ndarray) -> None:
+        self._pending.append(coords)
+        if len(self._pending) >= self._chunk:
+            self._flush()
+
+    def extend(self, segments: Segments) -> None:
+        """Agrega entidades ya empaquetadas (p. ej. todas las instancias de un INSERT)."""
+        coords, offsets = segments
+        if len(offsets) > 1:
+            self._flush()
+            self._coords.append(coords)
+            self._lengths.append(np.diff(offsets))
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._coords.append(np.concatenate(self._pending))
+            self._lengths.append(np.array([len(c) for c in self._pending], dtype=np.intp))
+            self._pending = []
+
+    def build(self) -> Segments:
+        self._flush()
+        if not self._coords:
+            return EMPTY_SEGMENTS
+        lengths = np.concatenate(self._lengths)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.intp)
+        np.cumsum(lengths, out=offsets[1:])
+        return np.concatenate(self._coords), offsets
+
+
+def take_segments(segments: Segments, index: np.ndarray) -> Segments:
+    """Subconjunto de entidades (en el orden de index)."""
+    coords, offsets = segments
+    lengths = np.diff(offsets)[index]
+    new_offsets = np.zeros(len(index) + 1, dtype=np.intp)
+    np.cumsum(lengths, out=new_offsets[1:])
+    src = np.repeat(offsets[:-1][index] - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+    return coords[src], new_offsets
+
+
+def merge_and_snap(segments: Segments, tol: float) -> np.ndarray:
+    """
+    Suelda los extremos a tol (core.snapping) directamente sobre el arreglo de
+    vertices, arma todas las LineString con una llamada a shapely.linestrings
+    y las une con union_all + line_merge. Retorna un arreglo de LineString.
+    """
+    coords, offsets = segments
+    n = len(offsets) - 1
+    if n <= 0:
+        return np.empty(0, dtype=object)
+    starts, ends = offsets[:-1], offsets[1:] - 1
+    endpoints = np.empty((2 * n, 2))
+    endpoints[0::2] = coords[starts]
+    endpoints[1::2] = coords[ends]
+    labels, centroids = weld_endpoints(endpoints, tol)
+    coords = coords.copy()
+    coords[starts] = centroids[labels[0::2]]
+    coords[ends] = centroids[labels[1::2]]
+    lines = shapely.linestrings(coords, indices=np.repeat(np.arange(n), np.diff(offsets)))
+    parts = shapely.get_parts(shapely.line_merge(shapely.union_all(lines)))
+    return parts[shapely.get_type_id(parts) == 1]
+
+
+def polygonize_merged(merged: np.ndarray) -> Tuple[list, list]:
+    """
+    Poligonos cerrados + tramos abiertos restantes. Los duplicados se
+    descartan por el WKB del anillo exterior normalizado.
+    """
+    if not len(merged):
+        return [], []
+    polys = shapely.get_parts(shapely.polygonize(merged))
+    # las caras de polygonize no se solapan: coverage_union evita el overlay completo
+    diff = shapely.difference(shapely.union_all(merged), shapely.coverage_union_all(polys))
+    parts = shapely.get_parts(shapely.get_parts(diff))  # colecciones anidadas
+    opens = parts[np.isin(shapely.get_type_id(parts), (1, 2)) & ~shapely.is_empty(parts)]
+    if len(polys):
+        keys = shapely.to_wkb(shapely.normalize(shapely.get_exterior_ring(polys)))
+        _, first = np.unique(keys, return_index=True)
+        polys = polys[np.sort(first)]
+    return polys.tolist(), opens.tolist()
+
+
+def process_segments(segments: Segments, tol: float) -> Tuple[list, list]:
+    """(polígonos, tramos abiertos) de una categoría o de un lote."""
+    return polygonize_merged(merge_and_snap(segments, tol))
+
+
+def disjoint_clusters(segments: Segments, tol: float) -> np.ndarray:
+    """
+    Grupo de cada entidad (K,), numerado por primera aparición. Dos grupos
+    distintos tienen cajas envolventes (ampliadas en tol/2) que no se tocan:
+    ni la soldadura de extremos ni polygonize pueden relacionarlos, y ninguno
+    puede quedar dentro de un polígono del otro.
+    """
+    coords, offsets = segments
+    n = len(offsets) - 1
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    bmin = np.minimum.reduceat(coords, offsets[:-1], axis=0) - tol / 2
+    bmax = np.maximum.reduceat(coords, offsets[:-1], axis=0) + tol / 2
+    labels = np.arange(n)
+    while True:
+        boxes = shapely.box(bmin[:, 0], bmin[:, 1], bmax[:, 0], bmax[:, 1])
+        a, b = shapely.STRtree(boxes).query(boxes, predicate="intersects")
+        m = len(boxes)
+        graph = coo_matrix((np.ones(len(a), dtype=np.int8), (a, b)), shape=(m, m))
+        k, comp = connected_components(graph, directed=False)
+        labels = comp[labels]
+        if k == m:
+            break
+        # la caja de un grupo puede tocar a otra que sus partes no tocaban
+        new_min = np.full((k, 2), np.inf)
+        new_max = np.full((k, 2), -np.inf)
+        np.minimum.at(new_min, comp, bmin)
+        np.maximum.at(new_max, comp, bmax)
+        bmin, bmax = new_min, new_max
+    _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    rank = np.empty(len(first), dtype=np.intp)
+    rank[np.argsort(first, kind="stable")] = np.arange(len(first))
+    return rank[inverse]
+
+
+def _batches(segments: Segments, tol: float, n_batches: int) -> List[Segments]:
+    """Grupos disjuntos agrupados en hasta n_batches lotes de tamaño parecido."""
+    labels = disjoint_clusters(segments, tol)
+    n_clusters = int(labels.max()) + 1 if len(labels) else 0
+    if n_clusters <= 1 or n_batches <= 1:
+        return [segments]
+    sizes = np.bincount(labels, weights=np.diff(segments[1]), minlength=n_clusters)
+    before = np.cumsum(sizes) - sizes
+    batch_of = np.minimum((before * n_batches / sizes.sum()).astype(np.intp), n_batches - 1)
+    entity_batch = batch_of[labels]
+    order = np.argsort(entity_batch, kind="stable")
+    cuts = np.searchsorted(entity_batch[order], np.arange(1, n_batches))
+    return [take_segments(segments, idx) for idx in np.split(order, cuts) if len(idx)]
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # spawn: el conversor corre en un hilo del QThreadPool y fork no es seguro con Qt
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)  # sin cancelar: otra carga puede estar esperando sus tareas
+            _POOL = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Descarta `pool` roto; si otra carga ya lo reemplazó, el pool nuevo queda."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def available_cpus() -> int:
+    """Núcleos que puede usar este proceso (afinidad/cgroup si el SO la expone)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def process_categories(
+    categories: Sequence[Segments],
+    tol: float,
+    workers: int | None = None,
+    check: Callable[[], None] | None = None,
+) -> List[Tuple[list, list]]:
+    """
+    (polígonos, tramos abiertos) por categoría. workers: procesos (None = núcleos
+    disponibles, 1 = en serie). Las cargas chicas se procesan en serie.
+    check: callback opcional llamado entre categorías y, en paralelo, cada
+    CHECK_INTERVAL mientras se esperan los lotes. Si lanza una excepción se
+    cancelan los lotes pendientes (los que ya corren terminan en su proceso) y
+    la excepción se propaga.
+    """
+    workers = workers or available_cpus()
+    total = sum(len(offsets) - 1 for _, offsets in categories)
+    if workers <= 1 or total < PARALLEL_MIN_SEGMENTS:
+        results = []
+        for seg in categories:
+            if check is not None:
+                check()
+            results.append(process_segments(seg, tol))
+        return results
+    jobs: List[Tuple[int, Segments]] = []
+    for ci, seg in enumerate(categories):
+        share = max(1, round(workers * BATCHES_PER_WORKER * (len(seg[1]) - 1) / total))
+        jobs.extend((ci, batch) for batch in _batches(seg, tol, share))
+    pool = _pool(workers)
+    futures = []
+    try:
+        futures = [pool.submit(process_segments, b, tol) for _, b in jobs]
+        pending = set(futures)
+        while pending:
+            if check is not None:
+                check()
+            _, pending = wait(pending, timeout=CHECK_INTERVAL, return_when=FIRST_COMPLETED)
+        results = [f.result() for f in futures]
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        return process_categories(categories, tol, 1, check)
+    except BaseException:
+        for f in futures:
+            f.cancel()
+        raise
+    merged: List[Tuple[list, list]] = [([], []) for _ in categories]
+    for (ci, _), (polys, opens) in zip(jobs, results):
+        merged[ci][0].extend(polys)
+        merged[ci][1].extend(opens)
+    return merged
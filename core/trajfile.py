@@ -0,0 +1,249 @@
+"""
+Formato binario de trayectorias (.traj), mapeable en memoria.
+
+Estructura (little-endian):
+    [cabecera fija 56 B][metadatos JSON][relleno hasta 64 B]
+    [bloque de datos (N, ncols) float32/float64, orden C]
+    [tabla de offsets de bloque (nblocks + 1) uint64]
+
+La tabla de offsets reemplaza las filas NaN separadoras del TXT/CSV: el bloque i
+ocupa las filas offsets[i]:offsets[i+1]. Los datos se escriben con un solo
+tofile() y se leen con np.memmap, por lo que abrir un archivo de millones de
+puntos no copia nada a memoria.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"HMITRAJ\x00"
+VERSION = 1
+_HEADER = struct.Struct("<8sHBBH2xQQQQI4x")
+_ALIGN = 64
+
+# Columnas que se escriben como entero al exportar a texto
+FLAG_COLUMNS = ("C", "CORTAR", "CUT_FLAG", "FLAG")
+
+
+def write_traj(
+    path: str | Path,
+    data: np.ndarray,
+    offsets: Sequence[int] | None = None,
+    columns: Sequence[str] = ("X", "Y", "Z", "CORTAR"),
+    units: str = "mm",
+    frame: str = "pieza",
+    dtype=np.float64,
+    **meta,
+) -> Path:
+    """
+    Escribe un .traj.
+
+    data: (N, ncols) sin filas NaN.
+    offsets: inicio de cada bloque + N final (nblocks + 1). None = un solo bloque.
+    units/frame y cualquier **meta extra se guardan en los metadatos JSON.
+    """
+    path = Path(path)
+    dtype = np.dtype(dtype)
+    if dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+        raise ValueError("dtype debe ser float32 o float64")
+    data = np.ascontiguousarray(data, dtype=dtype.newbyteorder("<"))
+    if data.ndim != 2:
+        raise ValueError("data debe ser (N, ncols)")
+    n, ncols = data.shape
+    if len(columns) != ncols:
+        raise ValueError("columns no coincide con el numero de columnas de data")
+    offsets_arr = np.asarray([0, n] if offsets is None else offsets, dtype="<u8")
+    if offsets_arr[0] != 0 or offsets_arr[-1] != n or np.any(np.diff(offsets_arr.astype(np.int64)) < 0):
+        raise ValueError("offsets debe ser creciente, empezar en 0 y terminar en N")
+
+    meta_bytes = json.dumps(
+        {"columns": list(columns), "units": units, "frame": frame, **meta}, ensure_ascii=False
+    ).encode("utf-8")
+    data_offset = _align(_HEADER.size + len(meta_bytes))
+    table_offset = data_offset + data.nbytes
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        dtype.itemsize,
+        0,
+        ncols,
+        n,
+        len(offsets_arr) - 1,
+        data_offset,
+        table_offset,
+        len(meta_bytes),
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as f:
+        f.write(header)
+        f.write(meta_bytes)
+        f.write(b"\x00" * (data_offset - _HEADER.size - len(meta_bytes)))
+        data.tofile(f)
+        offsets_arr.tofile(f)
+    return path
+
+
+def write_traj_blocks(path: str | Path, blocks: Sequence[np.ndarray], **kwargs) -> Path:
+    """Igual que write_traj pero a partir de una lista de bloques (M_i, ncols)."""
+    blocks = [np.asarray(b, dtype=float) for b in blocks if len(b)]
+    lengths = [len(b) for b in blocks]
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.uint64)
+    ncols = len(kwargs.get("columns", ("X", "Y", "Z", "CORTAR")))
+    data = np.concatenate(blocks) if blocks else np.empty((0, ncols))
+    return write_traj(path, data, offsets, **kwargs)
+
+
+class TrajFile:
+    """Lector de .traj; `data` es un np.memmap de solo lectura (N, ncols)."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            raw = f.read(_HEADER.size)
+            if len(raw) < _HEADER.size:
+                raise ValueError(f"Archivo .traj truncado: {self.path}")
+            (magic, version, itemsize, _, ncols, n, nblocks, data_offset, table_offset, meta_len) = (
+                _HEADER.unpack(raw)
+            )
+            if magic != MAGIC:
+                raise ValueError(f"No es un archivo .traj: {self.path}")
+            if version > VERSION:
+                raise ValueError(f"Version .traj no soportada: {version}")
+            self.meta: dict = json.loads(f.read(meta_len).decode("utf-8"))
+        dtype = np.dtype("<f4") if itemsize == 4 else np.dtype("<f8")
+        if n:
+            self.data = np.memmap(self.path, dtype=dtype, mode="r", offset=data_offset, shape=(n, ncols))
+        else:
+            self.data = np.empty((0, ncols), dtype=dtype)
+        self.offsets = np.memmap(self.path, dtype="<u8", mode="r", offset=table_offset, shape=(nblocks + 1,))
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.meta.get("columns", []))
+
+    @property
+    def units(self) -> str:
+        return self.meta.get("units", "mm")
+
+    @property
+    def frame(self) -> str:
+        return self.meta.get("frame", "")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def block(self, i: int) -> np.ndarray:
+        return self.data[int(self.offsets[i]) : int(self.offsets[i + 1])]
+
+    def iter_blocks(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self.block(i)
+
+    def to_nan_rows(self) -> np.ndarray:
+        """Reconstruye el arreglo con filas NaN separadoras (formato TXT/CSV)."""
+        return join_nan_rows(self.data, self.offsets)
+
+
+def open_traj(path: str | Path) -> TrajFile:
+    return TrajFile(path)
+
+
+# Conversion desde/hacia texto
+def split_nan_rows(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Arreglo con filas NaN separadoras -> (datos sin NaN, offsets de bloque)."""
+    rows = np.asarray(rows, dtype=float)
+    if rows.ndim == 1:
+        rows = rows.reshape(1, -1)
+    is_sep = np.isnan(rows).any(axis=1)
+    keep = ~is_sep
+    # un bloque empieza en cada fila valida precedida por separador (o al inicio)
+    starts = keep & np.concatenate([[True], is_sep[:-1]])
+    block_id = np.cumsum(starts)[keep] - 1
+    counts = np.bincount(block_id) if block_id.size else np.empty(0, dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.uint64)
+    return rows[keep], offsets
+
+
+def join_nan_rows(data: np.ndarray, offsets: Sequence[int]) -> np.ndarray:
+    """(datos, offsets) -> arreglo con una fila NaN entre bloques."""
+    offsets = np.asarray(offsets, dtype=np.int64)
+    nblocks = len(offsets) - 1
+    if nblocks <= 0:
+        return np.empty((0, data.shape[1]))
+    out = np.full((len(data) + nblocks - 1, data.shape[1]), np.nan)
+    # fila destino = fila origen + numero de separadores previos
+    dest = np.arange(len(data)) + np.repeat(np.arange(nblocks), np.diff(offsets))
+    out[dest] = data
+    return out
+
+
+def read_text_rows(path: str | Path) -> Tuple[np.ndarray, List[str]]:
+    """Lee TXT/CSV con cabecera opcional; retorna (filas con NaN, nombres de columna)."""
+    path = Path(path)
+    with path.open("r", encoding="utf-8", errors="ignore") as f:
+        first = f.readline()
+    delimiter = "," if "," in first else None
+    tokens = first.replace(",", " ").split()
+    try:
+        [float(t) for t in tokens]
+        has_header = False
+    except ValueError:
+        has_header = True
+    rows = np.loadtxt(path, delimiter=delimiter, skiprows=1 if has_header else 0, ndmin=2)
+    columns = tokens if has_header else [f"C{i}" for i in range(rows.shape[1])]
+    return rows, columns
+
+
+def txt_to_traj(src: str | Path, dst: str | Path | None = None, dtype=np.float64, **meta) -> Path:
+    """Convierte TXT/CSV (NaN separadores) a .traj."""
+    src = Path(src)
+    dst = src.with_suffix(".traj") if dst is None else Path(dst)
+    rows, columns = read_text_rows(src)
+    data, offsets = split_nan_rows(rows)
+    return write_traj(dst, data, offsets, columns=columns, dtype=dtype, source=src.name, **meta)
+
+
+def traj_to_txt(src: str | Path, dst: str | Path | None = None) -> Path:
+    """Convierte .traj a TXT (espacios) o CSV (segun extension de dst)."""
+    traj = TrajFile(src)
+    dst = Path(src).with_suffix(".txt") if dst is None else Path(dst)
+    sep = "," if dst.suffix.lower() == ".csv" else " "
+    fmt = ["%.0f" if c.upper() in FLAG_COLUMNS else "%.6f" for c in traj.columns]
+    nan_row = sep.join(["NaN"] * len(traj.columns))
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    with dst.open("w", encoding="utf-8") as f:
+        f.write(sep.join(traj.columns) + "\n")
+        for i, block in enumerate(traj.iter_blocks()):
+            if i:
+                f.write(nan_row + "\n")
+            np.savetxt(f, block, fmt=fmt, delimiter=sep)
+    return dst
+
+
+def _align(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convierte trayectorias TXT/CSV <-> .traj binario")
+    parser.add_argument("src", type=str, help="Archivo de entrada (.txt/.csv o .traj)")
+    parser.add_argument("dst", type=str, nargs="?", default=None, help="Archivo de salida (opcional)")
+    parser.add_argument("--float32", action="store_true", help="Guardar columnas en float32")
+    args = parser.parse_args()
+    src = Path(args.src)
+    if src.suffix.lower() == ".traj":
+        out = traj_to_txt(src, args.dst)
+    else:
+        out = txt_to_traj(src, args.dst, dtype=np.float32 if args.float32 else np.float64)
+    print(f"Exportado: {out}")
+
+
+if __name__ == "__main__":
+    main()
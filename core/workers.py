@@ -0,0 +1,267 @@
+"""
+Workers en segundo plano para el backend Qt.
+
+El procesamiento DXF (lectura, snap, polygonize, orden y preview) corre en un
+QThreadPool para no congelar la GUI. Cada carga tiene un job_id; el backend
+descarta resultados de cargas canceladas o reemplazadas por otra mas nueva.
+Con un DxfCache, un DXF ya procesado con los mismos parametros se lee del
+cache en disco en lugar de volver a convertirse. Los TXT/CSV se leen por
+trozos (CsvLoadWorker) y la vista recibe la pieza a medida que se lee; los
+.traj se abren en TrajLoadWorker. El preview y el nivel grueso de la piramide
+LOD (core.pathlod) tambien se calculan en el worker.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+from core.dxf_converter import STAGES as CONVERTER_STAGES
+from core.dxf_converter import DxfTopologyConverter
+from core.dxfcache import DxfCache
+from core.pathbuffer import PathBuffer, PathBufferBuilder
+from core.pathlod import COARSE_DIVISOR, PathPyramid, simplify_paths
+from core.preview import image_to_png, load_png, render_preview
+from core.textstream import DEFAULT_CHUNK_BYTES, flag_column, iter_text_chunks, read_header
+from core.trajfile import TrajFile
+
+# Etapas reportadas al QML: las del conversor + render del preview.
+LOAD_STAGES: Tuple[str, ...] = CONVERTER_STAGES + ("preview",)
+# Etapas de TXT/CSV y .traj
+TEXT_STAGES: Tuple[str, ...] = ("read", "preview")
+
+
+def stage_fraction(stages: Tuple[str, ...], stage: str, fraction: float = 0.0) -> float:
+    """Fraccion 0..1 de toda la carga: etapas previas completas + `fraction` de la actual."""
+    return (stages.index(stage) + min(max(fraction, 0.0), 1.0)) / len(stages)
+
+
+class LoadCancelled(Exception):
+    """La carga fue cancelada (p.ej. el operador eligio otro archivo)."""
+
+
+class WorkerSignals(QObject):
+    """Senales del worker; viven en el hilo de GUI y llegan encoladas al backend."""
+
+    progress = Signal(int, str, float)  # job_id, etapa, fraccion 0..1 de toda la carga (stage_fraction)
+    partial = Signal(int, object)  # job_id, PathBuffer grueso del trozo leido
+    finished = Signal(int, object)  # job_id, dict con paths/pyramid/bounds/preview (QImage)
+    failed = Signal(int, str)  # job_id, mensaje
+    cancelled = Signal(int)  # job_id
+
+
+class CancellableWorker(QRunnable):
+    """
+    Base de los workers del backend: job_id, senales y cancelacion cooperativa
+    (threading.Event). El backend conserva la referencia hasta recibir la
+    senal terminal, asi que no se autoborran.
+    """
+
+    signals_class = WorkerSignals
+
+    def __init__(self, job_id: int, path: Path | None = None) -> None:
+        super().__init__()
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.path = Path(path) if path is not None else None
+        self.signals = self.signals_class()
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _check_cancel(self) -> None:
+        if self._cancel.is_set():
+            raise LoadCancelled(str(self.path))
+
+
+class DxfLoadWorker(CancellableWorker):
+    """Procesa un DXF completo fuera del hilo de GUI."""
+
+    def __init__(
+        self,
+        job_id: int,
+        path: Path,
+        tol_topo: float,
+        chord_tol: float,
+        cache: DxfCache | None = None,
+        streaming: bool = False,
+    ) -> None:
+        super().__init__(job_id, path)
+        self.tol_topo = tol_topo
+        self.chord_tol = chord_tol
+        self.cache = cache
+        self.streaming = streaming  # no cambia el resultado: queda fuera de la clave del cache
+
+    def run(self) -> None:
+        try:
+            params = {"tol_topo": self.tol_topo, "chord_tol": self.chord_tol}
+            key = self.cache.key(self.path, params) if self.cache is not None else None
+            hit = self.cache.get(key) if key is not None else None
+            if hit is not None:
+                preview = load_png(hit["preview"]) if hit["preview"] is not None else None
+                pyramid = PathPyramid(hit["paths"])
+                self._check_cancel()
+                self.signals.finished.emit(
+                    self.job_id,
+                    {
+                        "paths": hit["paths"],
+                        "pyramid": pyramid,
+                        "bounds": hit["bounds"],
+                        "preview": preview,
+                        "path": self.path,
+                    },
+                )
+                return
+            conv = DxfTopologyConverter(self.path, streaming=self.streaming, **params).process(
+                progress=self._on_stage
+            )
+            paths = PathBuffer.from_geoms(conv._geoms_final)  # noqa: SLF001
+            if not paths.n_points:
+                self.signals.failed.emit(self.job_id, "DXF sin geometria procesada.")
+                return
+            bounds = paths.bounds()
+            self._on_stage("preview", 0.0)
+            preview = render_preview(paths, self.path.name)
+            pyramid = PathPyramid(paths)
+            self._check_cancel()
+            if key is not None:
+                try:
+                    png = image_to_png(preview) if preview is not None else None
+                    self.cache.put(key, paths, png, conv.travel_length, self.path.name)
+                except OSError:  # sin cache (disco lleno, permisos): la carga sigue valida
+                    pass
+        except LoadCancelled:
+            self.signals.cancelled.emit(self.job_id)
+            return
+        except Exception as exc:
+            self.signals.failed.emit(self.job_id, f"Error procesando DXF: {exc}")
+            return
+        self.signals.finished.emit(
+            self.job_id,
+            {"paths": paths, "pyramid": pyramid, "bounds": bounds, "preview": preview, "path": self.path},
+        )
+
+    def _on_stage(self, stage: str, _fraction: float) -> None:
+        self._check_cancel()
+        self.signals.progress.emit(self.job_id, stage, stage_fraction(LOAD_STAGES, stage))
+
+
+class CsvLoadWorker(CancellableWorker):
+    """
+    Lee un TXT/CSV por trozos (core.textstream). Cada trozo se emite
+    simplificado por `partial` para mostrar la pieza mientras carga; al final
+    `finished` lleva los paths completos.
+
+    Limitaciones: la vista y PathBuffer son 2D, asi que Z se descarta y el flag
+    queda uno por path (el del ultimo punto, como PathBuffer.from_rows). El
+    texto nunca esta entero en memoria, pero X, Y (float32, 8 bytes por punto)
+    si: se escriben en un PathBufferBuilder, sin lista de trozos. Un archivo
+    mas grande que la RAM carga si sus puntos en float32 entran en ella.
+    """
+
+    def __init__(self, job_id: int, path: Path, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> None:
+        super().__init__(job_id, path)
+        self.chunk_bytes = chunk_bytes
+
+    def run(self) -> None:
+        try:
+            names, ncols = read_header(self.path)
+            fcol = flag_column(names, ncols)
+            cols = [0, 1] if fcol is None else [0, 1, fcol]
+            builder = PathBufferBuilder(None if fcol is None else 2)
+            for rows, done, total in iter_text_chunks(self.path, self.chunk_bytes):
+                self._check_cancel()
+                part = np.ascontiguousarray(rows[:, cols], dtype=np.float32)
+                builder.append(part)
+                if done < total:
+                    # puntos estimados por bytes leídos: el buffer casi no vuelve a crecer
+                    builder.reserve(int(builder.n_points * total / max(done, 1) * 1.05))
+                coarse = PathBuffer.from_rows(part, None if fcol is None else 2)
+                bounds = coarse.bounds()
+                if bounds is not None:
+                    extent = max(bounds[1] - bounds[0], bounds[3] - bounds[2])
+                    self.signals.partial.emit(self.job_id, simplify_paths(coarse, extent / COARSE_DIVISOR))
+                fraction = stage_fraction(TEXT_STAGES, "read", done / max(total, 1))
+                self.signals.progress.emit(self.job_id, "read", fraction)
+            paths = builder.build()
+            del builder
+            if not paths.n_points:
+                self.signals.failed.emit(self.job_id, "CSV sin puntos numericos.")
+                return
+            self.signals.progress.emit(self.job_id, "preview", stage_fraction(TEXT_STAGES, "preview"))
+            preview = render_preview(paths, self.path.name)
+            pyramid = PathPyramid(paths)
+            self._check_cancel()
+        except LoadCancelled:
+            self.signals.cancelled.emit(self.job_id)
+            return
+        except Exception as exc:
+            self.signals.failed.emit(self.job_id, f"Error leyendo CSV: {exc}")
+            return
+        self.signals.finished.emit(
+            self.job_id,
+            {"paths": paths, "pyramid": pyramid, "bounds": paths.bounds(), "preview": preview, "path": self.path},
+        )
+
+
+class TrajLoadWorker(CancellableWorker):
+    """Abre un .traj (memmap), arma los paths, el preview y la piramide fuera del hilo de GUI."""
+
+    def run(self) -> None:
+        try:
+            self.signals.progress.emit(self.job_id, "read", stage_fraction(TEXT_STAGES, "read"))
+            traj = TrajFile(self.path)
+            flag_col = 3 if len(traj.columns) > 3 else None
+            blocks = [b for b in traj.iter_blocks() if len(b)]
+            flags = [int(b[-1, flag_col]) for b in blocks] if flag_col is not None else None
+            paths = PathBuffer.from_blocks(blocks, flags)
+            del blocks, traj
+            if not paths.n_points:
+                self.signals.failed.emit(self.job_id, "TRAJ sin puntos.")
+                return
+            self._check_cancel()
+            self.signals.progress.emit(self.job_id, "preview", stage_fraction(TEXT_STAGES, "preview"))
+            preview = render_preview(paths, self.path.name)
+            pyramid = PathPyramid(paths)
+            self._check_cancel()
+        except LoadCancelled:
+            self.signals.cancelled.emit(self.job_id)
+            return
+        except Exception as exc:
+            self.signals.failed.emit(self.job_id, f"Error leyendo TRAJ: {exc}")
+            return
+        self.signals.finished.emit(
+            self.job_id,
+            {"paths": paths, "pyramid": pyramid, "bounds": paths.bounds(), "preview": preview, "path": self.path},
+        )
+
+
+class LodSignals(QObject):
+    level = Signal(int, int, object)  # job_id, indice de nivel, PathBuffer
+    done = Signal(int)  # job_id (terminado o cancelado)
+
+
+class PathLodWorker(CancellableWorker):
+    """Calcula los niveles pendientes de una PathPyramid, de grueso a fino."""
+
+    signals_class = LodSignals
+
+    def __init__(self, job_id: int, pyramid: PathPyramid) -> None:
+        super().__init__(job_id)
+        self.full = pyramid.full
+        self.todo = [(i, pyramid.tolerances[i]) for i in pyramid.pending()]
+
+    def run(self) -> None:
+        for i, tol in self.todo:
+            if self.is_cancelled():
+                break
+            self.signals.level.emit(self.job_id, i, simplify_paths(self.full, tol))
+        self.signals.done.emit(self.job_id)
@@ -9,18 +9,25 @@ from PySide6.QtQml import QQmlApplicationEngine
 HERE = Path(__file__).resolve().parent
 
 from core.backend import Backend
+from core.playback import PlaybackController
+from core.pathview import register_qml_types
+from core.preview import PROVIDER_ID
 
 def main():
     os.environ.setdefault("QT_QUICK_CONTROLS_STYLE", "Basic")
     # Permite XMLHttpRequest desde archivos locales en QML (para cargar CSV)
     os.environ.setdefault("QML_XHR_ALLOW_FILE_READ", "1")
 
+    register_qml_types()
     app = QApplication(sys.argv)
     engine = QQmlApplicationEngine()
     engine.addImportPath(str(HERE / "qml"))
 
     backend = Backend()
     engine.rootContext().setContextProperty("backend", backend)
+    engine.addImageProvider(PROVIDER_ID, backend.preview_provider)
+    playback = PlaybackController()
+    engine.rootContext().setContextProperty("playback", playback)
 
     qml_path = QUrl.fromLocalFile(str(HERE / "qml" / "Main.qml"))
     engine.load(qml_path)
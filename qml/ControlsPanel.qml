@@ -440,7 +440,7 @@ Item {
         }
         FileDialog {
             id: csvDialog
-            nameFilters: ["CSV/TXT (*.csv *.txt)", "All Files (*.*)"]
+            nameFilters: ["CSV/TXT/TRAJ (*.csv *.txt *.traj)", "All Files (*.*)"]
             onAccepted: panel.csvSelected(selectedFile)
         }
         FileDialog {
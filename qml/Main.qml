@@ -40,8 +40,14 @@ ApplicationWindow {
     // Recibe señales desde backend Python para poblar vistas
     Connections {
         target: backend
-        function onPointsReady(points) {
-            viewer2d.setPoints(points)
+        function onPathReady(coords, offsets, flags) {
+            viewer2d.setPath(coords, offsets, flags)
+        }
+        function onPathLevelReady(coords, offsets, flags) {
+            viewer2d.setPathLevel(coords, offsets, flags)
+        }
+        function onPathChunkReady(coords, offsets, flags) {
+            viewer2d.appendPath(coords, offsets, flags)
         }
         function onBoundsReady(xmin, xmax, ymin, ymax) {
             viewer2d.setBounds(xmin, xmax, ymin, ymax)
@@ -52,6 +58,9 @@ ApplicationWindow {
         function onStatusMessage(text) {
             console.log(text)
         }
+        function onLoadProgress(stage, fraction) {
+            console.log("Carga:", stage, Math.round(fraction * 100) + "%")
+        }
     }
 
     header: ToolBar {
@@ -154,6 +163,10 @@ ApplicationWindow {
                         Layout.minimumHeight: 360
                         accentColor: app.accentColor
                         palette: app.palette
+                        onDetailRequested: function(mmPerPixel) {
+                            if (backend && backend.requestPathLevel)
+                                backend.requestPathLevel(mmPerPixel)
+                        }
                     }
 
                     // ======================== VISTA 3D ========================
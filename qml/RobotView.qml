@@ -77,6 +77,9 @@ Item {
     property int playbackIntervalMs: 20
     property int playbackSkip: 1
     property real animVelocity: 1000
+    // Reproductor del backend (core.playback.PlaybackController); sin él
+    // (demo independiente) se usa el parseo en JS + trajTimer
+    property var player: (typeof playback !== "undefined") ? playback : null
 
     function luma(c) {
         // c.r,g,b en [0,1]
@@ -131,23 +134,35 @@ Item {
     function setTrajectoryFile(url) {
         if (!url || url.length === 0) return
         root.trajPath = url
+        if (root.player) {
+            root.player.load(String(url))
+            return
+        }
         root.loadTrajectory(url)
         root.trajPlaying = false
         root.trajIndex = 0
     }
 
     function play() {
+        if (root.player) {
+            root.player.play()
+            return
+        }
         if (root.trajArt.length === 0) return
         if (root.trajIndex >= root.trajArt.length) root.trajIndex = 0
         root.trajPlaying = true
     }
 
     function stop() {
+        if (root.player)
+            root.player.stop()
         root.trajPlaying = false
     }
 
     function setPlaybackSpeed(factor) {
         var k = Math.max(1, factor || 1)
+        if (root.player)
+            root.player.setSpeed(k)
         root.playbackSkip = Math.max(1, Math.floor(k))
         root.playbackIntervalMs = Math.max(5, 50 - Math.floor((k - 1) * 5))
         root.animVelocity = 300 * k
@@ -156,6 +171,9 @@ Item {
 
     function goHome() {
         root.stop()
+        // seek primero: su poseChanged pisaria la pose de reposo
+        if (root.player)
+            root.player.seek(0)
         root.movdistance1 = 4
         root.angrotacion1 = 0
         root.angrotacion2 = 165
@@ -205,7 +223,7 @@ Item {
         id: trajTimer
         interval: root.playbackIntervalMs
         repeat: true
-        running: root.trajPlaying
+        running: root.trajPlaying && !root.player
         onTriggered: {
             if (!root.trajPlaying || root.trajArt.length === 0) return
             for (var s = 0; s < root.playbackSkip; s++) {
@@ -225,7 +243,24 @@ Item {
         }
     }
     onTrajPlayingChanged: {
-        trajTimer.running = root.trajPlaying
+        trajTimer.running = root.trajPlaying && !root.player
+    }
+
+    Connections {
+        target: root.player
+        ignoreUnknownSignals: true
+        function onPoseChanged() {
+            root.movdistance1 = root.player.d1mm / 100
+            root.angrotacion1 = root.player.th2deg
+            root.angrotacion2 = root.player.th3deg
+            root.trajIndex = root.player.index
+        }
+        function onStateChanged() {
+            root.trajPlaying = root.player.playing
+        }
+        function onStatusMessage(msg) {
+            console.log(msg)
+        }
     }
 
 
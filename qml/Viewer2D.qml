@@ -29,6 +29,20 @@ Item {
     property color unitColor: palette.label || "#9ca3af"
     property color canvasColor: palette.canvasBg || "#f9fafc"
     property color gridColor: palette.grid || "#e7ebf3"
+
+    // Escala de la vista (mm por px) para pedir al backend el nivel de detalle
+    signal detailRequested(real mmPerPixel)
+
+    Timer {
+        id: detailTimer
+        interval: 80
+        onTriggered: view2d.detailRequested(canvas.mmPerPixel)
+    }
+
+    Connections {
+        target: canvas
+        function onMmPerPixelChanged() { detailTimer.restart() }
+    }
 
     Rectangle {
         anchors.fill: parent
@@ -171,7 +185,7 @@ Item {
     function toFileUrl(p) {
         var s = String(p || "")
         if (s.length === 0) return ""
-        if (s.startsWith("file:/")) return s
+        if (s.startsWith("file:/") || s.startsWith("image:")) return s
         return "file:///" + s.replace(/\\/g, "/")
     }
 
@@ -183,41 +197,35 @@ Item {
         imageSource = toFileUrl(path)
     }
 
+    // Buffers empaquetados del backend (Backend.pathReady)
+    function setPath(coords, offsets, flags) {
+        canvas.setPath(coords, offsets, flags)
+        if (autoFitBounds)
+            fitCurrent()
+        detailTimer.restart()
+    }
+
+    // Nivel de detalle pedido con detailRequested (Backend.pathLevelReady)
+    function setPathLevel(coords, offsets, flags) {
+        canvas.replacePath(coords, offsets, flags)
+    }
+
+    // Trozo nuevo de una carga en curso (Backend.pathChunkReady): se agrega a lo ya dibujado
+    function appendPath(coords, offsets, flags) {
+        canvas.appendPath(coords, offsets, flags)
+    }
+
+    // Compatibilidad: lista {x,y,flag} + {break}
     function setPoints(arr) {
-        if (autoFitBounds && arr && arr.length > 0) {
-            var minX = Infinity, maxX = -Infinity, minY = Infinity, maxY = -Infinity
-            for (var i = 0; i < arr.length; i++) {
-                var p = arr[i]
-                if (!p || p.break || p.x === undefined || p.y === undefined)
-                    continue
-                if (p.x < minX) minX = p.x
-                if (p.x > maxX) maxX = p.x
-                if (p.y < minY) minY = p.y
-                if (p.y > maxY) maxY = p.y
-            }
-            if (minX < Infinity && minY < Infinity) {
-                canvas.fitToBounds(minX, maxX, minY, maxY)
-            }
-        }
-        if (canvas.setPoints)
-            canvas.setPoints(arr)
-        else
-            canvas.points = arr
+        canvas.setPoints(arr)
+        if (autoFitBounds && arr && arr.length > 0)
+            fitCurrent()
     }
 
     function fitCurrent() {
-        var arr = canvas.points || []
-        var minX = Infinity, maxX = -Infinity, minY = Infinity, maxY = -Infinity
-        for (var i = 0; i < arr.length; i++) {
-            var p = arr[i]
-            if (!p || p.break || p.x === undefined || p.y === undefined) continue
-            if (p.x < minX) minX = p.x
-            if (p.x > maxX) maxX = p.x
-            if (p.y < minY) minY = p.y
-            if (p.y > maxY) maxY = p.y
-        }
-        if (minX < Infinity) {
-            canvas.fitToBounds(minX, maxX, minY, maxY)
+        var b = canvas.dataBounds()
+        if (b) {
+            canvas.fitToBounds(b.xmin, b.xmax, b.ymin, b.ymax)
         } else {
             // reset fijo
             canvas.fitToBounds(-300, 300, -300, 300)
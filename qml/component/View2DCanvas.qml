@@ -1,13 +1,13 @@
 import QtQuick
 import QtQuick.Layouts
+import RoboticHMI 1.0
 
 Item {
     id: root
 
     // Estilo y datos
     property var palette: ({})
-    property var points: []                  // puntos crudos (x,y,flag,break)
-    property var drawPoints: []              // buffer copiado para pintar
+    property var points: []                  // compat: lista {x,y,flag} / {break}
     property color accentColor: palette.accent || "#0a84ff"
     property bool showAxes: true
     property color axisXColor: palette.axisX || palette.accent || "#ef4444"
@@ -27,6 +27,13 @@ Item {
     property real axisMaxY: 300
     property real rotationDeg: 0
     property real minSpan: 50
+    // Escala actual (mm por px), misma cuenta que xPx/yPx del Canvas
+    readonly property real mmPerPixel: {
+        var marginPx = Math.min(width, height) * marginRatio
+        var s = Math.min((width - 2 * marginPx) / Math.max(axisMaxX - axisMinX, 1e-6),
+                         (height - 2 * marginPx) / Math.max(axisMaxY - axisMinY, 1e-6))
+        return s > 0 ? 1 / s : 0
+    }
 
     Layout.fillWidth: true
     Layout.fillHeight: true
@@ -38,29 +45,78 @@ Item {
     onAxisYColorChanged: canvas.requestPaint()
     onUnitColorChanged: canvas.requestPaint()
 
+    // Buffers del backend (ArrayBuffer desde QByteArray) tal cual a pathView:
+    // los paths (ver core/pathbuffer.py) no se copian ni se recorren en JS
+    function setPath(coordsBuf, offsetsBuf, flagsBuf) {
+        if (coordsBuf && coordsBuf.byteLength > 0)
+            pathView.setPath(coordsBuf, offsetsBuf, flagsBuf)
+        else
+            pathView.clear()
+        applyExtents()
+    }
+
+    // Otro nivel de detalle del mismo trabajo: cambia la geometria sin tocar la vista
+    function replacePath(coordsBuf, offsetsBuf, flagsBuf) {
+        pathView.setPath(coordsBuf, offsetsBuf, flagsBuf)
+    }
+
+    // Trozo nuevo de la misma carga: pathView lo agrega y los ejes se ajustan a los bounds
+    function appendPath(coordsBuf, offsetsBuf, flagsBuf) {
+        if (coordsBuf && coordsBuf.byteLength > 0) {
+            pathView.appendPath(coordsBuf, offsetsBuf, flagsBuf)
+            applyExtents()
+        }
+    }
+
+    // Compatibilidad con listas {x,y,flag} + {break}: se empaquetan una sola vez
     function setPoints(arr) {
-        points = arr || []
-        drawPoints = points.slice()
-        if (drawPoints.length > 0) {
-            var minx = 1e9, maxx = -1e9, miny = 1e9, maxy = -1e9
-            for (var i = 0; i < drawPoints.length; i++) {
-                var p = drawPoints[i]
-                if (!p || p.break || p.x === undefined || p.y === undefined) continue
-                if (p.x < minx) minx = p.x
-                if (p.x > maxx) maxx = p.x
-                if (p.y < miny) miny = p.y
-                if (p.y > maxy) maxy = p.y
-            }
-            if (minx < 1e9) {
-                var maxAbs = Math.max(Math.abs(minx), Math.abs(maxx), Math.abs(miny), Math.abs(maxy))
-                var pad = Math.max(10, maxAbs * padFactor)
-                var span = maxAbs + pad
-                axisMinX = -span
-                axisMaxX = span
-                axisMinY = -span
-                axisMaxY = span
-                gridStep = niceStep((axisMaxX - axisMinX), 18)
+        arr = arr || []
+        var xy = new Float32Array(arr.length * 2)
+        var offs = [0]
+        var fl = []
+        var n = 0
+        var flag = 1
+        for (var i = 0; i < arr.length; i++) {
+            var p = arr[i]
+            if (!p) continue
+            if (p.break) {
+                if (n > offs[offs.length - 1]) {
+                    offs.push(n)
+                    fl.push(flag)
+                }
+                flag = 1
+                continue
             }
+            if (p.x === undefined || p.y === undefined) continue
+            if (p.flag !== undefined) flag = p.flag
+            xy[2 * n] = p.x
+            xy[2 * n + 1] = p.y
+            n++
+        }
+        if (n > offs[offs.length - 1]) {
+            offs.push(n)
+            fl.push(flag)
+        }
+        setPath(xy.slice(0, 2 * n).buffer, new Int32Array(offs).buffer, new Int32Array(fl).buffer)
+    }
+
+    // Bounds calculados por pathView (numpy) al recibir los buffers
+    function dataBounds() {
+        var b = pathView.bounds
+        return b.length === 4 ? { xmin: b[0], xmax: b[1], ymin: b[2], ymax: b[3] } : null
+    }
+
+    function applyExtents() {
+        var b = dataBounds()
+        if (b) {
+            var maxAbs = Math.max(Math.abs(b.xmin), Math.abs(b.xmax), Math.abs(b.ymin), Math.abs(b.ymax))
+            var pad = Math.max(10, maxAbs * padFactor)
+            var span = maxAbs + pad
+            axisMinX = -span
+            axisMaxX = span
+            axisMinY = -span
+            axisMaxY = span
+            gridStep = niceStep((axisMaxX - axisMinX), 18)
         } else {
             // reset a rango fijo
             axisMinX = -300
@@ -214,54 +270,22 @@ Item {
                 ctx.fillText(top.toFixed(0), xPx(0) + 6, 12)
             }
 
-            // Polilíneas
-            if (drawPoints && drawPoints.length > 0) {
-                ctx.lineJoin = "round"
-                ctx.lineCap = "round"
-                var current = []
-                var currentFlag = 1
-                function flush() {
-                    if (current.length < 2) return
-                    ctx.beginPath()
-                    ctx.moveTo(xPx(current[0].x), yPx(current[0].y))
-                    for (var j = 1; j < current.length; j++) {
-                        ctx.lineTo(xPx(current[j].x), yPx(current[j].y))
-                    }
-                    var isClosed = Math.hypot(
-                        current[0].x - current[current.length - 1].x,
-                        current[0].y - current[current.length - 1].y
-                    ) < 1e-3
-                    if (isClosed) ctx.closePath()
-                    if (currentFlag === 1) {
-                        ctx.fillStyle = Qt.rgba(0.0, 0.6, 0.0, 0.25)
-                        ctx.strokeStyle = Qt.rgba(0.0, 0.5, 0.0, 0.8)
-                    } else {
-                        ctx.fillStyle = Qt.rgba(1.0, 0.6, 0.0, 0.2)
-                        ctx.strokeStyle = Qt.rgba(1.0, 0.4, 0.0, 0.9)
-                    }
-                    ctx.lineWidth = 2
-                    if (isClosed) ctx.fill()
-                    ctx.stroke()
-                }
-
-                for (var i = 0; i < drawPoints.length; i++) {
-                    var p = drawPoints[i]
-                    if (!p) continue
-                    if (p.break) {
-                        flush()
-                        current = []
-                        currentFlag = 1
-                        continue
-                    }
-                    if (p.x === undefined || p.y === undefined)
-                        continue
-                    currentFlag = p.flag !== undefined ? p.flag : currentFlag
-                    current.push(p)
-                }
-                flush()
-            }
-
             ctx.restore()
         }
     }
+
+    // Paths en el scene graph: pan/zoom/rotacion solo cambian su matriz
+    PathView2D {
+        id: pathView
+        anchors.fill: parent
+        clip: true
+        axisMinX: root.axisMinX
+        axisMaxX: root.axisMaxX
+        axisMinY: root.axisMinY
+        axisMaxY: root.axisMaxY
+        marginRatio: root.marginRatio
+        rotationDeg: root.rotationDeg
+        cutColor: Qt.rgba(0.0, 0.5, 0.0, 0.8)
+        travelColor: Qt.rgba(1.0, 0.4, 0.0, 0.9)
+    }
 }
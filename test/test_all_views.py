@@ -11,6 +11,10 @@ def main():
     here = Path(__file__).resolve().parent
     qml_file = here / "AllViewsDemo.qml"
 
+    sys.path.insert(0, str(here.parent))
+    from core.pathview import register_qml_types
+
+    register_qml_types()
     app = QApplication(sys.argv)
     engine = QQmlApplicationEngine()
     engine.addImportPath(str(here.parent / "qml"))